@@ -0,0 +1 @@
+"""Benchmarks del pipeline de importación sobre listas FIDE sintéticas."""
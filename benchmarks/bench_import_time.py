@@ -0,0 +1,145 @@
+"""Benchmark del tiempo de import: arranque de los scripts CLI y de los workers de la API.
+
+Importa cada módulo en un intérprete nuevo con `python -X importtime`, se
+queda con la mediana del tiempo acumulado de `--repeat` ejecuciones y lo
+compara con su presupuesto. Lista además los módulos que más pesan (tiempo
+propio) para localizar imports que deberían ser diferidos. Sale con código 1
+si algún módulo supera su presupuesto.
+
+    python -m benchmarks.bench_import_time
+    python -m benchmarks.bench_import_time --modules scripts.run_import --top 20
+"""
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+from datetime import datetime, timezone
+from pathlib import Path
+
+from benchmarks.run import RESULTS_DIR, _git_commit
+
+ROOT_DIR = Path(__file__).parent.parent
+
+# Presupuesto (ms) del import acumulado de cada módulo. Los scripts solo deben
+# cargar argparse/logging hasta después de parse_args (--help instantáneo);
+# la API y el importer cargan FastAPI/SQLAlchemy/pydantic, pero no httpx ni psycopg2.
+BUDGETS_MS = {
+    "scripts.run_import": 50,
+    "scripts.run_import_history": 50,
+    "scripts.run_scheduler": 50,
+    "scripts.migrate": 50,
+    "src.importer": 700,
+    "src.api.main": 900,
+}
+
+
+def _measure(module: str) -> tuple[float, dict[str, float]]:
+    """
+    Importa un módulo en un proceso nuevo con -X importtime.
+
+    Returns:
+        (ms acumulados del módulo, ms propios por módulo importado)
+    """
+    env = {**os.environ, "PYTHONPATH": str(ROOT_DIR)}
+    out = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=ROOT_DIR,
+        env=env,
+        capture_output=True,
+        text=True,
+    )
+    if out.returncode != 0:
+        raise RuntimeError(f"Error importando {module}:\n{out.stderr[-2000:]}")
+
+    cumulative = None
+    self_ms: dict[str, float] = {}
+    for line in out.stderr.splitlines():
+        # "import time:      self [us] |  cumulative | imported package"
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        own, total, name = line[len("import time:"):].split("|")
+        name = name.strip()
+        self_ms[name] = int(own) / 1000
+        if name == module:
+            cumulative = int(total) / 1000
+    if cumulative is None:
+        raise RuntimeError(f"{module} no aparece en la salida de -X importtime")
+    return cumulative, self_ms
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Tiempo de import de los scripts CLI y de la API")
+    parser.add_argument(
+        "--modules",
+        default=",".join(BUDGETS_MS),
+        help="Módulos a medir, separados por comas (por defecto todos los que tienen presupuesto)",
+    )
+    parser.add_argument("--repeat", type=int, default=5, help="Ejecuciones por módulo; se guarda la mediana (default: 5)")
+    parser.add_argument("--top", type=int, default=10, help="Módulos más pesados a listar por módulo (default: 10)")
+    parser.add_argument(
+        "--budget-scale",
+        type=float,
+        default=1.0,
+        help="Multiplicador de los presupuestos (máquinas más lentas que la de referencia)",
+    )
+    parser.add_argument("--output", type=Path, default=None, help="Archivo JSON de resultados")
+    args = parser.parse_args()
+
+    commit = _git_commit()
+    results = []
+    over_budget = []
+    for module in args.modules.split(","):
+        runs = []
+        heaviest: dict[str, float] = {}
+        for _ in range(max(args.repeat, 1)):
+            cumulative, self_ms = _measure(module)
+            runs.append(cumulative)
+            for name, ms in self_ms.items():
+                heaviest[name] = min(ms, heaviest.get(name, ms))
+        median = round(statistics.median(runs), 1)
+        budget = BUDGETS_MS.get(module)
+        if budget is not None:
+            budget = round(budget * args.budget_scale, 1)
+        top = sorted(heaviest.items(), key=lambda item: item[1], reverse=True)[: args.top]
+        ok = budget is None or median <= budget
+        if not ok:
+            over_budget.append(module)
+
+        results.append({
+            "module": module,
+            "repeat": len(runs),
+            "import_ms": median,
+            "min_ms": round(min(runs), 1),
+            "budget_ms": budget,
+            "modules_loaded": len(heaviest),
+            "heaviest": [{"module": name, "self_ms": round(ms, 1)} for name, ms in top],
+        })
+        status = "sin presupuesto" if budget is None else f"presupuesto {budget:.0f} ms {'OK' if ok else 'EXCEDIDO'}"
+        print(f"{module:<28} {median:>8.1f} ms  {len(heaviest):>5} módulos  {status}", flush=True)
+        for name, ms in top:
+            print(f"    {ms:>8.1f} ms  {name}")
+
+    report = {
+        "commit": commit,
+        "created_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "cpu_count": os.cpu_count(),
+        "results": results,
+    }
+    output = args.output or RESULTS_DIR / f"importtime_{commit or 'local'}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(report, indent=2))
+    print(f"\nResultados en {output}")
+
+    if over_budget:
+        print(f"Superan el presupuesto: {', '.join(over_budget)}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""Compara dos resultados de `benchmarks.run` o `benchmarks.bench_api` y señala regresiones.
+
+    python -m benchmarks.compare benchmarks/results/abc1234.json benchmarks/results/def5678.json
+
+Sale con código 1 si algún caso pierde más de `--threshold` de throughput
+(filas/s o peticiones/s) o gana más de `--threshold` de pico de memoria o de
+latencia p95.
+"""
+
+import argparse
+import json
+import sys
+from pathlib import Path
+
+
+def _load(path: Path) -> tuple[str, dict[tuple, dict]]:
+    """Commit y resultados indexados por (etapa, tamaño, variante)."""
+    report = json.loads(path.read_text())
+    cases = {(r["stage"], r["size"], r["variant"]): r for r in report["results"]}
+    return report.get("commit") or path.stem, cases
+
+
+def _throughput(result: dict) -> float | None:
+    """Filas/s (pipeline) o peticiones/s (API)."""
+    return result.get("rows_per_second") or result.get("requests_per_second")
+
+
+def _change(base: float | None, new: float | None) -> float | None:
+    """Variación relativa de base a new, o None si falta algún valor."""
+    if not base or new is None:
+        return None
+    return (new - base) / base
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Comparar dos resultados de benchmarks")
+    parser.add_argument("base", type=Path, help="Resultados de referencia (JSON)")
+    parser.add_argument("new", type=Path, help="Resultados a comparar (JSON)")
+    parser.add_argument("--threshold", type=float, default=0.10, help="Variación tolerada (default: 0.10 = 10%%)")
+    args = parser.parse_args()
+
+    base_commit, base = _load(args.base)
+    new_commit, new = _load(args.new)
+    print(f"{base_commit} -> {new_commit}")
+
+    regressions = 0
+    for key in sorted(base.keys() & new.keys()):
+        speed = _change(_throughput(base[key]), _throughput(new[key]))
+        growth = {
+            label: _change(base[key].get(field), new[key].get(field))
+            for label, field in (("pico RSS", "peak_rss_mb"), ("p95", "p95_ms"))
+        }
+        regressed = (speed is not None and speed < -args.threshold) or any(
+            value is not None and value > args.threshold for value in growth.values()
+        )
+        regressions += regressed
+        stage, size, variant = key
+        details = "".join(f"  {label} {value:+7.1%}" for label, value in growth.items() if value is not None)
+        print(
+            f"{stage:>6} {size:>9} {variant:>13}: "
+            f"throughput {speed if speed is not None else 0:+7.1%}{details}"
+            f"{'  REGRESIÓN' if regressed else ''}"
+        )
+
+    for key in sorted(base.keys() ^ new.keys()):
+        print(f"Solo en {'base' if key in base else 'new'}: {key}")
+
+    sys.exit(1 if regressions else 0)
+
+
+if __name__ == "__main__":
+    main()
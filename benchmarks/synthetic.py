@@ -0,0 +1,131 @@
+"""Generador de listas FIDE sintéticas con distribuciones realistas.
+
+Reproducible (semilla fija): el mismo `count` y `seed` generan siempre los
+mismos jugadores, de modo que los resultados son comparables entre commits.
+`write_xml_zip` escribe la lista como el ZIP oficial (XML dentro), con
+variantes para los casos que el parser debe tolerar: namespace por defecto,
+campos ausentes o vacíos y flags de inactividad.
+"""
+
+import random
+import zipfile
+from collections.abc import Iterator
+from pathlib import Path
+from xml.sax.saxutils import escape
+
+from src.parser import PlayerRow
+
+# Federaciones más numerosas primero (peso aproximado en la lista standard)
+COUNTRIES = (
+    ("IND", 40), ("ESP", 25), ("FRA", 25), ("GER", 25), ("RUS", 20), ("ITA", 12),
+    ("POL", 12), ("IRI", 10), ("TUR", 10), ("USA", 10), ("ARG", 8), ("BRA", 8),
+    ("COL", 6), ("PER", 6), ("MEX", 5), ("ENG", 5), ("NED", 4), ("UKR", 4),
+    ("CHN", 3), ("PAR", 2),
+)
+FIRST_NAMES = ("Jose", "María", "Ángel", "Sergei", "Magnus", "Wei", "Arjun", "Zoë", "Łukasz", "Ömer", "Anna", "Luis")
+LAST_NAMES = ("Pérez", "García", "Müller", "Ivanov", "Carlsen", "Nakamura", "Kumar", "Dubois", "Nowak", "Yılmaz", "Silva")
+TITLES = (("GM", 2), ("IM", 4), ("FM", 8), ("CM", 6), ("WGM", 1), ("WIM", 1), ("WFM", 2), (None, 976))
+FLAGS = ((None, 70), ("i", 20), ("w", 5), ("wi", 5))
+
+
+def _weighted(options: tuple) -> tuple[list, list[int]]:
+    """Separa ((valor, peso), ...) en listas para random.choices."""
+    return [v for v, _ in options], [w for _, w in options]
+
+
+def synthetic_players(count: int, seed: int = 0) -> Iterator[PlayerRow]:
+    """
+    Genera `count` jugadores sintéticos.
+
+    Aproxima la lista real: ~60% sin rating standard, menos aún con rapid y
+    blitz, nombres con acentos y caracteres no latinos, títulos escasos y
+    flags de inactividad.
+    """
+    rng = random.Random(seed)
+    countries, country_weights = _weighted(COUNTRIES)
+    titles, title_weights = _weighted(TITLES)
+    flags, flag_weights = _weighted(FLAGS)
+
+    def rating() -> int | None:
+        if rng.random() < 0.6:
+            return None
+        return max(1400, min(2850, int(rng.gauss(1750, 220))))
+
+    def games(value: int | None) -> int | None:
+        return rng.randint(0, 9) if value is not None else None
+
+    for i in range(count):
+        standard, rapid, blitz = rating(), rating(), rating()
+        yield PlayerRow(
+            fideid=100_000 + i,
+            name=f"{rng.choice(LAST_NAMES)}, {rng.choice(FIRST_NAMES)}",
+            country=rng.choices(countries, country_weights)[0],
+            sex="F" if rng.random() < 0.15 else "M",
+            title=rng.choices(titles, title_weights)[0],
+            rating=standard,
+            games=games(standard),
+            rapid_rating=rapid,
+            rapid_games=games(rapid),
+            blitz_rating=blitz,
+            blitz_games=games(blitz),
+            birthday=rng.randint(1940, 2018) if rng.random() < 0.95 else None,
+            flag=rng.choices(flags, flag_weights)[0],
+            foa_title=None,
+            foa_rating=None,
+        )
+
+
+# Variantes de XML: (namespace en <playerslist>, fracción de campos vacíos que se omiten)
+XML_VARIANTS = {
+    "plain": (None, 0.0),
+    "ns": ("http://ratings.fide.com/schema", 0.0),
+    "missing": (None, 0.5),
+}
+
+# Orden de los elementos en la lista oficial (w_title/o_title/k no se importan)
+_XML_ELEMENTS = (
+    "fideid", "name", "country", "sex", "title", "w_title", "o_title", "foa_title",
+    "rating", "games", "k", "rapid_rating", "rapid_games", "rapid_k",
+    "blitz_rating", "blitz_games", "blitz_k", "birthday", "flag",
+)
+
+
+def _player_xml(player: PlayerRow, rng: random.Random, omit_empty: float) -> str:
+    """Elemento <player> de un jugador; los campos vacíos se omiten con probabilidad `omit_empty`."""
+    values = player._asdict()
+    parts = ["<player>"]
+    for tag in _XML_ELEMENTS:
+        value = values.get(tag)
+        if value is None:
+            if omit_empty and rng.random() < omit_empty:
+                continue
+            parts.append(f"<{tag}></{tag}>")
+        else:
+            parts.append(f"<{tag}>{escape(str(value))}</{tag}>")
+    parts.append("</player>\n")
+    return "".join(parts)
+
+
+def write_xml_zip(path: Path, count: int, variant: str = "plain", seed: int = 0) -> Path:
+    """
+    Escribe un ZIP con una lista XML sintética de `count` jugadores.
+
+    El XML se escribe en streaming dentro del ZIP (no se construye en memoria).
+    """
+    namespace, omit_empty = XML_VARIANTS[variant]
+    rng = random.Random(seed + 1)
+    root = f'<playerslist xmlns="{namespace}">' if namespace else "<playerslist>"
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with zipfile.ZipFile(path, "w", compression=zipfile.ZIP_DEFLATED) as zf:
+        with zf.open("players_list_xml_foa.xml", "w", force_zip64=True) as f:
+            f.write(f'<?xml version="1.0" encoding="utf-8"?>\n{root}\n'.encode())
+            chunk = []
+            for player in synthetic_players(count, seed):
+                chunk.append(_player_xml(player, rng, omit_empty))
+                if len(chunk) >= 10_000:
+                    f.write("".join(chunk).encode())
+                    chunk = []
+            chunk.append("</playerslist>\n")
+            f.write("".join(chunk).encode())
+    return path
@@ -0,0 +1,72 @@
+"""Opciones de importación compartidas por scripts.run_import y scripts.run_scheduler.
+
+Solo importa argparse: los scripts siguen cargando `src` después de parse_args.
+"""
+
+import argparse
+
+
+def add_import_arguments(parser: argparse.ArgumentParser) -> None:
+    """Añade al parser las opciones de carga de `run_import` (listas, parseo, carga y validación)."""
+    parser.add_argument(
+        "--all-lists",
+        action="store_true",
+        help="Importar standard, rapid y blitz en paralelo y combinarlas en una sola carga",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=0,
+        help="Procesos para parsear la lista en paralelo (0 = un solo proceso)",
+    )
+    parser.add_argument(
+        "--with-history",
+        action="store_true",
+        help="Guardar también el snapshot del periodo en el historial (Progress) en la misma pasada",
+    )
+    parser.add_argument(
+        "--swap",
+        action="store_true",
+        help="Cargar en una tabla sombra e intercambiarla atómicamente con players (sin bloquear la API)",
+    )
+    parser.add_argument(
+        "--bulk-load",
+        action="store_true",
+        help="Carga masiva: sesión ajustada e índices secundarios creados al final (primera importación)",
+    )
+    parser.add_argument(
+        "--no-validate",
+        action="store_true",
+        help="No validar los lotes antes de cargarlos (una fila inválida hace fallar la importación)",
+    )
+    parser.add_argument(
+        "--pipeline",
+        action="store_true",
+        help="Parsear en un hilo aparte y escribir los lotes a medida que llegan (parseo y carga solapados)",
+    )
+    parser.add_argument(
+        "--loaders",
+        type=int,
+        default=1,
+        help="Con --pipeline: conexiones escribiendo en paralelo (1 = una sola transacción, todo o nada)",
+    )
+
+
+def import_options(parser: argparse.ArgumentParser, args: argparse.Namespace) -> dict:
+    """
+    Retorna los argumentos de `run_import` correspondientes a `add_import_arguments`.
+
+    Termina con un error de argumentos (`parser.error`) si --loaders se usa sin --pipeline.
+    """
+    if args.loaders > 1 and not args.pipeline:
+        parser.error("--loaders requiere --pipeline")
+    return {
+        "all_lists": args.all_lists,
+        "parse_workers": args.workers,
+        "with_history": args.with_history,
+        "swap": args.swap,
+        "bulk": args.bulk_load,
+        "pipeline": args.pipeline,
+        "loaders": args.loaders,
+        "validate": not args.no_validate,
+    }
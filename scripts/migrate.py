@@ -0,0 +1,46 @@
+"""Script CLI para aplicar las migraciones del esquema.
+
+Ejecutar una vez por despliegue, antes de arrancar la API:
+python -m scripts.migrate
+"""
+
+import argparse
+import logging
+import sys
+
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
+)
+logger = logging.getLogger(__name__)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Aplicar las migraciones pendientes del esquema")
+    parser.add_argument(
+        "--status",
+        action="store_true",
+        help="Solo mostrar la versión actual y las migraciones pendientes",
+    )
+    args = parser.parse_args()
+
+    # Imports diferidos: --help y los errores de argumentos no cargan SQLAlchemy ni psycopg2
+    from src.database import get_engine
+    from src.migrations import LATEST_VERSION, MIGRATIONS, migrate, schema_version
+
+    try:
+        engine = get_engine()
+        if args.status:
+            version = schema_version(engine) or 0
+            pending = [f"{m.version} ({m.name})" for m in MIGRATIONS if m.version > version]
+            logger.info("Versión del esquema: %d de %d. Pendientes: %s", version, LATEST_VERSION, pending or "ninguna")
+            return
+        applied = migrate(engine)
+        logger.info("Migraciones aplicadas: %s", applied or "ninguna (esquema al día)")
+    except Exception as e:
+        logger.exception("Error en migración: %s", e)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
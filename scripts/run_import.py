@@ -4,7 +4,7 @@ import argparse
 import logging
 import sys
 
-from src.importer import run_import
+from scripts.import_args import add_import_arguments, import_options
 
 logging.basicConfig(
     level=logging.INFO,
@@ -31,13 +31,25 @@ def main():
         action="store_true",
         help="No exportar a CSV",
     )
+    parser.add_argument(
+        "--no-snapshot",
+        action="store_true",
+        help="No escribir el snapshot binario de jugadores para la API",
+    )
+    add_import_arguments(parser)
     args = parser.parse_args()
+    options = import_options(parser, args)
+
+    # Imports diferidos: --help y los errores de argumentos no cargan SQLAlchemy ni psycopg2
+    from src.importer import run_import
 
     try:
         result = run_import(
             period=args.period,
             export_json=not args.no_json,
             export_csv=not args.no_csv,
+            export_snapshot=not args.no_snapshot,
+            **options,
         )
         logger.info("Resultado: %s", result)
     except Exception as e:
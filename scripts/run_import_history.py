@@ -4,8 +4,6 @@ import argparse
 import logging
 import sys
 
-from src.importer_history import run_import_history
-
 logging.basicConfig(
     level=logging.INFO,
     format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
@@ -21,10 +19,18 @@ def main():
         default=24,
         help="Número de meses hacia atrás a importar (default: 24)",
     )
+    parser.add_argument(
+        "--no-validate",
+        action="store_true",
+        help="No validar los lotes antes de cargarlos (una fila inválida hace fallar el periodo)",
+    )
     args = parser.parse_args()
 
+    # Imports diferidos: --help y los errores de argumentos no cargan SQLAlchemy ni psycopg2
+    from src.importer_history import run_import_history
+
     try:
-        result = run_import_history(months=args.months)
+        result = run_import_history(months=args.months, validate=not args.no_validate)
         logger.info("Resultado: %s", result)
     except Exception as e:
         logger.exception("Error durante la importación: %s", e)
@@ -0,0 +1,57 @@
+"""Script CLI del scheduler: importa cada vez que FIDE publica una lista nueva.
+
+python -m scripts.run_scheduler --swap
+python -m scripts.run_scheduler --once   # un solo ciclo (cron)
+"""
+
+import argparse
+import logging
+import sys
+
+from scripts.import_args import add_import_arguments, import_options
+
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
+)
+logger = logging.getLogger(__name__)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Importar datos FIDE cuando se publica una lista nueva")
+    parser.add_argument(
+        "--interval",
+        type=int,
+        default=None,
+        help="Minutos entre comprobaciones (por defecto SCHEDULER_INTERVAL_MINUTES)",
+    )
+    parser.add_argument(
+        "--once",
+        action="store_true",
+        help="Ejecutar un solo ciclo y salir",
+    )
+    parser.add_argument(
+        "--force",
+        action="store_true",
+        help="Con --once: importar aunque la publicación no haya cambiado",
+    )
+    add_import_arguments(parser)
+    args = parser.parse_args()
+    options = import_options(parser, args)
+
+    # Imports diferidos: --help y los errores de argumentos no cargan SQLAlchemy ni psycopg2
+    from src.scheduler import run_once, run_scheduler
+
+    try:
+        if args.once:
+            result = run_once(force=args.force, **options)
+            logger.info("Resultado: %s", result or "sin publicación nueva")
+        else:
+            run_scheduler(args.interval, **options)
+    except Exception as e:
+        logger.exception("Error en el scheduler: %s", e)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,28 +1,62 @@
 """Aplicación FastAPI principal."""
 
+import logging
 from contextlib import asynccontextmanager
 
 from fastapi import FastAPI
-from sqlalchemy import text
+from fastapi.middleware.gzip import GZipMiddleware
 
-from src.api.routes import router
-from src.database import init_db, get_engine
+from src.api.metrics import instrument_engine, metrics_endpoint, metrics_middleware
+from src.api.refresh import ImportListener
+from src.api.routes import federations_router, leaderboards_router, router
+from src.config import get_settings
+from src.database import IMPORT_CHANNEL, get_db_session, get_engine
+from src.migrations import LATEST_VERSION, schema_version
+from src.services.player_store import load_player_store, publish_player_store
+from src.snapshot import open_snapshot, snapshot_path
+
+logger = logging.getLogger(__name__)
+
+
+def _load_store() -> None:
+    """Carga el almacén de jugadores: del snapshot mapeado si existe, si no desde la DB."""
+    path = snapshot_path()
+    if path.exists():
+        try:
+            publish_player_store(open_snapshot(path))
+            return
+        except (OSError, ValueError) as e:
+            logger.warning("No se pudo abrir el snapshot %s (%s): cargando desde la DB", path, e)
+    with get_db_session() as session:
+        load_player_store(session)
+
+
+def refresh_caches(payload: str) -> None:
+    """Recarga las cachés en memoria tras una importación (aviso de run_import)."""
+    logger.info("Importación completada (%s): recargando cachés", payload)
+    if get_settings().player_store:
+        _load_store()
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    """Inicializa la DB y ejecuta migraciones al arrancar."""
+    """Prepara el engine y las cachés al arrancar (sin DDL: las migraciones son un paso aparte)."""
     engine = get_engine()
-    init_db(engine)
-    # Migraciones: añadir columnas si no existen
-    try:
-        with engine.connect() as conn:
-            conn.execute(text("ALTER TABLE players ADD COLUMN IF NOT EXISTS foa_title VARCHAR(50)"))
-            conn.execute(text("ALTER TABLE players ADD COLUMN IF NOT EXISTS foa_rating INTEGER"))
-            conn.commit()
-    except Exception:
-        pass
+    instrument_engine(engine)
+    version = schema_version(engine)
+    if version is None or version < LATEST_VERSION:
+        logger.warning(
+            "Esquema en la versión %s de %d: ejecuta python -m scripts.migrate", version, LATEST_VERSION
+        )
+    listener = None
+    if get_settings().player_store:
+        _load_store()
+        # Solo hace falta escuchar si hay cachés que recargar
+        listener = ImportListener(engine, IMPORT_CHANNEL, refresh_caches)
+        listener.start()
     yield
+    if listener is not None:
+        listener.stop()
 
 
 app = FastAPI(
@@ -32,7 +66,12 @@ app = FastAPI(
     lifespan=lifespan,
 )
 
+app.middleware("http")(metrics_middleware)
+app.add_middleware(GZipMiddleware, minimum_size=1024)
 app.include_router(router)
+app.include_router(leaderboards_router)
+app.include_router(federations_router)
+app.add_api_route("/metrics", metrics_endpoint, include_in_schema=False)
 
 
 @app.get("/health")
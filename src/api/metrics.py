@@ -0,0 +1,231 @@
+"""Métricas por petición de la API y perfilado de peticiones lentas.
+
+- Middleware: latencia por ruta (plantilla de la ruta, ej: /players/{fideid}),
+  sentencias SQL y tiempo de DB por petición, espera de checkout del pool y
+  latencia de llamadas a FIDE. Se exponen en `/metrics` (formato Prometheus)
+  y en la cabecera `Server-Timing` de cada respuesta.
+- Los contadores de la petición viven en una ContextVar: Starlette copia el
+  contexto al hilo donde se ejecutan los endpoints síncronos y las
+  dependencias, así que los eventos de SQLAlchemy suman al objeto de la
+  petición en curso.
+- Con `SLOW_REQUEST_PROFILE_MS` > 0, `ProfiledRoute` ejecuta los endpoints
+  bajo cProfile (en su propio hilo) y el middleware guarda el perfil
+  (`.prof`, legible con pstats o snakeviz) de las peticiones más lentas que el
+  umbral en `SLOW_REQUEST_PROFILE_PATH`. Solo puede haber un profiler activo
+  por proceso (desde Python 3.12 un segundo falla): se perfila una petición a
+  la vez y las concurrentes se ejecutan sin perfilar.
+
+Las métricas son por proceso: con varios workers, Prometheus debe raspar cada uno.
+"""
+
+import cProfile
+import functools
+import inspect
+import logging
+import re
+import threading
+import time
+from collections.abc import Callable
+from contextvars import ContextVar
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+
+from fastapi import Request, Response
+from fastapi.routing import APIRoute
+from prometheus_client import CONTENT_TYPE_LATEST, CollectorRegistry, Histogram, generate_latest
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from src.config import get_settings
+
+logger = logging.getLogger(__name__)
+
+# Un solo profiler activo por proceso: las peticiones que no lo obtienen no se perfilan
+_profile_lock = threading.Lock()
+
+REGISTRY = CollectorRegistry()
+
+REQUEST_SECONDS = Histogram(
+    "fide_api_request_duration_seconds",
+    "Latencia de las peticiones por ruta",
+    ["method", "route", "status"],
+    registry=REGISTRY,
+)
+REQUEST_SQL_STATEMENTS = Histogram(
+    "fide_api_request_sql_statements",
+    "Sentencias SQL por petición",
+    ["route"],
+    buckets=(0, 1, 2, 3, 5, 8, 13, 21, 50, 100),
+    registry=REGISTRY,
+)
+REQUEST_DB_SECONDS = Histogram(
+    "fide_api_request_db_seconds",
+    "Tiempo en la DB por petición",
+    ["route"],
+    registry=REGISTRY,
+)
+POOL_CHECKOUT_SECONDS = Histogram(
+    "fide_api_db_pool_checkout_seconds",
+    "Espera para obtener una conexión del pool (incluye pre-ping)",
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1.0, 5.0),
+    registry=REGISTRY,
+)
+UPSTREAM_SECONDS = Histogram(
+    "fide_api_upstream_duration_seconds",
+    "Latencia de las llamadas a servicios de FIDE",
+    ["service", "outcome"],
+    registry=REGISTRY,
+)
+
+_UNSAFE_FILENAME = re.compile(r"[^A-Za-z0-9_.-]+")
+
+
+@dataclass
+class RequestStats:
+    """Contadores de la petición en curso."""
+
+    sql_statements: int = 0
+    db_seconds: float = 0.0
+    checkout_seconds: float = 0.0
+    upstream_seconds: float = 0.0
+    profile: cProfile.Profile | None = None
+
+
+_current: ContextVar[RequestStats | None] = ContextVar("request_stats", default=None)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if _current.get() is not None:
+        conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    stats = _current.get()
+    starts = conn.info.get("query_start")
+    if stats is not None and starts:
+        stats.sql_statements += 1
+        stats.db_seconds += time.perf_counter() - starts.pop()
+
+
+def _timed_checkout(connect: Callable) -> Callable:
+    """Envuelve Pool.connect para medir la espera de checkout."""
+
+    @functools.wraps(connect)
+    def wrapper(*args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return connect(*args, **kwargs)
+        finally:
+            elapsed = time.perf_counter() - start
+            POOL_CHECKOUT_SECONDS.observe(elapsed)
+            stats = _current.get()
+            if stats is not None:
+                stats.checkout_seconds += elapsed
+
+    wrapper.fide_instrumented = True
+    return wrapper
+
+
+def instrument_engine(engine: Engine) -> None:
+    """Registra los eventos de SQL y la medición del pool en el engine (idempotente)."""
+    if event.contains(engine, "before_cursor_execute", _before_cursor_execute):
+        return
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+    if not getattr(engine.pool.connect, "fide_instrumented", False):
+        engine.pool.connect = _timed_checkout(engine.pool.connect)
+
+
+def observe_upstream(service: str, seconds: float, ok: bool) -> None:
+    """Registra una llamada a un servicio externo de FIDE."""
+    UPSTREAM_SECONDS.labels(service=service, outcome="ok" if ok else "error").observe(seconds)
+    stats = _current.get()
+    if stats is not None:
+        stats.upstream_seconds += seconds
+
+
+class ProfiledRoute(APIRoute):
+    """Ruta cuyo endpoint se ejecuta bajo cProfile si el perfilado de peticiones lentas está activo."""
+
+    def __init__(self, path: str, endpoint: Callable, **kwargs):
+        # Síncronos: el perfil se toma en el hilo del threadpool donde corre el endpoint
+        if not inspect.iscoroutinefunction(endpoint):
+            endpoint = _profiled(endpoint)
+        super().__init__(path, endpoint, **kwargs)
+
+
+def _profiled(endpoint: Callable) -> Callable:
+    """Envuelve un endpoint síncrono para perfilarlo (conserva la firma para FastAPI)."""
+
+    @functools.wraps(endpoint)
+    def wrapper(*args, **kwargs):
+        stats = _current.get()
+        if stats is None or get_settings().slow_request_profile_ms <= 0:
+            return endpoint(*args, **kwargs)
+        if not _profile_lock.acquire(blocking=False):
+            return endpoint(*args, **kwargs)
+        try:
+            profile = cProfile.Profile()
+            try:
+                profile.enable()
+            except ValueError:
+                # Otra herramienta de perfilado activa (sys.setprofile/monitoring): sin perfil
+                return endpoint(*args, **kwargs)
+            stats.profile = profile
+            try:
+                return endpoint(*args, **kwargs)
+            finally:
+                profile.disable()
+        finally:
+            _profile_lock.release()
+
+    return wrapper
+
+
+def _dump_profile(stats: RequestStats, request: Request, route: str, elapsed: float) -> None:
+    """Guarda el perfil de una petición lenta."""
+    directory = Path(get_settings().slow_request_profile_path)
+    directory.mkdir(parents=True, exist_ok=True)
+    name = _UNSAFE_FILENAME.sub("_", f"{request.method}{route}").strip("_")
+    path = directory / f"{datetime.now().strftime('%Y%m%d_%H%M%S_%f')}_{name}_{elapsed * 1000:.0f}ms.prof"
+    stats.profile.dump_stats(path)
+    logger.warning("Petición lenta %s %s (%.0f ms): perfil en %s", request.method, request.url.path, elapsed * 1000, path)
+
+
+async def metrics_middleware(request: Request, call_next) -> Response:
+    """Mide la petición y publica sus métricas y la cabecera Server-Timing."""
+    stats = RequestStats()
+    token = _current.set(stats)
+    start = time.perf_counter()
+    try:
+        response = await call_next(request)
+    finally:
+        _current.reset(token)
+    elapsed = time.perf_counter() - start
+
+    matched = request.scope.get("route")
+    route = getattr(matched, "path", "unmatched")
+    REQUEST_SECONDS.labels(method=request.method, route=route, status=response.status_code).observe(elapsed)
+    REQUEST_SQL_STATEMENTS.labels(route=route).observe(stats.sql_statements)
+    REQUEST_DB_SECONDS.labels(route=route).observe(stats.db_seconds)
+
+    response.headers["Server-Timing"] = (
+        f"db;dur={stats.db_seconds * 1000:.1f};desc=\"{stats.sql_statements} sql\", "
+        f"pool;dur={stats.checkout_seconds * 1000:.1f}, "
+        f"upstream;dur={stats.upstream_seconds * 1000:.1f}, "
+        f"total;dur={elapsed * 1000:.1f}"
+    )
+
+    threshold = get_settings().slow_request_profile_ms
+    if stats.profile is not None and threshold > 0 and elapsed * 1000 >= threshold:
+        try:
+            _dump_profile(stats, request, route, elapsed)
+        except OSError as e:
+            logger.warning("No se pudo guardar el perfil: %s", e)
+    return response
+
+
+def metrics_endpoint() -> Response:
+    """Métricas en formato de exposición de Prometheus."""
+    return Response(generate_latest(REGISTRY), media_type=CONTENT_TYPE_LATEST)
@@ -0,0 +1,68 @@
+"""Recarga de cachés de la API cuando termina una importación (LISTEN/NOTIFY).
+
+Cada worker abre una conexión dedicada con LISTEN sobre el canal de
+importaciones del scheduler y, al recibir un aviso, ejecuta la recarga en un
+hilo de fondo. Si la conexión se pierde, se reabre con espera creciente.
+"""
+
+import logging
+import select
+import threading
+from collections.abc import Callable
+
+from sqlalchemy.engine import Engine
+
+logger = logging.getLogger(__name__)
+
+POLL_SECONDS = 5.0  # Cada cuánto se revisa la señal de parada
+MAX_BACKOFF_SECONDS = 60.0
+
+
+class ImportListener(threading.Thread):
+    """Hilo que escucha un canal de PostgreSQL y llama a `on_notify(payload)` por cada aviso."""
+
+    def __init__(self, engine: Engine, channel: str, on_notify: Callable[[str], None]):
+        super().__init__(name=f"listen-{channel}", daemon=True)
+        self.engine = engine
+        self.channel = channel
+        self.on_notify = on_notify
+        self._stop_event = threading.Event()
+
+    def stop(self) -> None:
+        """Pide al hilo que termine (como mucho tras POLL_SECONDS)."""
+        self._stop_event.set()
+
+    def run(self) -> None:
+        backoff = 1.0
+        while not self._stop_event.is_set():
+            try:
+                self._listen()
+                backoff = 1.0
+            except Exception as e:
+                logger.warning("LISTEN %s interrumpido (%s): reintentando en %.0fs", self.channel, e, backoff)
+                self._stop_event.wait(backoff)
+                backoff = min(backoff * 2, MAX_BACKOFF_SECONDS)
+
+    def _listen(self) -> None:
+        # Conexión fuera del pool: queda ocupada mientras el hilo escucha
+        pooled = self.engine.raw_connection()
+        pooled.detach()
+        conn = pooled.dbapi_connection
+        try:
+            conn.autocommit = True
+            with conn.cursor() as cursor:
+                cursor.execute(f'LISTEN "{self.channel}"')
+            logger.info("Escuchando avisos de importación en el canal %s", self.channel)
+
+            while not self._stop_event.is_set():
+                if select.select([conn], [], [], POLL_SECONDS) == ([], [], []):
+                    continue
+                conn.poll()
+                while conn.notifies:
+                    notify = conn.notifies.pop(0)
+                    try:
+                        self.on_notify(notify.payload)
+                    except Exception as e:
+                        logger.exception("Error recargando cachés tras la importación: %s", e)
+        finally:
+            conn.close()
@@ -0,0 +1,23 @@
+"""Ruta rápida de serialización JSON (orjson) para listados y perfiles.
+
+Con `FAST_JSON=true`, los endpoints que pasan su resultado por `fast_json`
+devuelven una `ORJSONResponse` de FastAPI ya serializada: FastAPI no valida el
+contenido contra `response_model` (los TypedDict de `schemas.py`, que quedan
+para el esquema OpenAPI) ni lo recorre con `jsonable_encoder`. Los datos deben
+ser tipos JSON nativos (los endpoints leen tuplas, no entidades ORM).
+"""
+
+from typing import TypeVar
+
+from fastapi.responses import ORJSONResponse
+
+from src.config import get_settings
+
+T = TypeVar("T")
+
+
+def fast_json(content: T) -> T | ORJSONResponse:
+    """Envuelve el resultado de un endpoint en ORJSONResponse si FAST_JSON está activo."""
+    if get_settings().fast_json:
+        return ORJSONResponse(content)
+    return content
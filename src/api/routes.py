@@ -1,17 +1,40 @@
 """Rutas de la API REST."""
 
+import time
+from datetime import date
+from typing import Literal
+
 from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import StreamingResponse
 from sqlalchemy import select
 from sqlalchemy.orm import Session
 
+from src.api.metrics import ProfiledRoute, observe_upstream
+from src.api.responses import fast_json
+from src.api.schemas import BulkProgress, PlayerList, PlayerProfile, PlayerSearch
 from src.database import get_db_session
-from src.models import Player
-from src.scrapers.fide_stats import fetch_player_stats
+from src.models import PLAYER_COLUMNS, Player
+from src.services.bulk_export import (
+    MEDIA_TYPES,
+    ExportFormat,
+    history_export_query,
+    players_export_query,
+    stream_rows,
+)
 from src.services.calculations import get_calculation_example
-from src.services.progress import get_player_progress
-from src.services.rankings import get_player_rankings
+from src.services.federations import get_federation_stats
+from src.services.leaderboards import AGE_BRACKETS, LEADERBOARD_SIZE, get_leaderboard, get_movers, segment_key
+from src.services.player_store import get_player_store
+from src.services.progress import MAX_BULK_PLAYERS, get_bulk_progress, get_player_progress, month_start
+from src.services.rank_history import get_rank_history
+from src.services.rankings import countries_in_continent, country_continent, get_player_rankings
+from src.services.search import search_players
+
+router = APIRouter(prefix="/players", tags=["players"], route_class=ProfiledRoute)
+leaderboards_router = APIRouter(prefix="/leaderboards", tags=["leaderboards"], route_class=ProfiledRoute)
+federations_router = APIRouter(prefix="/federations", tags=["federations"], route_class=ProfiledRoute)
 
-router = APIRouter(prefix="/players", tags=["players"])
+RatingType = Literal["standard", "rapid", "blitz"]
 
 
 def get_db():
@@ -20,7 +43,7 @@ def get_db():
         yield session
 
 
-@router.get("", response_model=dict)
+@router.get("", response_model=PlayerList)
 def list_players(
     skip: int = Query(0, ge=0),
     limit: int = Query(50, ge=1, le=500),
@@ -36,7 +59,13 @@ def list_players(
     - **country**: Filtrar por código de federación (ej: ESP, USA)
     - **min_rating**: Filtrar por rating mínimo
     """
-    stmt = select(Player)
+    store = get_player_store()
+    if store is not None:
+        players = store.list_players(skip, limit, country.upper() if country else None, min_rating)
+        return fast_json({"total": len(players), "skip": skip, "limit": limit, "players": players})
+
+    # Tuplas en lugar de entidades ORM: sin identity map ni estado por fila
+    stmt = select(*PLAYER_COLUMNS)
     if country:
         stmt = stmt.where(Player.country == country.upper())
     if min_rating is not None:
@@ -44,16 +73,97 @@ def list_players(
     stmt = stmt.order_by(Player.rating.desc().nullslast(), Player.fideid)
     stmt = stmt.offset(skip).limit(limit)
 
-    players = list(session.scalars(stmt).all())
-    return {
+    players = [row._asdict() for row in session.execute(stmt)]
+    return fast_json({
         "total": len(players),
         "skip": skip,
         "limit": limit,
-        "players": [p.to_dict() for p in players],
-    }
+        "players": players,
+    })
+
+
+@router.get("/search", response_model=PlayerSearch)
+def search_players_endpoint(
+    q: str = Query(..., min_length=2, max_length=100, description="Nombre o parte del nombre"),
+    country: str | None = Query(None, min_length=2, max_length=3),
+    title: str | None = Query(None, max_length=10, description="Código de título FIDE (ej: GM, IM, WGM; sin distinguir mayúsculas)"),
+    limit: int = Query(20, ge=1, le=100),
+    session: Session = Depends(get_db),
+):
+    """
+    Busca jugadores por nombre (sin distinguir acentos ni mayúsculas).
+
+    Admite prefijos ("carlsen m"), orden libre ("magnus carlsen") y errores
+    tipográficos ("carlsn"). Filtros opcionales por federación y título.
+    """
+    players = search_players(session, q, country=country, title=title, limit=limit)
+    return {"query": q, "total": len(players), "players": players}
+
+
+def _export_response(stmt, fmt: ExportFormat, filename: str) -> StreamingResponse:
+    return StreamingResponse(
+        stream_rows(stmt, fmt),
+        media_type=MEDIA_TYPES[fmt],
+        headers={"Content-Disposition": f'attachment; filename="{filename}.{fmt}"'},
+    )
+
+
+@router.get("/export", response_class=StreamingResponse)
+def export_players(
+    format: ExportFormat = Query("ndjson", description="ndjson (un objeto JSON por línea) o csv"),
+    country: str | None = Query(None, min_length=2, max_length=3),
+    min_rating: int | None = Query(None, ge=0, le=3000),
+):
+    """
+    Descarga todos los jugadores que cumplen los filtros en una sola respuesta.
+
+    Se envía en streaming (con gzip si el cliente lo acepta), en el mismo orden
+    que `GET /players` y con los mismos campos, sin paginar.
+    """
+    stmt = players_export_query(country, min_rating)
+    return _export_response(stmt, format, f"players_{country.upper()}" if country else "players")
+
+
+@router.get("/history/export", response_class=StreamingResponse)
+def export_history(
+    format: ExportFormat = Query("ndjson", description="ndjson (un objeto JSON por línea) o csv"),
+    country: str | None = Query(None, min_length=2, max_length=3),
+    since: date | None = Query(None, description="Primer periodo a incluir (YYYY-MM-DD)"),
+):
+    """
+    Descarga el historial de ratings (fideid, period, rating, rapid_rating, blitz_rating) en streaming.
 
+    Ordenado por jugador y periodo. Requiere haber ejecutado el import de historial.
+    """
+    stmt = history_export_query(country, since)
+    return _export_response(stmt, format, f"history_{country.upper()}" if country else "history")
+
+
+@router.get("/progress", response_model=BulkProgress)
+def get_bulk_progress_endpoint(
+    fideid: list[int] = Query(..., description="IDs FIDE (repetir el parámetro: ?fideid=1&fideid=2)"),
+    start: date | None = Query(None, description="Primer periodo (YYYY-MM-DD). Por defecto hace 23 meses"),
+    end: date | None = Query(None, description="Último periodo (YYYY-MM-DD). Por defecto el mes actual"),
+    session: Session = Depends(get_db),
+):
+    """
+    Evolución del rating de varios jugadores (club, selección) en una sola petición.
 
-@router.get("/{fideid}", response_model=dict)
+    Respuesta columnar: `periods` una vez y, por jugador, arrays `rating`,
+    `rapid_rating` y `blitz_rating` alineados con `periods` (null si falta el periodo).
+    """
+    if len(fideid) > MAX_BULK_PLAYERS:
+        raise HTTPException(status_code=400, detail=f"Máximo {MAX_BULK_PLAYERS} jugadores por petición")
+    start = (start or month_start(23)).replace(day=1)
+    end = (end or month_start(0)).replace(day=1)
+    if start > end:
+        raise HTTPException(status_code=400, detail="start debe ser anterior o igual a end")
+
+    progress = get_bulk_progress(session, fideid, start, end)
+    return fast_json({"start": start.isoformat(), "end": end.isoformat(), **progress})
+
+
+@router.get("/{fideid}", response_model=PlayerProfile)
 def get_player(fideid: int, session: Session = Depends(get_db)):
     """
     Obtiene un jugador por su ID FIDE con perfil completo.
@@ -61,14 +171,23 @@ def get_player(fideid: int, session: Session = Depends(get_db)):
     Incluye datos personales, ratings (standard/rapid/blitz), títulos (FIDE, FOA)
     y rankings (mundial, nacional, continental) para activos y todos.
     """
-    stmt = select(Player).where(Player.fideid == fideid)
-    player = session.scalar(stmt)
+    store = get_player_store()
+    if store is not None:
+        row = store.find(fideid)
+        if row is None:
+            raise HTTPException(status_code=404, detail="Jugador no encontrado")
+        result = store.to_dict(row)
+        result["rankings"] = store.rankings(row)
+        return fast_json(result)
+
+    stmt = select(*PLAYER_COLUMNS).where(Player.fideid == fideid)
+    player = session.execute(stmt).first()
     if not player:
         raise HTTPException(status_code=404, detail="Jugador no encontrado")
 
-    result = player.to_dict()
+    result = player._asdict()
     result["rankings"] = get_player_rankings(session, player)
-    return result
+    return fast_json(result)
 
 
 @router.get("/{fideid}/calculations", response_model=dict)
@@ -118,6 +237,29 @@ def get_player_progress_endpoint(
     return {"player": player.to_dict(), "progress": history}
 
 
+@router.get("/{fideid}/rank-history", response_model=dict)
+def get_rank_history_endpoint(
+    fideid: int,
+    rating_type: RatingType = Query("standard", description="standard, rapid o blitz"),
+    months: int = Query(24, ge=1, le=120, description="Meses de historial a retornar"),
+    session: Session = Depends(get_db),
+):
+    """
+    Evolución del ranking mundial, nacional y continental (entre jugadores activos).
+
+    Respuesta columnar: `periods` y, alineados con él, `rating`, `world`,
+    `national` y `continent` (null si el jugador estaba inactivo o sin rating).
+    Requiere haber ejecutado el import de historial.
+    """
+    stmt = select(Player).where(Player.fideid == fideid)
+    player = session.scalar(stmt)
+    if not player:
+        raise HTTPException(status_code=404, detail="Jugador no encontrado")
+
+    history = get_rank_history(session, fideid, rating_type, months)
+    return {"player": player.to_dict(), "rating_type": rating_type, **history}
+
+
 @router.get("/{fideid}/stats", response_model=dict)
 def get_player_stats_endpoint(fideid: int, session: Session = Depends(get_db)):
     """
@@ -130,10 +272,122 @@ def get_player_stats_endpoint(fideid: int, session: Session = Depends(get_db)):
     if not player:
         raise HTTPException(status_code=404, detail="Jugador no encontrado")
 
+    # Import diferido: el cliente de FIDE (httpx) solo se carga si se usa este endpoint
+    from src.scrapers.fide_stats import fetch_player_stats
+
+    start = time.perf_counter()
     stats = fetch_player_stats(fideid)
+    observe_upstream("fide_stats", time.perf_counter() - start, stats is not None)
     if stats is None:
         raise HTTPException(
             status_code=503,
             detail="No se pudieron obtener estadísticas de FIDE. El jugador puede no tener partidas registradas.",
         )
     return {"player": player.to_dict(), "stats": stats}
+
+
+def _leaderboard_scope(country: str | None, continent: str | None) -> tuple[str, str]:
+    """Resuelve el ámbito (scope, scope_code) a partir de los filtros country/continent."""
+    if country and continent:
+        raise HTTPException(status_code=400, detail="Usa country o continent, no ambos")
+    if country:
+        return "country", country.upper()
+    if continent:
+        return "continent", continent
+    return "world", ""
+
+
+@leaderboards_router.get("", response_model=dict)
+def get_leaderboard_endpoint(
+    rating_type: RatingType = Query("standard", description="standard, rapid o blitz"),
+    country: str | None = Query(None, min_length=2, max_length=3),
+    continent: str | None = Query(None, description="Continente (ej: Europe, Americas)"),
+    sex: Literal["M", "F"] | None = Query(None),
+    age: str | None = Query(None, description=f"Tramo de edad: {', '.join(AGE_BRACKETS)}"),
+    title: str | None = Query(None, max_length=10, description="Código de título FIDE (ej: GM, IM, WGM; sin distinguir mayúsculas)"),
+    limit: int = Query(LEADERBOARD_SIZE, ge=1, le=LEADERBOARD_SIZE),
+    session: Session = Depends(get_db),
+):
+    """
+    Clasificación top N de jugadores activos (precalculada en cada importación).
+
+    - **rating_type**: standard, rapid o blitz
+    - **country** / **continent**: Ámbito (por defecto mundial)
+    - **sex** / **age** / **title**: Segmento opcional (solo uno a la vez)
+    """
+    scope, scope_code = _leaderboard_scope(country, continent)
+    if sum(f is not None for f in (sex, age, title)) > 1:
+        raise HTTPException(status_code=400, detail="Usa solo uno de sex, age o title")
+    if age is not None and age not in AGE_BRACKETS:
+        raise HTTPException(status_code=400, detail=f"Tramo de edad no válido: {age}")
+
+    segment = segment_key(sex=sex, age=age, title=title)
+    players = get_leaderboard(session, rating_type, scope, scope_code, segment, limit)
+    return {
+        "rating_type": rating_type,
+        "scope": scope,
+        "scope_code": scope_code or None,
+        "segment": segment,
+        "players": players,
+    }
+
+
+@leaderboards_router.get("/movers", response_model=dict)
+def get_movers_endpoint(
+    rating_type: RatingType = Query("standard", description="standard, rapid o blitz"),
+    country: str | None = Query(None, min_length=2, max_length=3),
+    continent: str | None = Query(None, description="Continente (ej: Europe, Americas)"),
+    direction: Literal["up", "down"] = Query("up", description="up: mayores subidas, down: mayores bajadas"),
+    limit: int = Query(LEADERBOARD_SIZE, ge=1, le=LEADERBOARD_SIZE),
+    session: Session = Depends(get_db),
+):
+    """
+    Mayores subidas o bajadas de rating entre los dos últimos periodos del historial.
+
+    Requiere haber ejecutado el import de historial: python -m scripts.run_import_history
+    """
+    scope, scope_code = _leaderboard_scope(country, continent)
+    movers = get_movers(session, rating_type, scope, scope_code, direction, limit)
+    return {
+        "rating_type": rating_type,
+        "scope": scope,
+        "scope_code": scope_code or None,
+        "direction": direction,
+        **movers,
+    }
+
+
+@federations_router.get("", response_model=dict)
+def list_federations(
+    rating_type: RatingType = Query("standard", description="standard, rapid o blitz"),
+    scope: Literal["country", "continent", "world"] = Query("country", description="Federaciones, continentes o mundial"),
+    continent: str | None = Query(None, description="Solo federaciones de este continente (ej: Europe)"),
+    session: Session = Depends(get_db),
+):
+    """
+    Estadísticas agregadas por federación o continente (precalculadas en cada importación).
+
+    Jugadores con rating > 0 en el tipo indicado: activos, por sexo, por título
+    y juniors (sub-20), percentiles del rating y media del top 10 de activos.
+    """
+    codes = None
+    if continent is not None:
+        if scope != "country":
+            raise HTTPException(status_code=400, detail="continent solo filtra federaciones (scope=country)")
+        codes = countries_in_continent(continent)
+    stats = get_federation_stats(session, rating_type, scope, codes)
+    return {"rating_type": rating_type, "scope": scope, "total": len(stats), "federations": stats}
+
+
+@federations_router.get("/{code}", response_model=dict)
+def get_federation(code: str, session: Session = Depends(get_db)):
+    """Estadísticas de una federación (ej: ESP) en standard, rapid y blitz."""
+    code = code.upper()
+    stats = {
+        rating_type: rows[0]
+        for rating_type in ("standard", "rapid", "blitz")
+        if (rows := get_federation_stats(session, rating_type, "country", [code]))
+    }
+    if not stats:
+        raise HTTPException(status_code=404, detail="Federación no encontrada")
+    return {"federation": code, "continent": country_continent().get(code), "stats": stats}
@@ -0,0 +1,91 @@
+"""Formas de las respuestas de listados y perfiles de jugador.
+
+TypedDict en lugar de modelos pydantic: los servicios y el almacén en memoria
+ya construyen diccionarios con estas claves, que orjson serializa sin copia
+intermedia. Con `FAST_JSON=true` la respuesta sale tal cual por `fast_json` y
+estos tipos solo documentan el esquema (OpenAPI); sin él, FastAPI valida el
+diccionario contra ellos.
+"""
+
+from typing_extensions import TypedDict  # pydantic solo admite typing.TypedDict desde Python 3.12
+
+
+class PlayerData(TypedDict):
+    """Campos de un jugador (mismas claves y orden que Player.to_dict())."""
+
+    fideid: int
+    name: str
+    country: str
+    sex: str | None
+    title: str | None
+    rating: int | None
+    games: int | None
+    rapid_rating: int | None
+    rapid_games: int | None
+    blitz_rating: int | None
+    blitz_games: int | None
+    birthday: int | None
+    flag: str | None
+    foa_title: str | None
+    foa_rating: int | None
+
+
+class ScopeRanking(TypedDict):
+    """Puesto entre activos y entre todos, y tamaño del ámbito (null sin continente)."""
+
+    rank_active: int | None
+    rank_all: int | None
+    total_active: int | None
+    total_all: int | None
+
+
+class PlayerRankings(TypedDict):
+    world: ScopeRanking
+    national: ScopeRanking
+    continent: ScopeRanking
+
+
+class PlayerProfile(PlayerData):
+    """GET /players/{fideid}."""
+
+    rankings: PlayerRankings
+
+
+class PlayerList(TypedDict):
+    """GET /players."""
+
+    total: int
+    skip: int
+    limit: int
+    players: list[PlayerData]
+
+
+class SearchResult(PlayerData):
+    score: float
+
+
+class PlayerSearch(TypedDict):
+    """GET /players/search."""
+
+    query: str
+    total: int
+    players: list[SearchResult]
+
+
+class RatingSeries(TypedDict):
+    """Ratings de un jugador alineados con `periods` (null si falta el periodo)."""
+
+    fideid: int
+    rating: list[int | None]
+    rapid_rating: list[int | None]
+    blitz_rating: list[int | None]
+
+
+class BulkProgress(TypedDict):
+    """GET /players/progress."""
+
+    start: str
+    end: str
+    periods: list[str]
+    players: list[RatingSeries]
+    missing: list[int]
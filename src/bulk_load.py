@@ -0,0 +1,173 @@
+"""Carga masiva en tabla sombra e intercambio atómico (importación sin bloquear la API).
+
+Flujo para una tabla `T` (ej: players):
+
+1. `create_shadow_table`: crea `T_new` vacía (LIKE T: columnas, NOT NULL y
+   defaults, incluida la secuencia del id) con solo los índices únicos del
+   modelo (el de fideid), que el upsert necesita durante la carga.
+2. Se carga `T_new` con upsert por fideid: un fideid repetido en la lista
+   actualiza la fila en lugar de hacer fallar el índice único al final.
+3. `build_shadow_indexes`: clave primaria e índices secundarios del modelo,
+   creados una sola vez tras la carga, y ANALYZE.
+4. `swap_shadow_table`: en una transacción corta renombra `T` -> `T_old` y
+   `T_new` -> `T`, traspasa la secuencia, elimina `T_old` y devuelve a los
+   índices sus nombres definitivos.
+
+Mientras dura la carga, la API sigue leyendo `T` sin contención.
+
+Modo bulk sobre la propia tabla (primera importación o reconstrucción):
+`drop_secondary_indexes` elimina los índices no únicos (el único de fideid se
+mantiene para el upsert) y `rebuild_indexes` los recrea al final. En ambos
+modos `tune_session` ajusta la sesión para carga masiva.
+"""
+
+import logging
+
+from sqlalchemy import Index, MetaData, Table, text
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.orm import Session
+from sqlalchemy.schema import CreateIndex
+
+from src.models import Base
+
+logger = logging.getLogger(__name__)
+
+SHADOW_SUFFIX = "_new"
+SWAP_LOCK_TIMEOUT = "10s"  # Espera máxima del bloqueo exclusivo durante el intercambio
+
+# Ajustes de sesión para carga masiva (SET LOCAL: solo duran la transacción)
+BULK_SESSION_SETTINGS = {
+    "synchronous_commit": "off",
+    "maintenance_work_mem": "1GB",
+    "max_parallel_maintenance_workers": "4",
+}
+
+
+def _model_table(name: str) -> Table:
+    """Tabla del modelo SQLAlchemy con ese nombre."""
+    return Base.metadata.tables[name]
+
+
+def shadow_name(name: str) -> str:
+    """Nombre de la tabla sombra de `name`."""
+    return f"{name}{SHADOW_SUFFIX}"
+
+
+def _pkey_name(name: str) -> str:
+    """Nombre por defecto de la clave primaria en PostgreSQL."""
+    return f"{name}_pkey"
+
+
+def index_ddl(
+    name: str,
+    target: str | None = None,
+    suffix: str = "",
+    secondary_only: bool = False,
+    unique_only: bool = False,
+) -> list[tuple[str, str]]:
+    """
+    Genera el DDL de los índices del modelo `name` sobre la tabla `target`.
+
+    Args:
+        name: Tabla del modelo (ej: players).
+        target: Tabla donde crear los índices. Por defecto, la del modelo.
+        suffix: Sufijo para los nombres de índice (evita choques con los existentes).
+        secondary_only: Si True, solo los índices no únicos.
+        unique_only: Si True, solo los índices únicos.
+
+    Returns:
+        Lista de (nombre de índice, sentencia CREATE INDEX IF NOT EXISTS).
+    """
+    table = _model_table(name)
+    copy = table.to_metadata(MetaData(), name=target or name)
+    result = []
+    for index in sorted(table.indexes, key=lambda i: i.name):
+        if secondary_only and index.unique:
+            continue
+        if unique_only and not index.unique:
+            continue
+        columns = [copy.c[c.name] for c in index.columns]
+        new_index = Index(f"{index.name}{suffix}", *columns, unique=index.unique, **index.dialect_kwargs)
+        ddl = str(CreateIndex(new_index, if_not_exists=True).compile(dialect=postgresql.dialect()))
+        result.append((index.name, ddl))
+    return result
+
+
+def tune_session(session: Session) -> None:
+    """Aplica BULK_SESSION_SETTINGS a la transacción actual."""
+    for setting, value in BULK_SESSION_SETTINGS.items():
+        session.execute(text(f"SET LOCAL {setting} = '{value}'"))
+
+
+def drop_secondary_indexes(session: Session, name: str) -> None:
+    """
+    Elimina los índices no únicos de `name` para cargar sin mantenerlos fila a fila.
+
+    Toma un bloqueo exclusivo sobre la tabla hasta el final de la transacción:
+    pensado para la primera importación o reconstrucciones completas.
+    """
+    for index_name, _ in index_ddl(name, secondary_only=True):
+        session.execute(text(f"DROP INDEX IF EXISTS {index_name}"))
+    logger.info("Índices secundarios de %s eliminados", name)
+
+
+def rebuild_indexes(session: Session, name: str) -> None:
+    """Recrea los índices del modelo que falten en `name` (CREATE INDEX en paralelo) y la analiza."""
+    for index_name, ddl in index_ddl(name, secondary_only=True):
+        logger.info("Creando índice %s", index_name)
+        session.execute(text(ddl))
+    session.execute(text(f"ANALYZE {name}"))
+
+
+def create_shadow_table(session: Session, name: str) -> str:
+    """
+    Crea (o recrea) la tabla sombra vacía. Retorna su nombre.
+
+    Solo lleva los índices únicos del modelo (ON CONFLICT los necesita); el
+    resto los crea `build_shadow_indexes` tras la carga.
+    """
+    shadow = shadow_name(name)
+    session.execute(text(f"DROP TABLE IF EXISTS {shadow}"))
+    session.execute(text(f"CREATE TABLE {shadow} (LIKE {name} INCLUDING DEFAULTS)"))
+    for _, ddl in index_ddl(name, target=shadow, suffix=SHADOW_SUFFIX, unique_only=True):
+        session.execute(text(ddl))
+    logger.info("Tabla sombra %s creada", shadow)
+    return shadow
+
+
+def build_shadow_indexes(session: Session, name: str) -> None:
+    """Crea la clave primaria y los índices del modelo que falten sobre la tabla sombra cargada, y la analiza."""
+    shadow = shadow_name(name)
+    pkey_columns = ", ".join(c.name for c in _model_table(name).primary_key.columns)
+    session.execute(
+        text(f"ALTER TABLE {shadow} ADD CONSTRAINT {_pkey_name(shadow)} PRIMARY KEY ({pkey_columns})")
+    )
+    for index_name, ddl in index_ddl(name, target=shadow, suffix=SHADOW_SUFFIX):
+        logger.info("Creando índice %s%s", index_name, SHADOW_SUFFIX)
+        session.execute(text(ddl))
+    session.execute(text(f"ANALYZE {shadow}"))
+
+
+def swap_shadow_table(session: Session, name: str) -> None:
+    """
+    Sustituye `name` por su tabla sombra en una transacción corta.
+
+    Debe ejecutarse en una sesión propia: el commit de la sesión publica el
+    intercambio. Si el bloqueo no se obtiene en SWAP_LOCK_TIMEOUT, falla sin
+    modificar la tabla actual.
+    """
+    shadow = shadow_name(name)
+    old = f"{name}_old"
+    id_column = next(iter(_model_table(name).primary_key.columns)).name
+
+    session.execute(text(f"SET LOCAL lock_timeout = '{SWAP_LOCK_TIMEOUT}'"))
+    session.execute(text(f"LOCK TABLE {name} IN ACCESS EXCLUSIVE MODE"))
+    session.execute(text(f"ALTER TABLE {name} RENAME TO {old}"))
+    session.execute(text(f"ALTER TABLE {shadow} RENAME TO {name}"))
+    # La secuencia del id pertenece a la tabla antigua: traspasarla antes del DROP
+    session.execute(text(f"ALTER SEQUENCE {name}_{id_column}_seq OWNED BY {name}.{id_column}"))
+    session.execute(text(f"DROP TABLE {old}"))
+    session.execute(text(f"ALTER TABLE {name} RENAME CONSTRAINT {_pkey_name(shadow)} TO {_pkey_name(name)}"))
+    for index_name, _ in index_ddl(name):
+        session.execute(text(f"ALTER INDEX {index_name}{SHADOW_SUFFIX} RENAME TO {index_name}"))
+    logger.info("Tabla %s sustituida por %s", name, shadow)
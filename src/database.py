@@ -1,17 +1,23 @@
 """Conexión y sesión de base de datos."""
 
-from collections.abc import Generator
+import json
+from collections.abc import Generator, Iterable
 from contextlib import contextmanager
+from functools import lru_cache
 
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, text
 from sqlalchemy.orm import Session, sessionmaker
 
 from src.config import get_settings
-from src.models import Base
+from src.migrations import migrate
 
+# Canal LISTEN/NOTIFY por el que run_import avisa a la API de una importación completada
+IMPORT_CHANNEL = "fide_import"
 
+
+@lru_cache
 def get_engine():
-    """Crea el engine de SQLAlchemy."""
+    """Engine de SQLAlchemy del proceso (cacheado: un único pool de conexiones)."""
     settings = get_settings()
     return create_engine(
         settings.database_url,
@@ -21,17 +27,26 @@ def get_engine():
     )
 
 
+@lru_cache
 def get_session_factory():
-    """Crea la fábrica de sesiones."""
+    """Fábrica de sesiones sobre el engine del proceso (cacheada)."""
     engine = get_engine()
     return sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 
 def init_db(engine=None):
-    """Inicializa las tablas en la base de datos."""
+    """Prepara el esquema aplicando las migraciones pendientes (ver src/migrations.py)."""
     if engine is None:
         engine = get_engine()
-    Base.metadata.create_all(bind=engine)
+    migrate(engine)
+
+
+def notify_import(session: Session, payload: dict) -> None:
+    """Avisa por IMPORT_CHANNEL de una importación completada (se entrega al hacer commit)."""
+    session.execute(
+        text("SELECT pg_notify(:channel, :payload)"),
+        {"channel": IMPORT_CHANNEL, "payload": json.dumps(payload)},
+    )
 
 
 @contextmanager
@@ -47,3 +62,20 @@ def get_db_session() -> Generator[Session, None, None]:
         raise
     finally:
         session.close()
+
+
+def execute_values(session: Session, sql: str, rows: Iterable[tuple], page_size: int = 5000) -> None:
+    """
+    Ejecuta un INSERT ... VALUES %s con filas como tuplas (psycopg2 execute_values).
+
+    Usa la conexión de la sesión, por lo que participa en su transacción. Evita
+    construir un diccionario por fila como requiere `session.execute()`.
+    """
+    # Import diferido: solo lo necesitan las importaciones, no la API
+    from psycopg2.extras import execute_values as pg_execute_values
+
+    cursor = session.connection().connection.cursor()
+    try:
+        pg_execute_values(cursor, sql, rows, page_size=page_size)
+    finally:
+        cursor.close()
@@ -1,51 +1,81 @@
-"""Descarga de datos XML oficiales desde FIDE."""
+"""Descarga de las listas oficiales (XML o TXT) desde FIDE."""
 
 import io
 import logging
 import zipfile
 
-import httpx
-
 from src.config import get_settings
+from src.parser import PARSERS, detect_format
 
 logger = logging.getLogger(__name__)
 
 
-def download_fide_xml(period: str | None = None) -> bytes:
+def extract_fide_list(zip_content: bytes) -> tuple[bytes, str]:
+    """
+    Extrae la lista (XML o TXT) de un ZIP de FIDE y detecta su formato.
+
+    Raises:
+        zipfile.BadZipFile: Si el contenido no es un ZIP válido.
+        ValueError: Si el ZIP no contiene una lista XML ni TXT.
+    """
+    with zipfile.ZipFile(io.BytesIO(zip_content), "r") as zf:
+        # El ZIP puede contener players_list_xml_foa.xml, players_list_foa.txt o similar
+        names = [n for n in zf.namelist() if n.rsplit(".", 1)[-1].lower() in PARSERS]
+        if not names:
+            raise ValueError("No se encontró archivo XML ni TXT en el ZIP")
+        name = names[0]
+        content = zf.read(name)
+
+    fmt = detect_format(name)
+    logger.info("Lista extraída: %s (%s, %d bytes)", name, fmt, len(content))
+    return content, fmt
+
+
+def download_fide_zip(period: str | None = None, url: str | None = None) -> bytes:
     """
-    Descarga el archivo ZIP de FIDE y retorna el contenido XML descomprimido.
+    Descarga el archivo ZIP de FIDE sin descomprimir.
 
     Args:
         period: Fecha opcional en formato YYYY-MM-DD para listas históricas.
-
-    Returns:
-        Contenido del archivo XML como bytes.
+        url: URL del ZIP. Por defecto `Settings.fide_xml_url`.
 
     Raises:
         httpx.HTTPError: Si la descarga falla.
-        zipfile.BadZipFile: Si el archivo descargado no es un ZIP válido.
     """
-    settings = get_settings()
-    url = settings.fide_xml_url
+    if url is None:
+        url = get_settings().fide_xml_url
     if period:
         url = f"{url}?period={period}" if "?" not in url else f"{url}&period={period}"
 
     logger.info("Descargando datos FIDE desde %s", url)
 
+    # Import diferido: importar el importer (o la API) no carga httpx hasta la primera descarga
+    import httpx
+
     with httpx.Client(timeout=120.0, follow_redirects=True) as client:
         response = client.get(url)
         response.raise_for_status()
 
-    zip_content = response.content
-    logger.info("Descargado %d bytes, descomprimiendo...", len(zip_content))
+    logger.info("Descargado %d bytes", len(response.content))
+    return response.content
+
+
+def download_fide_list(period: str | None = None, url: str | None = None) -> tuple[bytes, str]:
+    """
+    Descarga el archivo ZIP de FIDE y retorna la lista descomprimida y su formato.
+
+    El formato ('xml' o 'txt') se detecta por el nombre del archivo dentro del ZIP.
+
+    Args:
+        period: Fecha opcional en formato YYYY-MM-DD para listas históricas.
+        url: URL del ZIP. Por defecto `Settings.fide_xml_url`.
+
+    Returns:
+        Tupla (contenido en bytes, formato) para `parse_players(content, fmt)`.
+
+    Raises:
+        httpx.HTTPError: Si la descarga falla.
+        zipfile.BadZipFile: Si el archivo descargado no es un ZIP válido.
+    """
+    return extract_fide_list(download_fide_zip(period=period, url=url))
 
-    with zipfile.ZipFile(io.BytesIO(zip_content), "r") as zf:
-        # El ZIP puede contener players_list_xml_foa.xml o similar
-        xml_names = [n for n in zf.namelist() if n.endswith(".xml")]
-        if not xml_names:
-            raise ValueError("No se encontró archivo XML en el ZIP")
-        xml_name = xml_names[0]
-        xml_content = zf.read(xml_name)
-
-    logger.info("XML extraído: %s (%d bytes)", xml_name, len(xml_content))
-    return xml_content
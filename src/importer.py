@@ -1,77 +1,78 @@
 """Orquestador del pipeline: descarga, parseo, importación a DB y exportación."""
 
 import logging
-from collections.abc import Iterator
+from collections.abc import Iterable, Iterator
+from datetime import date
+from operator import attrgetter
+from typing import TypeVar
 
 from sqlalchemy import select
-from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.orm import Session
 
-from src.database import get_db_session, get_engine, init_db
-from src.downloader import download_fide_xml
+from src.bulk_load import (
+    build_shadow_indexes,
+    create_shadow_table,
+    drop_secondary_indexes,
+    rebuild_indexes,
+    shadow_name,
+    swap_shadow_table,
+    tune_session,
+)
+from src.config import get_settings
+from src.database import execute_values, get_db_session, get_engine, init_db, notify_import
+from src.downloader import download_fide_zip, extract_fide_list
 from src.exporter import export_to_csv, export_to_json
+from src.importer_history import batch_upsert_history, list_period
+from src.instrumentation import ImportMetrics
 from src.models import Player
-from src.parser import parse_players_xml
+from src.multi_list import iter_combined_players
+from src.parser import PLAYER_FIELDS, PlayerRow, parse_players
+from src.parser_parallel import parse_players_parallel
+from src.pipeline import run_pipeline
+from src.services.federations import rebuild_federation_stats
+from src.services.leaderboards import rebuild_leaderboards, rebuild_movers
+from src.services.player_store import build_player_store
+from src.services.rank_history import rebuild_period_ranks
+from src.services.search import normalize_name
+from src.snapshot import remove_snapshot, write_snapshot
+from src.validation import RowValidator
 
 logger = logging.getLogger(__name__)
 
 BATCH_SIZE = 5000
 EXPORT_LIMIT = 100_000  # Máximo jugadores a exportar (para evitar memoria)
 
+T = TypeVar("T")
 
-def _batch_upsert(session: Session, batch: list[dict]) -> int:
+
+# Columnas cargadas en players: los campos de PlayerRow más el nombre normalizado
+UPSERT_COLUMNS = (*PLAYER_FIELDS, "name_search")
+
+
+def _insert_sql(table: str = "players") -> str:
+    """INSERT ... VALUES %s de las columnas cargadas, con upsert por fideid."""
+    return (
+        f"INSERT INTO {table} ({', '.join(UPSERT_COLUMNS)}) VALUES %s ON CONFLICT (fideid) DO UPDATE SET "
+        + ", ".join(f"{c} = EXCLUDED.{c}" for c in UPSERT_COLUMNS if c != "fideid")
+    )
+
+
+_UPSERT_SQL = _insert_sql()
+
+
+def _batch_upsert(session: Session, batch: list[PlayerRow], sql: str = _UPSERT_SQL) -> int:
     """Inserta o actualiza un batch de jugadores (upsert por fideid)."""
     if not batch:
         return 0
 
-    stmt = pg_insert(Player).values(
-        [
-            {
-                "fideid": p["fideid"],
-                "name": p["name"],
-                "country": p["country"],
-                "sex": p.get("sex"),
-                "title": p.get("title"),
-                "rating": p.get("rating"),
-                "games": p.get("games"),
-                "rapid_rating": p.get("rapid_rating"),
-                "rapid_games": p.get("rapid_games"),
-                "blitz_rating": p.get("blitz_rating"),
-                "blitz_games": p.get("blitz_games"),
-                "birthday": p.get("birthday"),
-                "flag": p.get("flag"),
-                "foa_title": p.get("foa_title"),
-                "foa_rating": p.get("foa_rating"),
-            }
-            for p in batch
-        ]
-    )
-    stmt = stmt.on_conflict_do_update(
-        index_elements=["fideid"],
-        set_={
-            "name": stmt.excluded.name,
-            "country": stmt.excluded.country,
-            "sex": stmt.excluded.sex,
-            "title": stmt.excluded.title,
-            "rating": stmt.excluded.rating,
-            "games": stmt.excluded.games,
-            "rapid_rating": stmt.excluded.rapid_rating,
-            "rapid_games": stmt.excluded.rapid_games,
-            "blitz_rating": stmt.excluded.blitz_rating,
-            "blitz_games": stmt.excluded.blitz_games,
-            "birthday": stmt.excluded.birthday,
-            "flag": stmt.excluded.flag,
-            "foa_title": stmt.excluded.foa_title,
-            "foa_rating": stmt.excluded.foa_rating,
-        },
-    )
-    session.execute(stmt)
+    rows = (row + (normalize_name(row.name),) for row in batch)
+    execute_values(session, sql, rows, page_size=len(batch))
     return len(batch)
 
 
-def _batched(iterator: Iterator[dict], size: int) -> Iterator[list[dict]]:
+def _batched(iterator: Iterable[T], size: int) -> Iterator[list[T]]:
     """Agrupa un iterador en batches del tamaño indicado."""
-    batch: list[dict] = []
+    batch: list[T] = []
     for item in iterator:
         batch.append(item)
         if len(batch) >= size:
@@ -81,10 +82,126 @@ def _batched(iterator: Iterator[dict], size: int) -> Iterator[list[dict]]:
         yield batch
 
 
+def load_players(
+    players: Iterable[PlayerRow],
+    history_period: date | None = None,
+    swap: bool = False,
+    bulk: bool = False,
+    metrics: ImportMetrics | None = None,
+    pipeline: bool = False,
+    loaders: int = 1,
+    validator: RowValidator | None = None,
+) -> int:
+    """
+    Carga jugadores en players.
+
+    Args:
+        players: Jugadores a cargar.
+        history_period: Si se indica, guarda también el snapshot de ese
+            periodo en player_rating_history.
+        swap: Si True, carga en una tabla sombra y la intercambia con players.
+        bulk: Si True, ajusta la sesión para carga masiva y, sin swap,
+            elimina los índices secundarios de players y los recrea al final
+            (bloquea la tabla durante la carga).
+        metrics: Si se indica, acumula ahí los tiempos de las etapas parse,
+            load (con latencia por lote), indexes y swap.
+        pipeline: Si True, parsea en un hilo aparte y escribe los lotes a
+            medida que llegan por una cola acotada (src/pipeline.py).
+        loaders: Con pipeline, conexiones escribiendo en paralelo. Con 1 la
+            carga es una sola transacción (todo o nada); con más, cada
+            conexión confirma su parte al final si ninguna falló, y la
+            preparación (tabla sombra, índices eliminados) se confirma antes.
+        validator: Si se indica, valida cada lote antes de escribirlo y
+            aparta las filas inválidas a su CSV de rechazos (src/validation.py).
+
+    Returns:
+        Total de jugadores cargados.
+    """
+    metrics = metrics or ImportMetrics()
+    # Con swap también upsert: un fideid repetido no debe romper el índice único de la tabla sombra
+    insert_sql = _insert_sql(shadow_name("players")) if swap else _UPSERT_SQL
+    batches = metrics.timed_batches("parse", _batched(players, BATCH_SIZE))
+    if validator is not None:
+        batches = validator.batches(batches, metrics)
+
+    def prepare(session: Session) -> None:
+        if bulk:
+            tune_session(session)
+        if swap:
+            create_shadow_table(session, "players")
+        elif bulk:
+            drop_secondary_indexes(session, "players")
+
+    def write(session: Session, batch: list[PlayerRow]) -> None:
+        with metrics.batch(len(batch)):
+            _batch_upsert(session, batch, insert_sql)
+            if history_period is not None:
+                batch_upsert_history(session, batch, history_period)
+
+    def finish(session: Session) -> None:
+        if swap:
+            with metrics.stage("indexes"):
+                build_shadow_indexes(session, "players")
+        elif bulk:
+            with metrics.stage("indexes"):
+                rebuild_indexes(session, "players")
+
+    if pipeline and loaders > 1:
+        # Cada loader usa su conexión: la preparación y los índices van en transacciones propias
+        with get_db_session() as session:
+            prepare(session)
+        try:
+            total = run_pipeline(
+                batches,
+                write,
+                loaders=loaders,
+                key=attrgetter("fideid"),
+                setup=tune_session if bulk else None,
+            )
+        except Exception:
+            if bulk and not swap:
+                # Los índices secundarios ya se eliminaron: recrearlos aunque la carga falle
+                with get_db_session() as session:
+                    tune_session(session)
+                    finish(session)
+            raise
+        with get_db_session() as session:
+            if bulk:
+                tune_session(session)
+            finish(session)
+    else:
+        with get_db_session() as session:
+            prepare(session)
+            if pipeline:
+                total = run_pipeline(batches, write, session=session)
+            else:
+                total = 0
+                for batch in batches:
+                    write(session, batch)
+                    total += len(batch)
+                    if total % 50000 == 0 or total < 10000:
+                        logger.info("Importados %d jugadores...", total)
+            finish(session)
+
+    if swap:
+        with metrics.stage("swap"), get_db_session() as session:
+            swap_shadow_table(session, "players")
+    return total
+
+
 def run_import(
     period: str | None = None,
     export_json: bool = True,
     export_csv: bool = True,
+    all_lists: bool = False,
+    parse_workers: int = 0,
+    with_history: bool = False,
+    swap: bool = False,
+    bulk: bool = False,
+    export_snapshot: bool = True,
+    pipeline: bool = False,
+    loaders: int = 1,
+    validate: bool = True,
 ) -> dict:
     """
     Ejecuta el pipeline completo: descarga -> parse -> DB -> export.
@@ -93,39 +210,149 @@ def run_import(
         period: Fecha opcional YYYY-MM-DD para listas históricas.
         export_json: Si True, exporta a JSON.
         export_csv: Si True, exporta a CSV.
+        all_lists: Si True, descarga standard, rapid y blitz en paralelo y
+            combina los tres ratings por fideid en una sola carga.
+        parse_workers: Si > 0, parsea la lista en fragmentos con ese número
+            de procesos (no aplica con all_lists).
+        with_history: Si True, guarda también el snapshot del periodo de la
+            lista en player_rating_history en la misma pasada.
+        swap: Si True, carga en una tabla sombra (solo con el índice único
+            de fideid), crea el resto de índices al final y la intercambia
+            con players en una transacción corta. La tabla resultante
+            contiene solo los jugadores de esta lista.
+        bulk: Si True, modo de carga masiva para la primera importación o
+            reconstrucciones: sesión ajustada (synchronous_commit=off,
+            maintenance_work_mem) e índices secundarios creados al final.
+        export_snapshot: Si True, escribe el snapshot binario de jugadores
+            (src/snapshot.py) en EXPORT_PATH para el arranque de la API.
+        pipeline: Si True, parseo y escritura solapados: el parseo corre en
+            un hilo y alimenta una cola acotada de lotes (src/pipeline.py).
+        loaders: Con pipeline, conexiones escribiendo en paralelo (1 = una
+            sola transacción, todo o nada).
+        validate: Si True, valida tipos, longitudes y rangos de cada lote
+            antes de cargarlo; las filas inválidas van a un CSV de rechazos
+            en EXPORT_PATH en lugar de hacer fallar la importación.
 
     Returns:
-        Diccionario con estadísticas: total_imported, json_path, csv_path.
+        Diccionario con estadísticas: total_imported, rejected_rows y
+        rejects_path (si validate), history_period y
+        history_rank_rows (si with_history), leaderboard_rows, mover_rows, federation_rows,
+        json_path, csv_path, snapshot_path,
+        metrics (tiempos, filas/s y memoria por etapa) y report_path.
     """
-    logger.info("Iniciando importación FIDE (period=%s)", period)
+    logger.info("Iniciando importación FIDE (period=%s, all_lists=%s)", period, all_lists)
+    settings = get_settings()
+    metrics = ImportMetrics()
 
-    # 1. Descargar XML
-    xml_content = download_fide_xml(period=period)
+    # 1. Descargar lista XML/TXT (o las tres listas combinadas)
+    if all_lists:
+        # Las descargas ocurren dentro del iterador: cuentan en la etapa parse
+        players = iter_combined_players(period=period)
+    else:
+        with metrics.stage("download") as stage:
+            zip_content = download_fide_zip(period=period)
+            stage.bytes = len(zip_content)
+        with metrics.stage("unzip") as stage:
+            content, fmt = extract_fide_list(zip_content)
+            stage.bytes = len(content)
+        del zip_content
+        if parse_workers > 0:
+            players = (row for rows in parse_players_parallel(content, fmt, parse_workers) for row in rows)
+        else:
+            players = parse_players(content, fmt)
 
     # 2. Inicializar DB
     engine = get_engine()
     init_db(engine)
 
-    total = 0
-    with get_db_session() as session:
-        for batch in _batched(parse_players_xml(xml_content), BATCH_SIZE):
-            _batch_upsert(session, batch)
-            total += len(batch)
-            if total % 50000 == 0 or total < 10000:
-                logger.info("Importados %d jugadores...", total)
+    history_period = list_period(period) if with_history else None
+
+    validator = RowValidator() if validate else None
+    try:
+        total = load_players(
+            players,
+            history_period,
+            swap=swap,
+            bulk=bulk,
+            metrics=metrics,
+            pipeline=pipeline,
+            loaders=loaders,
+            validator=validator,
+        )
+    finally:
+        if validator is not None:
+            validator.close()
+    # players ya cambió: el snapshot anterior no debe servirse aunque este no llegue a escribirse
+    remove_snapshot()
 
     result: dict = {"total_imported": total}
+    if validator is not None:
+        result["rejected_rows"] = validator.rejected
+        result["rejects_path"] = validator.summary()["rejects_path"]
+    if history_period is not None:
+        result["history_period"] = history_period.isoformat()
+
+    # 3. Reconstruir snapshots de clasificaciones (y rankings del periodo del historial)
+    with metrics.stage("leaderboards") as stage, get_db_session() as session:
+        if history_period is not None:
+            result["history_rank_rows"] = rebuild_period_ranks(session, history_period)
+        result["leaderboard_rows"] = rebuild_leaderboards(session)
+        result["mover_rows"] = rebuild_movers(session)
+        stage.rows = result["leaderboard_rows"] + result["mover_rows"]
+
+    # 4. Estadísticas agregadas por federación y continente
+    with metrics.stage("federations") as stage, get_db_session() as session:
+        result["federation_rows"] = stage.rows = rebuild_federation_stats(session)
 
-    # 3. Exportar desde DB (streaming para evitar memoria)
+    # 5. Exportar desde DB (streaming para evitar memoria)
     if export_json or export_csv:
-        with get_db_session() as session:
+        with metrics.stage("export") as stage, get_db_session() as session:
             stmt = select(Player).limit(EXPORT_LIMIT)
-            players = [p.to_dict() for p in session.scalars(stmt).all()]
-            if players:
+            exported = [p.to_dict() for p in session.scalars(stmt).all()]
+            stage.rows = len(exported)
+            if exported:
                 if export_json:
-                    result["json_path"] = str(export_to_json(players))
+                    result["json_path"] = str(export_to_json(exported))
                 if export_csv:
-                    result["csv_path"] = str(export_to_csv(players))
+                    result["csv_path"] = str(export_to_csv(exported))
+
+    # 6. Snapshot binario para el almacén en memoria de la API
+    if export_snapshot:
+        with metrics.stage("snapshot") as stage, get_db_session() as session:
+            store = build_player_store(session)
+            path = write_snapshot(store)
+            result["snapshot_path"] = str(path)
+            stage.rows = store.size
+            stage.bytes = path.stat().st_size
+        del store
+
+    # 7. Avisar a los workers de la API (LISTEN) para que recarguen sus cachés
+    with get_db_session() as session:
+        notify_import(session, {"total_imported": total, "period": period})
+
+    # 8. Informe de la ejecución (JSON y, si está configurado, Pushgateway)
+    result["metrics"] = metrics.report()
+    result["report_path"] = str(
+        metrics.write_report(
+            settings.export_path,
+            extra={
+                "period": period,
+                "total_imported": total,
+                "validation": validator.summary() if validator is not None else None,
+            },
+        )
+    )
+    if settings.prometheus_pushgateway_url:
+        try:
+            metrics.push(settings.prometheus_pushgateway_url, total)
+        except Exception as e:
+            # Las métricas no deben hacer fallar una importación ya completada
+            logger.warning("No se pudieron publicar las métricas en el Pushgateway: %s", e)
 
     logger.info("Importación completada: %d jugadores", total)
+    for name, stats in result["metrics"]["stages"].items():
+        logger.info(
+            "Etapa %s: %.1fs (CPU %.1fs), %d filas, %s filas/s",
+            name, stats["wall_seconds"], stats["cpu_seconds"], stats["rows"], stats["rows_per_second"],
+        )
     return result
@@ -1,54 +1,46 @@
 """Importación de historial de ratings para Progress."""
 
 import logging
-from collections.abc import Iterator
-from datetime import date, timedelta
+from collections.abc import Iterable, Iterator
+from datetime import date
 
-from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.orm import Session
 
-from src.database import get_db_session, get_engine, init_db
-from src.downloader import download_fide_xml
-from src.models import PlayerRatingHistory
-from src.parser import parse_players_xml
+from src.database import execute_values, get_db_session, get_engine, init_db
+from src.downloader import download_fide_list
+from src.parser import PlayerRow, parse_players
+from src.services.leaderboards import rebuild_movers
+from src.services.rank_history import rebuild_period_ranks
+from src.validation import RowValidator, rejects_path
 
 logger = logging.getLogger(__name__)
 
 BATCH_SIZE = 5000
 
+_UPSERT_HISTORY_SQL = (
+    "INSERT INTO player_rating_history (fideid, period, rating, rapid_rating, blitz_rating, country, flag) "
+    "VALUES %s ON CONFLICT (fideid, period) DO UPDATE SET "
+    "rating = EXCLUDED.rating, rapid_rating = EXCLUDED.rapid_rating, blitz_rating = EXCLUDED.blitz_rating, "
+    "country = EXCLUDED.country, flag = EXCLUDED.flag"
+)
 
-def _batch_upsert_history(session: Session, batch: list[dict], period: date) -> int:
+
+def batch_upsert_history(session: Session, batch: list[PlayerRow], period: date) -> int:
     """Inserta o actualiza un batch en player_rating_history (upsert por fideid+period)."""
     if not batch:
         return 0
 
-    stmt = pg_insert(PlayerRatingHistory).values(
-        [
-            {
-                "fideid": p["fideid"],
-                "period": period,
-                "rating": p.get("rating"),
-                "rapid_rating": p.get("rapid_rating"),
-                "blitz_rating": p.get("blitz_rating"),
-            }
-            for p in batch
-        ]
-    )
-    stmt = stmt.on_conflict_do_update(
-        index_elements=["fideid", "period"],
-        set_={
-            "rating": stmt.excluded.rating,
-            "rapid_rating": stmt.excluded.rapid_rating,
-            "blitz_rating": stmt.excluded.blitz_rating,
-        },
+    rows = (
+        (row.fideid, period, row.rating, row.rapid_rating, row.blitz_rating, row.country, row.flag)
+        for row in batch
     )
-    session.execute(stmt)
+    execute_values(session, _UPSERT_HISTORY_SQL, rows, page_size=len(batch))
     return len(batch)
 
 
-def _batched(iterator: Iterator[dict], size: int) -> Iterator[list[dict]]:
+def _batched(iterator: Iterable[PlayerRow], size: int) -> Iterator[list[PlayerRow]]:
     """Agrupa un iterador en batches del tamaño indicado."""
-    batch: list[dict] = []
+    batch: list[PlayerRow] = []
     for item in iterator:
         batch.append(item)
         if len(batch) >= size:
@@ -58,6 +50,13 @@ def _batched(iterator: Iterator[dict], size: int) -> Iterator[list[dict]]:
         yield batch
 
 
+def list_period(period: str | None = None) -> date:
+    """Periodo (primer día del mes) de una lista: el de `period` (YYYY-MM-DD) o el mes actual."""
+    if period:
+        return date.fromisoformat(period).replace(day=1)
+    return date.today().replace(day=1)
+
+
 def _month_periods(months: int) -> list[date]:
     """Genera fechas (primer día del mes) para los últimos N meses."""
     today = date.today()
@@ -73,17 +72,49 @@ def _month_periods(months: int) -> list[date]:
     return periods
 
 
-def run_import_history(months: int = 24) -> dict:
+def _import_period(period: date, validate: bool) -> tuple[int, int]:
+    """
+    Descarga, valida y carga la lista de un periodo y calcula sus rankings, en su propia transacción.
+
+    Returns:
+        (registros cargados, filas rechazadas por validación)
+    """
+    content, fmt = download_fide_list(period=period.isoformat())
+    batches = _batched(parse_players(content, fmt), BATCH_SIZE)
+    # Un validador por periodo: el mismo fideid aparece en cada lista
+    validator = RowValidator(rejects_path(f"rejects_history_{period:%Y%m}")) if validate else None
+    if validator is not None:
+        batches = validator.batches(batches)
+    count = 0
+    try:
+        with get_db_session() as session:
+            for batch in batches:
+                count += batch_upsert_history(session, batch, period)
+            rebuild_period_ranks(session, period)
+    finally:
+        if validator is not None:
+            validator.close()
+    logger.info("Periodo %s: %d registros", period.isoformat(), count)
+    return count, validator.rejected if validator is not None else 0
+
+
+def run_import_history(months: int = 24, validate: bool = True) -> dict:
     """
     Importa historial de ratings para los últimos N meses.
 
-    Descarga el XML de cada periodo y guarda snapshots en player_rating_history.
+    Descarga la lista de cada periodo, guarda snapshots en player_rating_history
+    y calcula los rankings del periodo. Cada periodo se confirma en su propia
+    transacción: si uno falla se registra y se sigue con los demás.
 
     Args:
         months: Número de meses hacia atrás a importar.
+        validate: Si True, valida cada lote como `run_import` (RowValidator);
+            las filas inválidas de cada periodo van a su propio CSV de
+            rechazos en EXPORT_PATH.
 
     Returns:
-        dict con total_periods, total_records, periods_imported.
+        dict con total_periods, total_records, rejected_rows, periods_imported
+        (solo los que se cargaron sin error) y mover_rows.
     """
     logger.info("Iniciando importación de historial (%d meses)", months)
 
@@ -92,23 +123,26 @@ def run_import_history(months: int = 24) -> dict:
 
     periods = _month_periods(months)
     total_records = 0
+    rejected_rows = 0
+    imported: list[date] = []
+    for period in periods:
+        # Una transacción por periodo: un error en uno no deja abortada la de los siguientes
+        try:
+            records, rejected = _import_period(period, validate)
+        except Exception as e:
+            logger.warning("Error en periodo %s: %s", period.isoformat(), e)
+            continue
+        imported.append(period)
+        total_records += records
+        rejected_rows += rejected
 
     with get_db_session() as session:
-        for period in periods:
-            period_str = period.strftime("%Y-%m-%d")
-            try:
-                xml_content = download_fide_xml(period=period_str)
-                count = 0
-                for batch in _batched(parse_players_xml(xml_content), BATCH_SIZE):
-                    _batch_upsert_history(session, batch, period)
-                    count += len(batch)
-                    total_records += len(batch)
-                logger.info("Periodo %s: %d registros", period_str, count)
-            except Exception as e:
-                logger.warning("Error en periodo %s: %s", period_str, e)
+        mover_rows = rebuild_movers(session)
 
     return {
         "total_periods": len(periods),
         "total_records": total_records,
-        "periods_imported": [p.strftime("%Y-%m-%d") for p in periods],
+        "rejected_rows": rejected_rows,
+        "periods_imported": [p.strftime("%Y-%m-%d") for p in imported],
+        "mover_rows": mover_rows,
     }
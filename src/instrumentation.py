@@ -0,0 +1,213 @@
+"""Instrumentación por etapas de la importación: tiempos, filas/s, memoria y métricas Prometheus.
+
+Cada etapa (download, unzip, parse, load, indexes, leaderboards, export)
+registra tiempo de reloj y de CPU (del proceso principal), filas, bytes y la
+memoria de la propia etapa: la variación del RSS actual (/proc/self/statm)
+entre la entrada y la salida y cuánto subió durante ella el pico de RSS del
+proceso. Ambos se suman entre los bloques de una misma etapa; el pico de RSS
+absoluto (de todo el proceso) solo se da en el informe global. Parseo y carga van entrelazados (la lista
+se parsea en streaming mientras se cargan los lotes): el parseo mide solo el
+tiempo dentro del iterador de lotes y la carga solo el de los lotes en la DB,
+cuyas latencias se guardan además como histograma. Con el pipeline
+(`src/pipeline.py`) parseo y carga corren en hilos distintos y se solapan: la
+suma de sus tiempos de reloj supera la duración real de la carga, y el tiempo
+de CPU es el de todo el proceso.
+"""
+
+import json
+import logging
+import os
+import resource
+import statistics
+import sys
+import threading
+import time
+from collections.abc import Iterable, Iterator
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import TypeVar
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# Límites (segundos) del histograma de latencia por lote
+BATCH_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+PUSHGATEWAY_JOB = "fide_import"
+
+
+def peak_rss_bytes() -> int:
+    """Pico de RSS del proceso en bytes (ru_maxrss: KB en Linux, bytes en macOS)."""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def current_rss_bytes() -> int:
+    """RSS actual del proceso en bytes (/proc/self/statm); 0 si no está disponible (no Linux)."""
+    try:
+        with open("/proc/self/statm", "rb") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        return 0
+
+
+@dataclass
+class StageStats:
+    """Métricas acumuladas de una etapa."""
+
+    wall_seconds: float = 0.0
+    cpu_seconds: float = 0.0
+    rows: int = 0
+    bytes: int = 0
+    rss_delta_bytes: int = 0
+    peak_rss_growth_bytes: int = 0
+
+    def as_dict(self) -> dict:
+        """Diccionario con los tiempos redondeados y filas/s."""
+        result = asdict(self)
+        result["wall_seconds"] = round(self.wall_seconds, 3)
+        result["cpu_seconds"] = round(self.cpu_seconds, 3)
+        result["rows_per_second"] = int(self.rows / self.wall_seconds) if self.rows and self.wall_seconds else None
+        return result
+
+
+@dataclass
+class ImportMetrics:
+    """Métricas de una ejecución de la importación."""
+
+    stages: dict[str, StageStats] = field(default_factory=dict)
+    batch_seconds: list[float] = field(default_factory=list)
+    started_at: datetime = field(default_factory=datetime.now)
+    # Los loaders del pipeline registran lotes desde varios hilos
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False, compare=False)
+
+    def _stage(self, name: str) -> StageStats:
+        """Etapa `name`, creándola si no existe (conserva el orden de ejecución)."""
+        return self.stages.setdefault(name, StageStats())
+
+    def _add(self, name: str, wall: float, cpu: float, rss: int, peak: int) -> StageStats:
+        """Suma a la etapa los tiempos y la variación de RSS y de pico de RSS de un bloque."""
+        with self._lock:
+            stats = self._stage(name)
+            stats.wall_seconds += wall
+            stats.cpu_seconds += cpu
+            stats.rss_delta_bytes += rss
+            stats.peak_rss_growth_bytes += peak
+        return stats
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[StageStats]:
+        """Mide un bloque como (parte de) la etapa `name`; el bloque puede sumar rows/bytes."""
+        stats = self._stage(name)
+        wall, cpu = time.perf_counter(), time.process_time()
+        rss, peak = current_rss_bytes(), peak_rss_bytes()
+        try:
+            yield stats
+        finally:
+            self._add(
+                name,
+                time.perf_counter() - wall,
+                time.process_time() - cpu,
+                current_rss_bytes() - rss,
+                peak_rss_bytes() - peak,
+            )
+
+    def timed_batches(self, name: str, batches: Iterable[list[T]]) -> Iterator[list[T]]:
+        """Recorre lotes sumando a la etapa `name` solo el tiempo dentro del iterador (y sus filas)."""
+        iterator = iter(batches)
+        while True:
+            with self.stage(name) as stats:
+                batch = next(iterator, None)
+                if batch is not None:
+                    stats.rows += len(batch)
+            if batch is None:
+                return
+            yield batch
+
+    @contextmanager
+    def batch(self, rows: int) -> Iterator[None]:
+        """Mide un lote escrito en la DB: suma a la etapa load y al histograma."""
+        with self.stage("load") as stats:
+            start = time.perf_counter()
+            yield
+            with self._lock:
+                self.batch_seconds.append(time.perf_counter() - start)
+                stats.rows += rows
+
+    def batch_histogram(self) -> dict:
+        """Histograma acumulado (le -> lotes) y percentiles de la latencia por lote."""
+        latencies = self.batch_seconds
+        if not latencies:
+            return {"count": 0}
+        buckets = {str(le): sum(1 for s in latencies if s <= le) for le in BATCH_BUCKETS}
+        buckets["+Inf"] = len(latencies)
+        cuts = statistics.quantiles(latencies, n=100) if len(latencies) > 1 else [latencies[0]] * 99
+        return {
+            "count": len(latencies),
+            "sum_seconds": round(sum(latencies), 3),
+            "p50_seconds": round(cuts[49], 4),
+            "p95_seconds": round(cuts[94], 4),
+            "max_seconds": round(max(latencies), 4),
+            "buckets": buckets,
+        }
+
+    def report(self) -> dict:
+        """Informe serializable: etapas en orden de ejecución e histograma de lotes."""
+        return {
+            "started_at": self.started_at.isoformat(timespec="seconds"),
+            "stages": {name: stats.as_dict() for name, stats in self.stages.items()},
+            "batches": self.batch_histogram(),
+            "peak_rss_bytes": peak_rss_bytes(),
+        }
+
+    def write_report(self, directory: str | Path, extra: dict | None = None) -> Path:
+        """Escribe el informe JSON de la ejecución en `directory`. Retorna la ruta."""
+        path = Path(directory)
+        path.mkdir(parents=True, exist_ok=True)
+        path = path / f"import_report_{self.started_at.strftime('%Y%m%d_%H%M%S')}.json"
+        path.write_text(json.dumps({**(extra or {}), **self.report()}, indent=2, ensure_ascii=False))
+        logger.info("Informe de importación en %s", path)
+        return path
+
+    def push(self, gateway: str, total_imported: int, job: str = PUSHGATEWAY_JOB) -> None:
+        """
+        Publica las métricas en un Prometheus Pushgateway.
+
+        Permite alertar sobre importaciones lentas (duración por etapa) o que
+        encogen (fide_import_rows).
+        """
+        from prometheus_client import CollectorRegistry, Gauge, Histogram, push_to_gateway
+
+        registry = CollectorRegistry()
+        gauges = {
+            "wall_seconds": Gauge("fide_import_stage_duration_seconds", "Duración de la etapa", ["stage"], registry=registry),
+            "cpu_seconds": Gauge("fide_import_stage_cpu_seconds", "Tiempo de CPU de la etapa", ["stage"], registry=registry),
+            "rows": Gauge("fide_import_stage_rows", "Filas procesadas en la etapa", ["stage"], registry=registry),
+            "bytes": Gauge("fide_import_stage_bytes", "Bytes procesados en la etapa", ["stage"], registry=registry),
+            "rss_delta_bytes": Gauge(
+                "fide_import_stage_rss_delta_bytes", "Variación del RSS durante la etapa", ["stage"], registry=registry
+            ),
+            "peak_rss_growth_bytes": Gauge(
+                "fide_import_stage_peak_rss_growth_bytes",
+                "Subida del pico de RSS del proceso durante la etapa",
+                ["stage"],
+                registry=registry,
+            ),
+        }
+        for name, stats in self.stages.items():
+            for attr, gauge in gauges.items():
+                gauge.labels(stage=name).set(getattr(stats, attr))
+
+        batches = Histogram(
+            "fide_import_batch_duration_seconds", "Latencia de escritura por lote", buckets=BATCH_BUCKETS, registry=registry
+        )
+        for seconds in self.batch_seconds:
+            batches.observe(seconds)
+
+        Gauge("fide_import_rows", "Jugadores importados", registry=registry).set(total_imported)
+        Gauge("fide_import_last_success_timestamp_seconds", "Fin de la última importación", registry=registry).set_to_current_time()
+
+        push_to_gateway(gateway, job=job, registry=registry)
+        logger.info("Métricas publicadas en %s (job=%s)", gateway, job)
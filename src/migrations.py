@@ -0,0 +1,175 @@
+"""Migraciones versionadas del esquema (tabla schema_migrations).
+
+Se ejecutan una sola vez como paso de despliegue (`python -m scripts.migrate`)
+o al empezar una importación (`init_db`), nunca al arrancar la API. Un
+advisory lock de PostgreSQL evita que dos procesos migren a la vez; cada
+migración se aplica y registra en su propia transacción.
+
+La migración 1 crea el esquema actual de los modelos con `create_all`, así
+que en una base de datos nueva las siguientes no deben fallar si su cambio ya
+existe (ADD COLUMN IF NOT EXISTS, CREATE INDEX IF NOT EXISTS...). En bases de
+datos anteriores a este sistema, create_all no toca las tablas existentes y
+las migraciones siguientes añaden lo que falte.
+"""
+
+import logging
+from collections.abc import Callable
+from dataclasses import dataclass
+
+from sqlalchemy import text
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.exc import ProgrammingError
+
+from src.models import Base
+from src.services.search import normalize_name
+
+logger = logging.getLogger(__name__)
+
+MIGRATION_LOCK_KEY = 7_110_501  # Clave del advisory lock de migraciones
+BACKFILL_BATCH = 10_000  # Filas por UPDATE al rellenar columnas derivadas
+
+_CREATE_VERSION_TABLE = """
+    CREATE TABLE IF NOT EXISTS schema_migrations (
+        version INTEGER PRIMARY KEY,
+        name VARCHAR(100) NOT NULL,
+        applied_at TIMESTAMPTZ NOT NULL DEFAULT now()
+    )
+"""
+
+
+@dataclass(frozen=True)
+class Migration:
+    """Cambio de esquema identificado por una versión creciente."""
+
+    version: int
+    name: str
+    apply: Callable[[Connection], None]
+
+
+def _initial_schema(conn: Connection) -> None:
+    # pg_trgm: índice de trigramas para la búsqueda por nombre
+    conn.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+    Base.metadata.create_all(bind=conn)
+
+
+def _players_foa_columns(conn: Connection) -> None:
+    conn.execute(text("ALTER TABLE players ADD COLUMN IF NOT EXISTS foa_title VARCHAR(50)"))
+    conn.execute(text("ALTER TABLE players ADD COLUMN IF NOT EXISTS foa_rating INTEGER"))
+
+
+def _backfill_name_search(conn: Connection) -> None:
+    """Rellena name_search de los jugadores que no lo tienen, con el mismo normalize_name que el importer."""
+    total = 0
+    last_id = 0
+    while True:
+        rows = conn.execute(
+            text(
+                "SELECT id, name FROM players WHERE name_search IS NULL AND id > :last_id "
+                "ORDER BY id LIMIT :limit"
+            ),
+            {"last_id": last_id, "limit": BACKFILL_BATCH},
+        ).all()
+        if not rows:
+            break
+        conn.execute(
+            text(
+                "UPDATE players p SET name_search = v.name_search "
+                "FROM unnest(CAST(:ids AS integer[]), CAST(:names AS text[])) AS v(id, name_search) "
+                "WHERE p.id = v.id"
+            ),
+            {"ids": [row.id for row in rows], "names": [normalize_name(row.name) for row in rows]},
+        )
+        total += len(rows)
+        last_id = rows[-1].id
+    if total:
+        logger.info("name_search rellenado en %d jugadores", total)
+
+
+def _players_name_search(conn: Connection) -> None:
+    conn.execute(text("ALTER TABLE players ADD COLUMN IF NOT EXISTS name_search VARCHAR(255)"))
+    # Sin esto, /players/search no encuentra a nadie hasta la siguiente importación completa
+    _backfill_name_search(conn)
+    conn.execute(text(
+        "CREATE INDEX IF NOT EXISTS ix_players_name_search_trgm "
+        "ON players USING gin (name_search gin_trgm_ops)"
+    ))
+
+
+def _history_ranks(conn: Connection) -> None:
+    columns = ["country VARCHAR(3)", "flag VARCHAR(5)"]
+    for prefix in ("", "rapid_", "blitz_"):
+        columns += [f"{prefix}{scope}_rank INTEGER" for scope in ("world", "national", "continent")]
+    conn.execute(text(
+        "ALTER TABLE player_rating_history "
+        + ", ".join(f"ADD COLUMN IF NOT EXISTS {column}" for column in columns)
+    ))
+
+
+def _create_table(name: str) -> Callable[[Connection], None]:
+    """Migración que crea una tabla nueva del modelo (con sus índices) si no existe."""
+
+    def apply(conn: Connection) -> None:
+        Base.metadata.tables[name].create(bind=conn, checkfirst=True)
+
+    return apply
+
+
+# Orden de aplicación; añadir al final con la siguiente versión
+MIGRATIONS = (
+    Migration(1, "initial_schema", _initial_schema),
+    Migration(2, "players_foa_columns", _players_foa_columns),
+    Migration(3, "players_name_search", _players_name_search),
+    Migration(4, "list_releases", _create_table("list_releases")),
+    Migration(5, "federation_stats", _create_table("federation_stats")),
+    Migration(6, "history_ranks", _history_ranks),
+    # Bases de datos que aplicaron la 3 antes de que rellenara name_search
+    Migration(7, "players_name_search_backfill", _backfill_name_search),
+)
+
+LATEST_VERSION = MIGRATIONS[-1].version
+
+
+def migrate(engine: Engine) -> list[int]:
+    """
+    Aplica las migraciones pendientes.
+
+    Returns:
+        Versiones aplicadas en esta ejecución (vacía si el esquema ya estaba al día).
+    """
+    applied_now: list[int] = []
+    with engine.connect() as conn:
+        conn.execute(text("SELECT pg_advisory_lock(:key)"), {"key": MIGRATION_LOCK_KEY})
+        try:
+            conn.execute(text(_CREATE_VERSION_TABLE))
+            conn.commit()
+            applied = set(conn.scalars(text("SELECT version FROM schema_migrations")))
+            for migration in MIGRATIONS:
+                if migration.version in applied:
+                    continue
+                logger.info("Aplicando migración %d (%s)", migration.version, migration.name)
+                migration.apply(conn)
+                conn.execute(
+                    text("INSERT INTO schema_migrations (version, name) VALUES (:version, :name)"),
+                    {"version": migration.version, "name": migration.name},
+                )
+                conn.commit()
+                applied_now.append(migration.version)
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            conn.execute(text("SELECT pg_advisory_unlock(:key)"), {"key": MIGRATION_LOCK_KEY})
+            conn.commit()
+
+    if applied_now:
+        logger.info("Esquema migrado a la versión %d", LATEST_VERSION)
+    return applied_now
+
+
+def schema_version(engine: Engine) -> int | None:
+    """Última versión aplicada, o None si la base de datos no se ha migrado nunca. Solo lectura."""
+    with engine.connect() as conn:
+        try:
+            return conn.scalar(text("SELECT max(version) FROM schema_migrations"))
+        except ProgrammingError:
+            return None
@@ -2,7 +2,7 @@
 
 from datetime import date, datetime
 
-from sqlalchemy import Date, Index, Integer, String, UniqueConstraint
+from sqlalchemy import JSON, BigInteger, Date, DateTime, Index, Integer, String, UniqueConstraint
 from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column
 
 
@@ -23,6 +23,19 @@ class PlayerRatingHistory(Base):
     rating: Mapped[int | None] = mapped_column(Integer, nullable=True)
     rapid_rating: Mapped[int | None] = mapped_column(Integer, nullable=True)
     blitz_rating: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    # Federación y flag de inactividad en la lista del periodo
+    country: Mapped[str | None] = mapped_column(String(3), nullable=True)
+    flag: Mapped[str | None] = mapped_column(String(5), nullable=True)
+    # Rankings del periodo entre jugadores activos (src/services/rank_history.py)
+    world_rank: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    national_rank: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    continent_rank: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    rapid_world_rank: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    rapid_national_rank: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    rapid_continent_rank: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    blitz_world_rank: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    blitz_national_rank: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    blitz_continent_rank: Mapped[int | None] = mapped_column(Integer, nullable=True)
 
     __table_args__ = (
         UniqueConstraint("fideid", "period", name="uq_player_rating_history_fideid_period"),
@@ -51,9 +64,17 @@ class Player(Base):
     flag: Mapped[str | None] = mapped_column(String(5), nullable=True)
     foa_title: Mapped[str | None] = mapped_column(String(50), nullable=True)
     foa_rating: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    # Nombre normalizado (sin acentos, minúsculas) para búsqueda con pg_trgm
+    name_search: Mapped[str | None] = mapped_column(String(255), nullable=True)
 
     __table_args__ = (
         Index("ix_players_country_rating", "country", "rating"),
+        Index(
+            "ix_players_name_search_trgm",
+            "name_search",
+            postgresql_using="gin",
+            postgresql_ops={"name_search": "gin_trgm_ops"},
+        ),
     )
 
     def to_dict(self) -> dict:
@@ -75,3 +96,157 @@ class Player(Base):
             "foa_title": self.foa_title,
             "foa_rating": self.foa_rating,
         }
+
+
+# Columnas de Player.to_dict(), mismas claves y orden: `select(*PLAYER_COLUMNS)`
+# da filas cuyo `_asdict()` equivale a to_dict() sin cargar entidades ORM
+PLAYER_COLUMNS = tuple(c for c in Player.__table__.c if c.key not in ("id", "name_search"))
+
+
+class LeaderboardEntry(Base):
+    """Snapshot precalculado de un puesto en una clasificación (top N por ámbito y segmento)."""
+
+    __tablename__ = "leaderboard_snapshots"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
+    rating_type: Mapped[str] = mapped_column(String(10), nullable=False)
+    scope: Mapped[str] = mapped_column(String(10), nullable=False)
+    scope_code: Mapped[str] = mapped_column(String(20), nullable=False)
+    segment: Mapped[str] = mapped_column(String(20), nullable=False)
+    position: Mapped[int] = mapped_column(Integer, nullable=False)
+    fideid: Mapped[int] = mapped_column(Integer, nullable=False)
+    name: Mapped[str] = mapped_column(String(255), nullable=False)
+    country: Mapped[str] = mapped_column(String(3), nullable=False)
+    sex: Mapped[str | None] = mapped_column(String(1), nullable=True)
+    title: Mapped[str | None] = mapped_column(String(10), nullable=True)
+    birthday: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    rating: Mapped[int] = mapped_column(Integer, nullable=False)
+
+    __table_args__ = (
+        UniqueConstraint(
+            "rating_type", "scope", "scope_code", "segment", "position",
+            name="uq_leaderboard_snapshots_key",
+        ),
+    )
+
+    def to_dict(self) -> dict:
+        """Convierte la entrada a diccionario para serialización."""
+        return {
+            "position": self.position,
+            "fideid": self.fideid,
+            "name": self.name,
+            "country": self.country,
+            "sex": self.sex,
+            "title": self.title,
+            "birthday": self.birthday,
+            "rating": self.rating,
+        }
+
+
+class RatingMover(Base):
+    """Snapshot precalculado de mayores subidas/bajadas de rating entre dos periodos."""
+
+    __tablename__ = "rating_movers"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
+    rating_type: Mapped[str] = mapped_column(String(10), nullable=False)
+    scope: Mapped[str] = mapped_column(String(10), nullable=False)
+    scope_code: Mapped[str] = mapped_column(String(20), nullable=False)
+    direction: Mapped[str] = mapped_column(String(4), nullable=False)
+    position: Mapped[int] = mapped_column(Integer, nullable=False)
+    period: Mapped[date] = mapped_column(Date, nullable=False)
+    previous_period: Mapped[date] = mapped_column(Date, nullable=False)
+    fideid: Mapped[int] = mapped_column(Integer, nullable=False)
+    name: Mapped[str] = mapped_column(String(255), nullable=False)
+    country: Mapped[str] = mapped_column(String(3), nullable=False)
+    title: Mapped[str | None] = mapped_column(String(10), nullable=True)
+    rating: Mapped[int] = mapped_column(Integer, nullable=False)
+    previous_rating: Mapped[int] = mapped_column(Integer, nullable=False)
+    change: Mapped[int] = mapped_column(Integer, nullable=False)
+
+    __table_args__ = (
+        UniqueConstraint(
+            "rating_type", "scope", "scope_code", "direction", "position",
+            name="uq_rating_movers_key",
+        ),
+    )
+
+    def to_dict(self) -> dict:
+        """Convierte la entrada a diccionario para serialización."""
+        return {
+            "position": self.position,
+            "fideid": self.fideid,
+            "name": self.name,
+            "country": self.country,
+            "title": self.title,
+            "rating": self.rating,
+            "previous_rating": self.previous_rating,
+            "change": self.change,
+        }
+
+
+class FederationStats(Base):
+    """Estadísticas agregadas precalculadas por ámbito (mundo, federación, continente) y tipo de rating."""
+
+    __tablename__ = "federation_stats"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
+    rating_type: Mapped[str] = mapped_column(String(10), nullable=False)
+    scope: Mapped[str] = mapped_column(String(10), nullable=False)
+    scope_code: Mapped[str] = mapped_column(String(20), nullable=False)
+    # Recuentos sobre jugadores con rating > 0 en este tipo
+    players: Mapped[int] = mapped_column(Integer, nullable=False)
+    active_players: Mapped[int] = mapped_column(Integer, nullable=False)
+    male: Mapped[int] = mapped_column(Integer, nullable=False)
+    female: Mapped[int] = mapped_column(Integer, nullable=False)
+    juniors: Mapped[int] = mapped_column(Integer, nullable=False)
+    titles: Mapped[dict] = mapped_column(JSON, nullable=False)  # {código de título: jugadores}
+    # Distribución del rating
+    avg_rating: Mapped[int] = mapped_column(Integer, nullable=False)
+    top10_avg: Mapped[int | None] = mapped_column(Integer, nullable=True)  # media de los 10 mejores activos
+    p10: Mapped[int] = mapped_column(Integer, nullable=False)
+    p25: Mapped[int] = mapped_column(Integer, nullable=False)
+    median: Mapped[int] = mapped_column(Integer, nullable=False)
+    p75: Mapped[int] = mapped_column(Integer, nullable=False)
+    p90: Mapped[int] = mapped_column(Integer, nullable=False)
+    max_rating: Mapped[int] = mapped_column(Integer, nullable=False)
+
+    __table_args__ = (
+        UniqueConstraint("rating_type", "scope", "scope_code", name="uq_federation_stats_key"),
+    )
+
+    def to_dict(self) -> dict:
+        """Convierte las estadísticas a diccionario para serialización."""
+        return {
+            "rating_type": self.rating_type,
+            "scope": self.scope,
+            "scope_code": self.scope_code or None,
+            "players": self.players,
+            "active_players": self.active_players,
+            "male": self.male,
+            "female": self.female,
+            "juniors": self.juniors,
+            "titles": self.titles,
+            "rating": {
+                "avg": self.avg_rating,
+                "top10_avg": self.top10_avg,
+                "p10": self.p10,
+                "p25": self.p25,
+                "median": self.median,
+                "p75": self.p75,
+                "p90": self.p90,
+                "max": self.max_rating,
+            },
+        }
+
+
+class ListRelease(Base):
+    """Última publicación importada de una lista FIDE (validadores HTTP del ZIP)."""
+
+    __tablename__ = "list_releases"
+
+    url: Mapped[str] = mapped_column(String(500), primary_key=True)
+    etag: Mapped[str | None] = mapped_column(String(200), nullable=True)
+    last_modified: Mapped[str | None] = mapped_column(String(100), nullable=True)
+    content_length: Mapped[int | None] = mapped_column(BigInteger, nullable=True)
+    imported_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
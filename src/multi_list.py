@@ -0,0 +1,82 @@
+"""Importación combinada de las listas standard, rapid y blitz de una misma publicación.
+
+Las tres listas se descargan en paralelo. Las listas rapid y blitz se parsean
+una sola vez, al descargarlas, a un mapa fideid -> PlayerRow, y su contenido
+descomprimido se libera enseguida; la lista standard se recorre en streaming
+y cada jugador se completa con ambos mapas, retirando de ellos sus entradas.
+Al final se emiten, desde las filas que quedan en los mapas, los jugadores
+que solo aparecen en rapid y/o blitz.
+"""
+
+import logging
+from collections.abc import Iterator
+from concurrent.futures import ThreadPoolExecutor
+
+from src.config import get_settings
+from src.downloader import download_fide_list
+from src.parser import PlayerRow, parse_players
+
+logger = logging.getLogger(__name__)
+
+RowMap = dict[int, PlayerRow]
+
+
+def _fetch_rows(url: str, period: str | None) -> RowMap:
+    """
+    Descarga y parsea una lista individual (rapid o blitz): fideid -> PlayerRow.
+
+    Las listas individuales de FIDE usan las columnas genéricas de rating y
+    partidas (<rating>/<games> en XML, columna del mes y Gms en TXT). El
+    contenido descomprimido se libera al volver: cada lista se parsea una vez.
+    """
+    content, fmt = download_fide_list(period=period, url=url)
+    return {p.fideid: p for p in parse_players(content, fmt)}
+
+
+def _apply(player: PlayerRow, kind: str, source: PlayerRow | None) -> PlayerRow:
+    """Retorna el jugador con rating y partidas de `kind` (rapid/blitz) tomados de `source`."""
+    rating, games = (source.rating, source.games) if source is not None else (None, None)
+    if kind == "rapid":
+        return player._replace(rapid_rating=rating, rapid_games=games)
+    return player._replace(blitz_rating=rating, blitz_games=games)
+
+
+def iter_combined_players(period: str | None = None) -> Iterator[PlayerRow]:
+    """
+    Genera jugadores con los tres ratings de la misma publicación.
+
+    Args:
+        period: Fecha opcional YYYY-MM-DD para listas históricas.
+
+    Yields:
+        PlayerRow con rating/games de standard, rapid_* de rapid y blitz_* de blitz.
+    """
+    settings = get_settings()
+    logger.info("Descargando listas standard, rapid y blitz en paralelo")
+
+    with ThreadPoolExecutor(max_workers=3) as pool:
+        standard_future = pool.submit(download_fide_list, period, settings.fide_xml_url)
+        rapid_future = pool.submit(_fetch_rows, settings.fide_rapid_xml_url, period)
+        blitz_future = pool.submit(_fetch_rows, settings.fide_blitz_xml_url, period)
+        content, fmt = standard_future.result()
+        rapid = rapid_future.result()
+        blitz = blitz_future.result()
+
+    logger.info("Listas rapid (%d) y blitz (%d) cargadas, combinando", len(rapid), len(blitz))
+
+    players = parse_players(content, fmt)
+    del content  # Solo lo referencia el parser: se libera al terminar la pasada
+    for player in players:
+        player = _apply(player, "rapid", rapid.pop(player.fideid, None))
+        yield _apply(player, "blitz", blitz.pop(player.fideid, None))
+
+    # Jugadores sin entrada en la lista standard, con los datos de su fila rapid o blitz
+    extra = 0
+    for kind, own, other_kind, other in (("rapid", rapid, "blitz", blitz), ("blitz", blitz, "rapid", rapid)):
+        for fideid, row in own.items():
+            player = _apply(row._replace(rating=None, games=None), kind, row)
+            extra += 1
+            yield _apply(player, other_kind, other.pop(fideid, None))
+        own.clear()
+
+    logger.info("Jugadores solo en rapid/blitz: %d", extra)
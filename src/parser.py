@@ -1,72 +1,239 @@
-"""Parseo del XML de jugadores FIDE."""
+"""Parseo de las listas de jugadores FIDE (XML y TXT de ancho fijo)."""
 
 import io
+import logging
+import re
 import xml.etree.ElementTree as ET
-from typing import Iterator
+from collections.abc import Callable
+from typing import Iterator, NamedTuple
+
+logger = logging.getLogger(__name__)
+
+
+class PlayerRow(NamedTuple):
+    """Jugador parseado: tupla compacta que recorre todo el pipeline (parser -> loader)."""
+
+    fideid: int
+    name: str
+    country: str
+    sex: str | None
+    title: str | None
+    rating: int | None
+    games: int | None
+    rapid_rating: int | None
+    rapid_games: int | None
+    blitz_rating: int | None
+    blitz_games: int | None
+    birthday: int | None
+    flag: str | None
+    foa_title: str | None
+    foa_rating: int | None
+
+
+# Campos de un jugador, en el orden de PlayerRow (y de Player.to_dict())
+PLAYER_FIELDS = PlayerRow._fields
 
 
 def _parse_int(value: str | None) -> int | None:
     """Convierte string a int, retorna None si vacío o inválido."""
-    if value is None or (isinstance(value, str) and value.strip() == ""):
+    if not value:
         return None
     try:
-        return int(str(value).strip())
+        return int(value)
     except ValueError:
         return None
 
 
-def _get_text(element: ET.Element, tag: str) -> str | None:
-    """Obtiene el texto de un subelemento, retorna None si no existe."""
-    # FIDE puede usar namespaces: buscar con y sin namespace
-    child = element.find(tag)
-    if child is None:
-        # Intentar por nombre local (tag puede ser {ns}localname)
-        for c in element:
-            local_tag = c.tag.split("}")[-1] if "}" in c.tag else c.tag
-            if local_tag == tag:
-                return c.text.strip() if c.text else None
-        return None
-    return child.text.strip() if child.text else None
+def _local_tag(tag: str) -> str:
+    """Nombre local de un tag (FIDE puede usar namespaces: {ns}localname)."""
+    return tag.rpartition("}")[2]
+
+
+def _player_fields(elem: ET.Element) -> dict[str, str | None]:
+    """Texto de todos los subelementos de un <player> en una sola pasada (tag local -> texto)."""
+    fields: dict[str, str | None] = {}
+    for child in elem:
+        text = child.text
+        fields[_local_tag(child.tag)] = text.strip() if text else None
+    return fields
 
 
-def _parse_player_element(elem: ET.Element) -> dict | None:
+def _parse_player_element(elem: ET.Element) -> PlayerRow | None:
     """Extrae los datos de un elemento player."""
-    fideid = _parse_int(_get_text(elem, "fideid"))
+    f = _player_fields(elem)
+    fideid = _parse_int(f.get("fideid"))
     if fideid is None:
         return None
 
-    return {
-        "fideid": fideid,
-        "name": _get_text(elem, "name") or "",
-        "country": _get_text(elem, "country") or "",
-        "sex": _get_text(elem, "sex"),
-        "title": _get_text(elem, "title"),
-        "rating": _parse_int(_get_text(elem, "rating")),
-        "games": _parse_int(_get_text(elem, "games")),
-        "rapid_rating": _parse_int(_get_text(elem, "rapid_rating")),
-        "rapid_games": _parse_int(_get_text(elem, "rapid_games")),
-        "blitz_rating": _parse_int(_get_text(elem, "blitz_rating")),
-        "blitz_games": _parse_int(_get_text(elem, "blitz_games")),
-        "birthday": _parse_int(_get_text(elem, "birthday")),
-        "flag": _get_text(elem, "flag"),
-        "foa_title": _get_text(elem, "foa_title"),
-        "foa_rating": _parse_int(_get_text(elem, "foa_rating")),
-    }
-
-
-def parse_players_xml(xml_content: bytes) -> Iterator[dict]:
-    """
-    Parsea el XML de jugadores FIDE y genera diccionarios por jugador.
+    return PlayerRow(
+        fideid,
+        f.get("name") or "",
+        f.get("country") or "",
+        f.get("sex"),
+        f.get("title"),
+        _parse_int(f.get("rating")),
+        _parse_int(f.get("games")),
+        _parse_int(f.get("rapid_rating")),
+        _parse_int(f.get("rapid_games")),
+        _parse_int(f.get("blitz_rating")),
+        _parse_int(f.get("blitz_games")),
+        _parse_int(f.get("birthday")),
+        f.get("flag"),
+        f.get("foa_title"),
+        _parse_int(f.get("foa_rating")),
+    )
+
 
-    Usa ET.parse() para cargar el árbol completo. Busca todos los <player>
-    en el árbol (soporta namespaces y estructura anidada).
+def parse_players_xml(xml_content: bytes) -> Iterator[PlayerRow]:
     """
-    tree = ET.parse(io.BytesIO(xml_content))
-    root = tree.getroot()
+    Parsea el XML de jugadores FIDE y genera un PlayerRow por jugador.
 
-    for elem in root.iter():
-        tag = elem.tag.split("}")[-1] if "}" in elem.tag else elem.tag
-        if tag == "player":
+    Usa ET.iterparse() en streaming y libera cada <player> tras procesarlo.
+    Encuentra los <player> a cualquier profundidad (soporta namespaces).
+    Los registros sin fideid numérico se descartan (no hay clave con la que
+    cargarlos) y se cuentan en un aviso al terminar.
+    """
+    skipped = 0
+    for _, elem in ET.iterparse(io.BytesIO(xml_content), events=("end",)):
+        if _local_tag(elem.tag) == "player":
             player = _parse_player_element(elem)
+            elem.clear()
             if player:
                 yield player
+            else:
+                skipped += 1
+    if skipped:
+        logger.warning("%d registros <player> sin fideid válido descartados", skipped)
+
+
+# Cabeceras de las listas TXT -> campo del diccionario de jugador (None: se ignora)
+TXT_COLUMNS = {
+    "ID Number": "fideid",
+    "Name": "name",
+    "Fed": "country",
+    "Sex": "sex",
+    "Tit": "title",
+    "WTit": None,
+    "OTit": None,
+    "FOA": "foa_title",
+    "SRtng": "rating",
+    "SGm": "games",
+    "SK": None,
+    "RRtng": "rapid_rating",
+    "RGm": "rapid_games",
+    "Rk": None,
+    "BRtng": "blitz_rating",
+    "BGm": "blitz_games",
+    "BK": None,
+    "Gms": "games",
+    "K": None,
+    "B-day": "birthday",
+    "Flag": "flag",
+}
+TXT_INT_FIELDS = frozenset(
+    ("fideid", "rating", "games", "rapid_rating", "rapid_games", "blitz_rating", "blitz_games", "birthday")
+)
+
+# En listas individuales la columna de rating se titula con el mes (ej: SEP25)
+_TXT_MONTH_COLUMN = re.compile(r"^[A-Za-z]{3}\d{2}$")
+_TXT_HEADER_TOKEN = re.compile(rb"ID Number|\S+")
+
+
+def _txt_layout(header: bytes) -> list[tuple[str, int, int | None]]:
+    """
+    Calcula las columnas (campo, inicio, fin) a partir de la cabecera TXT.
+
+    Cada columna va desde el inicio de su cabecera hasta el inicio de la siguiente.
+    """
+    tokens = [(m.group().decode("ascii"), m.start()) for m in _TXT_HEADER_TOKEN.finditer(header)]
+    layout = []
+    for i, (label, start) in enumerate(tokens):
+        end = tokens[i + 1][1] if i + 1 < len(tokens) else None
+        field = TXT_COLUMNS.get(label)
+        if field is None and _TXT_MONTH_COLUMN.match(label):
+            field = "rating"
+        if field is not None:
+            layout.append((field, start, end))
+    if not any(field == "fideid" for field, _, _ in layout):
+        raise ValueError("Cabecera TXT no reconocida: falta la columna 'ID Number'")
+    return layout
+
+
+def _decode(value: bytes) -> str:
+    """Decodifica un campo de texto (UTF-8, con latin-1 como respaldo)."""
+    try:
+        return value.decode("utf-8")
+    except UnicodeDecodeError:
+        return value.decode("latin-1")
+
+
+def parse_players_txt(content: bytes) -> Iterator[PlayerRow]:
+    """
+    Parsea una lista FIDE en TXT de ancho fijo y genera un PlayerRow por jugador.
+
+    Las posiciones de columna se obtienen de la cabecera y cada línea ASCII se
+    corta directamente como bytes, sin árbol XML ni decodificación de la línea
+    (las líneas con caracteres no ASCII se decodifican antes de cortar).
+    Las líneas sin fideid numérico se descartan y se cuentan en un aviso.
+    """
+    lines = io.BytesIO(content)
+    layout = _txt_layout(lines.readline())
+    index = {field: i for i, field in enumerate(PLAYER_FIELDS)}
+    int_columns = [(index[f], a, b) for f, a, b in layout if f in TXT_INT_FIELDS]
+    str_columns = [(index[f], a, b) for f, a, b in layout if f not in TXT_INT_FIELDS]
+    fideid_index, name_index, country_index = index["fideid"], index["name"], index["country"]
+    empty = [None] * len(PLAYER_FIELDS)
+    skipped = 0
+
+    for line in lines:
+        line = line.rstrip(b"\r\n")
+        if not line.strip():
+            continue
+        # Las posiciones son de caracteres: con nombres no ASCII se corta el texto decodificado
+        ascii_line = line.isascii()
+        if not ascii_line:
+            line = _decode(line)
+        values = empty.copy()
+        for i, start, end in int_columns:
+            value = line[start:end].strip()
+            if value:
+                try:
+                    values[i] = int(value)
+                except ValueError:
+                    pass
+        if values[fideid_index] is None:
+            skipped += 1
+            continue
+        for i, start, end in str_columns:
+            value = line[start:end].strip()
+            if value:
+                values[i] = value.decode("ascii") if ascii_line else value
+        values[name_index] = values[name_index] or ""
+        values[country_index] = values[country_index] or ""
+        yield PlayerRow._make(values)
+    if skipped:
+        logger.warning("%d líneas sin fideid válido descartadas", skipped)
+
+
+# Formato de lista -> parser
+PARSERS: dict[str, Callable[[bytes], Iterator[PlayerRow]]] = {
+    "xml": parse_players_xml,
+    "txt": parse_players_txt,
+}
+
+
+def detect_format(filename: str) -> str:
+    """Detecta el formato de lista a partir del nombre del archivo (extensión)."""
+    extension = filename.rsplit(".", 1)[-1].lower() if "." in filename else ""
+    if extension not in PARSERS:
+        raise ValueError(f"Formato de lista no soportado: {filename}")
+    return extension
+
+
+def parse_players(content: bytes, fmt: str = "xml") -> Iterator[PlayerRow]:
+    """Parsea una lista FIDE con el parser del formato indicado ('xml' o 'txt')."""
+    try:
+        parser = PARSERS[fmt]
+    except KeyError:
+        raise ValueError(f"Formato de lista no soportado: {fmt}") from None
+    return parser(content)
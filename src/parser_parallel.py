@@ -0,0 +1,147 @@
+"""Parseo en paralelo de listas FIDE: fragmentos por rangos de bytes en un pool de procesos.
+
+El contenido descomprimido se divide en fragmentos que empiezan en un límite
+de registro (`<player>` en XML, inicio de línea en TXT). Cada proceso parsea
+su fragmento con el parser normal y devuelve tuplas compactas (`PlayerRow`),
+más baratas de serializar entre procesos que diccionarios. Los fragmentos XML
+llevan la declaración `<?xml ...?>` original, para que las listas que no son
+UTF-8 se decodifiquen igual que en un solo proceso.
+
+Los fragmentos se construyen al enviarlos y solo hay unos pocos en vuelo por
+proceso (`PENDING_PER_WORKER`): ni todos los fragmentos ni todos los
+resultados están en memoria a la vez. Los lotes salen en el orden del archivo.
+"""
+
+import logging
+import os
+from collections import deque
+from collections.abc import Callable, Iterator
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from itertools import islice
+
+from src.parser import PlayerRow, parse_players
+
+logger = logging.getLogger(__name__)
+
+SHARDS_PER_WORKER = 4  # Más fragmentos que procesos para repartir mejor la carga
+PENDING_PER_WORKER = 2  # Fragmentos enviados al pool y aún sin consumir, por proceso
+FALLBACK_BATCH_ROWS = 50_000  # Filas por lote si la lista no se puede fragmentar
+
+_XML_SHARD_OPEN = b"<shard>"
+_XML_SHARD_CLOSE = b"</shard>"
+
+
+def _find_xml_boundary(content: bytes, pos: int) -> int:
+    """Posición del siguiente <player> (o <player ...>) desde pos, o -1."""
+    while True:
+        pos = content.find(b"<player", pos)
+        if pos == -1 or content[pos + 7:pos + 8] in (b">", b" "):
+            return pos
+        pos += 7
+
+
+def _xml_prolog(content: bytes) -> bytes:
+    """Declaración XML del documento (con el BOM si lo hay), o b"" si no tiene."""
+    start = 3 if content.startswith(b"\xef\xbb\xbf") else 0
+    if not content.startswith(b"<?xml", start):
+        return b""
+    end = content.find(b"?>", start)
+    return content[:end + 2] if end != -1 else b""
+
+
+def _xml_bounds(content: bytes, count: int) -> list[tuple[int, int]] | None:
+    """Rangos de `count` fragmentos de <player> completos, o None si no es posible."""
+    first = _find_xml_boundary(content, 0)
+    last = content.rfind(b"</player>")
+    if first == -1 or last == -1:
+        return None
+    end = last + len(b"</player>")
+
+    starts = [first]
+    step = (end - first) // count
+    for i in range(1, count):
+        boundary = _find_xml_boundary(content, first + i * step)
+        if boundary == -1 or boundary >= end:
+            break
+        if boundary > starts[-1]:
+            starts.append(boundary)
+    bounds = starts + [end]
+    return list(zip(bounds, bounds[1:]))
+
+
+def _xml_shard(content: bytes, prolog: bytes, start: int, end: int) -> bytes:
+    """Fragmento XML bien formado: declaración original y <player> envueltos en <shard>."""
+    return prolog + _XML_SHARD_OPEN + content[start:end] + _XML_SHARD_CLOSE
+
+
+def _txt_bounds(content: bytes, count: int) -> list[tuple[int, int]]:
+    """Rangos de `count` fragmentos de líneas completas (sin la cabecera)."""
+    header_end = content.find(b"\n") + 1
+    starts = [header_end]
+    step = (len(content) - header_end) // count
+    for i in range(1, count):
+        boundary = content.find(b"\n", header_end + i * step) + 1
+        if boundary == 0:
+            break
+        if boundary > starts[-1]:
+            starts.append(boundary)
+    bounds = starts + [len(content)]
+    return [(a, b) for a, b in zip(bounds, bounds[1:]) if b > a]
+
+
+def _txt_shard(content: bytes, header: bytes, start: int, end: int) -> bytes:
+    """Fragmento TXT: la cabecera seguida de las líneas del rango."""
+    return header + content[start:end]
+
+
+def _parse_shard(shard: bytes, fmt: str) -> list[PlayerRow]:
+    """Parsea un fragmento en un proceso del pool."""
+    return list(parse_players(shard, fmt))
+
+
+def parse_players_parallel(content: bytes, fmt: str = "xml", workers: int | None = None) -> Iterator[list[PlayerRow]]:
+    """
+    Parsea una lista FIDE en paralelo y genera lotes de PlayerRow (uno por fragmento).
+
+    Args:
+        content: Lista descomprimida (XML o TXT).
+        fmt: Formato de la lista ('xml' o 'txt').
+        workers: Procesos del pool. Por defecto, número de CPUs.
+
+    Yields:
+        Listas de PlayerRow, una por fragmento y en el orden del archivo (si
+        la lista no se puede fragmentar, se parsea en este proceso en lotes
+        de FALLBACK_BATCH_ROWS).
+    """
+    workers = workers or os.cpu_count() or 1
+    count = workers * SHARDS_PER_WORKER
+    make_shard: Callable[[int, int], bytes]
+    if fmt == "xml":
+        bounds = _xml_bounds(content, count)
+        make_shard = partial(_xml_shard, content, _xml_prolog(content))
+    else:
+        bounds = _txt_bounds(content, count)
+        make_shard = partial(_txt_shard, content, content[:content.find(b"\n") + 1])
+    if bounds is None:
+        # Sin límites <player> reconocibles (ej: prefijos de namespace): parseo normal en este proceso
+        logger.warning("No se pudo fragmentar la lista, parseando en un solo proceso")
+        players = parse_players(content, fmt)
+        while rows := list(islice(players, FALLBACK_BATCH_ROWS)):
+            yield rows
+        return
+
+    logger.info("Parseando %d fragmentos con %d procesos", len(bounds), workers)
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending = deque()
+        remaining = iter(bounds)
+        for a, b in remaining:
+            pending.append(pool.submit(_parse_shard, make_shard(a, b), fmt))
+            if len(pending) >= workers * PENDING_PER_WORKER:
+                break
+        while pending:
+            rows = pending.popleft().result()
+            next_bounds = next(remaining, None)
+            if next_bounds is not None:
+                pending.append(pool.submit(_parse_shard, make_shard(*next_bounds), fmt))
+            yield rows
@@ -0,0 +1,250 @@
+"""Pipeline productor/consumidor: parseo y escritura en la DB solapados.
+
+Un hilo productor recorre el iterador de lotes (parseo en streaming, o los
+resultados de `parse_players_parallel`) y los deja en una cola acotada; uno o
+varios loaders los escriben en PostgreSQL. Mientras un loader espera a la DB
+(psycopg2 libera el GIL durante la E/S de red) el productor parsea el lote
+siguiente, así que el tiempo total tiende al máximo de parseo y carga en lugar
+de a su suma.
+
+- Contrapresión: cada cola admite `queue_batches` lotes; si la DB va más lenta,
+  el productor se bloquea en lugar de acumular la lista en memoria.
+- Errores: el primer error (del productor o de un loader) detiene a los demás
+  y se relanza en el hilo que llamó a `run_pipeline`.
+- Transacciones: con `session` hay un solo loader, en el hilo que llama y en
+  la transacción de esa sesión (todo o nada, como la carga secuencial). Sin
+  ella, cada loader abre su propia conexión y transacción, y todas confirman
+  juntas solo si ninguno falló (una barrera antes del commit); un fallo
+  durante los propios commits puede dejar confirmada la parte de algún loader.
+- Reparto: con varios loaders cada uno tiene su cola y el productor envía
+  cada fila al loader `key(fila) % loaders`. Dos transacciones abiertas nunca
+  escriben la misma clave: si lo hicieran, la segunda esperaría el bloqueo de
+  fila de la primera, parada en la barrera, y la carga no terminaría nunca
+  (PostgreSQL no ve ese ciclo como un deadlock).
+"""
+
+import logging
+import queue
+import threading
+import time
+from collections.abc import Callable, Iterable
+from typing import TypeVar
+
+from sqlalchemy.orm import Session
+
+from src.database import get_db_session
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+QUEUE_BATCHES = 4  # Lotes en cola entre el productor y los loaders
+_POLL_SECONDS = 0.5  # Cada cuánto comprueban los hilos bloqueados si el pipeline se detuvo
+
+_END = object()  # Marca de fin de lotes, una por loader
+
+
+class _Aborted(Exception):
+    """Otro hilo del pipeline falló: el loader deshace su transacción."""
+
+
+class _Pipeline:
+    """Estado compartido entre el productor y los loaders (una cola por loader)."""
+
+    def __init__(self, loaders: int, queue_batches: int):
+        self.queues = [queue.Queue(maxsize=max(queue_batches, 1)) for _ in range(loaders)]
+        self.stop = threading.Event()
+        self.commit_barrier = threading.Barrier(loaders)
+        self.error: BaseException | None = None
+        self.total = 0
+        self.producer_wait = 0.0  # Segundos del productor con la cola llena
+        self.loader_wait = 0.0  # Segundos de los loaders con la cola vacía
+        self._lock = threading.Lock()
+
+    def fail(self, error: BaseException) -> None:
+        """Registra el primer error y detiene el resto de hilos."""
+        with self._lock:
+            if self.error is None:
+                self.error = error
+        self.stop.set()
+        self.commit_barrier.abort()
+
+    def put(self, loader: int, item) -> bool:
+        """Encola un elemento para un loader esperando si su cola está llena. False si el pipeline se detuvo."""
+        start = time.perf_counter()
+        try:
+            while not self.stop.is_set():
+                try:
+                    self.queues[loader].put(item, timeout=_POLL_SECONDS)
+                    return True
+                except queue.Full:
+                    continue
+            return False
+        finally:
+            self.producer_wait += time.perf_counter() - start
+
+    def get(self, loader: int):
+        """Siguiente lote de la cola del loader, esperando si está vacía. Lanza _Aborted si el pipeline se detuvo."""
+        start = time.perf_counter()
+        try:
+            while not self.stop.is_set():
+                try:
+                    return self.queues[loader].get(timeout=_POLL_SECONDS)
+                except queue.Empty:
+                    continue
+            raise _Aborted
+        finally:
+            with self._lock:
+                self.loader_wait += time.perf_counter() - start
+
+    def loaded(self, rows: int) -> None:
+        """Suma filas cargadas y registra el progreso."""
+        with self._lock:
+            self.total += rows
+            total = self.total
+        if total % 50000 == 0 or total < 10000:
+            logger.info("Importados %d jugadores...", total)
+
+
+def _produce(pipeline: _Pipeline, batches: Iterable[list[T]], key: Callable[[T], int] | None) -> None:
+    """Hilo productor: reparte los lotes entre las colas y encola una marca de fin por loader."""
+    iterator = iter(batches)
+    loaders = len(pipeline.queues)
+    try:
+        if loaders == 1:
+            for batch in iterator:
+                if not pipeline.put(0, batch):
+                    return
+        else:
+            # Cada loader acumula sus filas hasta el tamaño de los lotes de entrada
+            pending: list[list[T]] = [[] for _ in range(loaders)]
+            size = 1
+            for batch in iterator:
+                size = max(size, len(batch))
+                for row in batch:
+                    pending[key(row) % loaders].append(row)
+                for loader, rows in enumerate(pending):
+                    if len(rows) >= size:
+                        pending[loader] = []
+                        if not pipeline.put(loader, rows):
+                            return
+            for loader, rows in enumerate(pending):
+                if rows and not pipeline.put(loader, rows):
+                    return
+        for loader in range(loaders):
+            if not pipeline.put(loader, _END):
+                return
+    except BaseException as e:
+        pipeline.fail(e)
+    finally:
+        # Si el pipeline se detuvo antes de tiempo, cerrar el generador libera sus recursos
+        # (ej: el pool de procesos de parse_players_parallel)
+        close = getattr(iterator, "close", None)
+        if close is not None:
+            close()
+
+
+def _consume(
+    pipeline: _Pipeline,
+    loader: int,
+    session: Session,
+    write: Callable[[Session, list[T]], None],
+) -> None:
+    """Escribe lotes de la cola del loader en la sesión hasta la marca de fin."""
+    while True:
+        batch = pipeline.get(loader)
+        if batch is _END:
+            return
+        write(session, batch)
+        pipeline.loaded(len(batch))
+
+
+def _loader(
+    pipeline: _Pipeline,
+    loader: int,
+    write: Callable[[Session, list[T]], None],
+    setup: Callable[[Session], None] | None,
+) -> None:
+    """Hilo loader con su propia conexión: confirma solo si todos los loaders terminaron bien."""
+    try:
+        with get_db_session() as session:
+            if setup is not None:
+                setup(session)
+            _consume(pipeline, loader, session, write)
+            # Esperar al resto antes del commit: si alguno falla, abort() rompe la barrera
+            try:
+                pipeline.commit_barrier.wait()
+            except threading.BrokenBarrierError:
+                raise _Aborted from None
+    except _Aborted:
+        pass
+    except BaseException as e:
+        pipeline.fail(e)
+
+
+def run_pipeline(
+    batches: Iterable[list[T]],
+    write: Callable[[Session, list[T]], None],
+    session: Session | None = None,
+    loaders: int = 1,
+    key: Callable[[T], int] | None = None,
+    setup: Callable[[Session], None] | None = None,
+    queue_batches: int = QUEUE_BATCHES,
+) -> int:
+    """
+    Escribe lotes en la DB mientras se producen en otro hilo.
+
+    Args:
+        batches: Lotes a escribir (se recorren en el hilo productor).
+        write: Escribe un lote en una sesión (ej: upsert en players).
+        session: Si se indica, un solo loader en esta sesión y su
+            transacción (todo o nada). Si es None, `loaders` conexiones.
+        loaders: Hilos escritores, cada uno con su conexión (sin `session`).
+        key: Con varios loaders, clave entera de cada fila (ej: fideid): las
+            filas con la misma clave van siempre al mismo loader.
+        setup: Se llama al abrir la sesión de cada loader (ej: tune_session).
+        queue_batches: Lotes como máximo en cola (contrapresión).
+
+    Returns:
+        Total de filas escritas.
+
+    Raises:
+        ValueError: Si se pide más de un loader sobre una sola sesión, o
+            varios loaders sin `key`.
+        Exception: El primer error del productor o de un loader.
+    """
+    if session is not None and loaders != 1:
+        raise ValueError("Con una sesión compartida solo puede haber un loader")
+    loaders = max(loaders, 1)
+    if loaders > 1 and key is None:
+        raise ValueError("Con varios loaders hace falta `key` para repartir las filas")
+
+    pipeline = _Pipeline(loaders, queue_batches)
+    producer = threading.Thread(target=_produce, args=(pipeline, batches, key), name="pipeline-parse", daemon=True)
+    producer.start()
+
+    if session is not None:
+        try:
+            _consume(pipeline, 0, session, write)
+        except _Aborted:
+            pass
+        except BaseException as e:
+            pipeline.fail(e)
+    else:
+        threads = [
+            threading.Thread(target=_loader, args=(pipeline, i, write, setup), name=f"pipeline-load-{i}", daemon=True)
+            for i in range(loaders)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+    producer.join()
+
+    if pipeline.error is not None:
+        raise pipeline.error
+    logger.info(
+        "Pipeline: %d filas con %d loader(s); productor en espera %.1fs (cola llena), loaders %.1fs (cola vacía)",
+        pipeline.total, loaders, pipeline.producer_wait, pipeline.loader_wait,
+    )
+    return pipeline.total
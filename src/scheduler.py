@@ -0,0 +1,157 @@
+"""Importación programada: detecta nuevas publicaciones de FIDE e importa solo cuando cambian.
+
+En cada ciclo:
+
+1. Toma un advisory lock de PostgreSQL sin esperar (`pg_try_advisory_lock`):
+   si otro scheduler está importando, el ciclo se salta.
+2. Pide a FIDE solo las cabeceras del ZIP (HEAD; si no se admite, GET
+   condicional con If-None-Match / If-Modified-Since sin leer el cuerpo) y
+   compara ETag, Last-Modified y tamaño con la última publicación importada
+   (tabla list_releases).
+3. Si hay publicación nueva, ejecuta `run_import` (que avisa a los workers
+   de la API con NOTIFY en el canal IMPORT_CHANNEL para que recarguen sus
+   cachés) y guarda sus validadores.
+"""
+
+import logging
+import signal
+import threading
+from datetime import datetime, timezone
+
+import httpx
+from sqlalchemy import select, text
+from sqlalchemy.orm import Session
+
+from src.config import get_settings
+from src.database import get_db_session, get_engine, init_db
+from src.importer import run_import
+from src.models import ListRelease
+
+logger = logging.getLogger(__name__)
+
+IMPORT_LOCK_KEY = 7_110_502  # Clave del advisory lock de importación
+
+Validators = tuple[str | None, str | None, int | None]  # (etag, last_modified, content_length)
+
+
+def _validators(response: httpx.Response) -> Validators:
+    """ETag, Last-Modified y Content-Length de una respuesta."""
+    length = response.headers.get("content-length")
+    return (
+        response.headers.get("etag"),
+        response.headers.get("last-modified"),
+        int(length) if length and length.isdigit() else None,
+    )
+
+
+def fetch_validators(url: str, previous: ListRelease | None) -> Validators | None:
+    """
+    Obtiene los validadores actuales del ZIP sin descargarlo.
+
+    Returns:
+        Validadores de la publicación actual, o None si el servidor confirma
+        (304) que no ha cambiado.
+    """
+    with httpx.Client(timeout=30.0, follow_redirects=True) as client:
+        response = client.head(url)
+        if response.status_code not in (405, 501):
+            response.raise_for_status()
+            return _validators(response)
+
+        # Sin HEAD: GET condicional cerrando la conexión antes de leer el cuerpo
+        headers = {}
+        if previous is not None and previous.etag:
+            headers["If-None-Match"] = previous.etag
+        if previous is not None and previous.last_modified:
+            headers["If-Modified-Since"] = previous.last_modified
+        with client.stream("GET", url, headers=headers) as response:
+            if response.status_code == 304:
+                return None
+            response.raise_for_status()
+            return _validators(response)
+
+
+def is_new_release(current: Validators, previous: ListRelease | None) -> bool:
+    """Indica si los validadores corresponden a una publicación no importada."""
+    if previous is None:
+        return True
+    if not any(current):
+        # Sin validadores: como mucho una importación por mes (FIDE publica mensualmente)
+        logger.warning("El servidor no envía ETag, Last-Modified ni tamaño: se importa una vez al mes")
+        imported = previous.imported_at
+        now = datetime.now(timezone.utc)
+        return (imported.year, imported.month) != (now.year, now.month)
+    return current != (previous.etag, previous.last_modified, previous.content_length)
+
+
+def _save_release(session: Session, url: str, validators: Validators) -> None:
+    """Guarda los validadores de la publicación importada."""
+    etag, last_modified, content_length = validators
+    release = session.get(ListRelease, url) or ListRelease(url=url)
+    release.etag = etag
+    release.last_modified = last_modified
+    release.content_length = content_length
+    release.imported_at = datetime.now(timezone.utc)
+    session.add(release)
+
+
+def run_once(force: bool = False, **import_options) -> dict | None:
+    """
+    Ejecuta un ciclo: importa si hay publicación nueva (o si `force`).
+
+    Args:
+        force: Importar aunque la publicación no haya cambiado.
+        **import_options: Argumentos para `run_import` (swap, with_history, ...).
+
+    Returns:
+        Resultado de `run_import`, o None si no se importó.
+    """
+    url = get_settings().fide_xml_url
+    engine = get_engine()
+    init_db(engine)
+
+    with engine.connect() as lock_conn:
+        if not lock_conn.scalar(text("SELECT pg_try_advisory_lock(:key)"), {"key": IMPORT_LOCK_KEY}):
+            logger.info("Otra importación está en curso: se salta este ciclo")
+            return None
+        # El lock es de sesión: sobrevive al commit y no deja la conexión en una transacción abierta
+        lock_conn.commit()
+        try:
+            with get_db_session() as session:
+                previous = session.scalar(select(ListRelease).where(ListRelease.url == url))
+                session.expunge_all()
+            validators = fetch_validators(url, previous)
+            if validators is None or not (force or is_new_release(validators, previous)):
+                logger.info("Sin publicación nueva en %s", url)
+                return None
+
+            logger.info("Publicación nueva en %s (%s): importando", url, validators)
+            result = run_import(**import_options)
+
+            with get_db_session() as session:
+                _save_release(session, url, validators)
+            return result
+        finally:
+            lock_conn.execute(text("SELECT pg_advisory_unlock(:key)"), {"key": IMPORT_LOCK_KEY})
+            lock_conn.commit()
+
+
+def run_scheduler(interval_minutes: int | None = None, **import_options) -> None:
+    """
+    Bucle del scheduler: un ciclo cada `interval_minutes` hasta SIGINT/SIGTERM.
+
+    Los errores de un ciclo se registran y el scheduler sigue con el siguiente.
+    """
+    interval = (interval_minutes or get_settings().scheduler_interval_minutes) * 60
+    stop = threading.Event()
+    for signum in (signal.SIGINT, signal.SIGTERM):
+        signal.signal(signum, lambda *_: stop.set())
+
+    logger.info("Scheduler iniciado: comprobando cada %d min", interval // 60)
+    while not stop.is_set():
+        try:
+            run_once(**import_options)
+        except Exception as e:
+            logger.exception("Error en el ciclo del scheduler: %s", e)
+        stop.wait(interval)
+    logger.info("Scheduler detenido")
@@ -9,9 +9,9 @@ from typing import Any
 
 import httpx
 
-logger = logging.getLogger(__name__)
+from src.config import get_settings
 
-FIDE_STATS_URL = "https://ratings.fide.com/a_data_stats.php"
+logger = logging.getLogger(__name__)
 
 
 def _parse_int(val: Any) -> int:
@@ -35,7 +35,7 @@ def fetch_player_stats(fideid: int) -> dict | None:
         dict con total_games, standard_games, rapid_games, blitz_games,
         cada uno con white/black y wins, draws, losses. None si falla.
     """
-    url = f"{FIDE_STATS_URL}?id1={fideid}&id2=0"
+    url = f"{get_settings().fide_stats_url}?id1={fideid}&id2=0"
     headers = {
         "User-Agent": "Mozilla/5.0 (compatible; FIDE-Scraper/1.0)",
         "Referer": f"https://ratings.fide.com/profile/{fideid}/statistics",
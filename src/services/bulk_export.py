@@ -0,0 +1,85 @@
+"""Exportación en streaming (NDJSON / CSV) para descargas masivas desde la API.
+
+Las filas se leen como tuplas con un cursor de servidor (`yield_per`, que con
+psycopg2 abre un cursor con nombre) y se serializan por bloques, así que la
+memoria del servidor no depende del número de filas exportadas.
+"""
+
+import csv
+import io
+import json
+from collections.abc import Iterator, Sequence
+from datetime import date
+from typing import Literal
+
+from sqlalchemy import Select, select
+
+from src.database import get_db_session
+from src.models import PLAYER_COLUMNS, Player, PlayerRatingHistory
+
+ExportFormat = Literal["ndjson", "csv"]
+
+EXPORT_CHUNK_ROWS = 2000  # Filas por lectura del cursor y por bloque de la respuesta
+
+MEDIA_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv; charset=utf-8",
+}
+
+HISTORY_EXPORT_COLUMNS = (
+    PlayerRatingHistory.fideid,
+    PlayerRatingHistory.period,
+    PlayerRatingHistory.rating,
+    PlayerRatingHistory.rapid_rating,
+    PlayerRatingHistory.blitz_rating,
+)
+
+
+def players_export_query(country: str | None = None, min_rating: int | None = None) -> Select:
+    """Consulta de jugadores a exportar, en el mismo orden que `GET /players`."""
+    stmt = select(*PLAYER_COLUMNS)
+    if country:
+        stmt = stmt.where(Player.country == country.upper())
+    if min_rating is not None:
+        stmt = stmt.where(Player.rating >= min_rating)
+    return stmt.order_by(Player.rating.desc().nullslast(), Player.fideid)
+
+
+def history_export_query(country: str | None = None, since: date | None = None) -> Select:
+    """Consulta del historial de ratings a exportar, ordenado por jugador y periodo."""
+    stmt = select(*HISTORY_EXPORT_COLUMNS)
+    if country:
+        stmt = stmt.join(Player, Player.fideid == PlayerRatingHistory.fideid).where(
+            Player.country == country.upper()
+        )
+    if since is not None:
+        stmt = stmt.where(PlayerRatingHistory.period >= since)
+    return stmt.order_by(PlayerRatingHistory.fideid, PlayerRatingHistory.period)
+
+
+def _encode_ndjson(names: Sequence[str], rows: Sequence[tuple]) -> bytes:
+    lines = [json.dumps(dict(zip(names, row)), ensure_ascii=False, default=str) for row in rows]
+    lines.append("")
+    return "\n".join(lines).encode("utf-8")
+
+
+def _encode_csv(rows: Sequence[Sequence]) -> bytes:
+    buffer = io.StringIO()
+    csv.writer(buffer).writerows(rows)
+    return buffer.getvalue().encode("utf-8")
+
+
+def stream_rows(stmt: Select, fmt: ExportFormat) -> Iterator[bytes]:
+    """
+    Ejecuta la consulta y genera la respuesta en bloques de EXPORT_CHUNK_ROWS filas.
+
+    Abre su propia sesión: la respuesta se envía después de que FastAPI cierre
+    las dependencias del endpoint.
+    """
+    names = [column.key for column in stmt.selected_columns]
+    with get_db_session() as session:
+        result = session.execute(stmt.execution_options(yield_per=EXPORT_CHUNK_ROWS))
+        if fmt == "csv":
+            yield _encode_csv([names])
+        for rows in result.partitions():
+            yield _encode_ndjson(names, rows) if fmt == "ndjson" else _encode_csv(rows)
@@ -0,0 +1,125 @@
+"""Estadísticas agregadas por federación y continente, precalculadas en cada importación.
+
+`federation_stats` se reconstruye al final de `run_import` con una pasada
+set-based por tipo de rating: recuentos (activos, sexo, título, juniors),
+percentiles del rating y media del top 10 de activos para el mundo, cada
+federación y cada continente (mapa de `country_continent()`).
+"""
+
+import logging
+from datetime import date
+
+from sqlalchemy import delete, select, text
+from sqlalchemy.orm import Session
+
+from src.models import FederationStats
+from src.services.leaderboards import AGE_BRACKETS, RATING_COLUMNS
+from src.services.rankings import country_continent_arrays
+from src.services.sql_fragments import active_sql, continents_join_sql, scopes_sql
+
+logger = logging.getLogger(__name__)
+
+JUNIOR_MAX_AGE = AGE_BRACKETS["u20"][1]
+
+
+def rebuild_federation_stats(session: Session) -> int:
+    """
+    Reconstruye `federation_stats` desde la tabla players.
+
+    Para cada tipo de rating agrega los jugadores con rating > 0 por ámbito en
+    una sola consulta: los percentiles salen de un único `percentile_disc` con
+    array (una ordenación por ámbito) y el top 10 de activos de ROW_NUMBER().
+    Se ejecuta en la transacción de la sesión, como los leaderboards.
+
+    Returns:
+        Número de filas insertadas.
+    """
+    codes, continents = country_continent_arrays()
+    session.execute(delete(FederationStats))
+
+    total = 0
+    for rating_type, col in RATING_COLUMNS.items():
+        stmt = text(f"""
+            WITH scoped AS (
+                SELECT s.scope, s.scope_code, p.{col} AS rating, p.sex, p.title,
+                       p.birthday > 0 AND :year - p.birthday <= :junior_age AS junior,
+                       {active_sql('p')} AS active
+                FROM players p
+                {continents_join_sql('p')}
+                CROSS JOIN LATERAL {scopes_sql('p')}
+                WHERE p.{col} > 0
+                  AND s.scope_code IS NOT NULL
+            ),
+            ranked AS (
+                SELECT scoped.*,
+                       ROW_NUMBER() OVER (
+                           PARTITION BY scope, scope_code, active ORDER BY rating DESC
+                       ) AS position
+                FROM scoped
+            ),
+            titles AS (
+                SELECT scope, scope_code, jsonb_object_agg(title, players) AS titles
+                FROM (
+                    SELECT scope, scope_code, title, count(*) AS players
+                    FROM scoped
+                    WHERE title IS NOT NULL AND title <> ''
+                    GROUP BY scope, scope_code, title
+                ) t
+                GROUP BY scope, scope_code
+            ),
+            aggregated AS (
+                SELECT scope, scope_code,
+                       count(*) AS players,
+                       count(*) FILTER (WHERE active) AS active_players,
+                       count(*) FILTER (WHERE sex = 'M') AS male,
+                       count(*) FILTER (WHERE sex = 'F') AS female,
+                       count(*) FILTER (WHERE junior) AS juniors,
+                       round(avg(rating)) AS avg_rating,
+                       round(avg(rating) FILTER (WHERE active AND position <= 10)) AS top10_avg,
+                       percentile_disc(ARRAY[0.1, 0.25, 0.5, 0.75, 0.9])
+                           WITHIN GROUP (ORDER BY rating) AS percentiles,
+                       max(rating) AS max_rating
+                FROM ranked
+                GROUP BY scope, scope_code
+            )
+            INSERT INTO federation_stats
+                (rating_type, scope, scope_code, players, active_players, male, female, juniors,
+                 titles, avg_rating, top10_avg, p10, p25, median, p75, p90, max_rating)
+            SELECT :rating_type, a.scope, a.scope_code, a.players, a.active_players, a.male, a.female,
+                   a.juniors, COALESCE(t.titles, '{{}}'::jsonb)::json, a.avg_rating, a.top10_avg,
+                   a.percentiles[1], a.percentiles[2], a.percentiles[3], a.percentiles[4], a.percentiles[5],
+                   a.max_rating
+            FROM aggregated a
+            LEFT JOIN titles t ON t.scope = a.scope AND t.scope_code = a.scope_code
+        """)
+        result = session.execute(
+            stmt,
+            {
+                "rating_type": rating_type,
+                "codes": codes,
+                "continents": continents,
+                "year": date.today().year,
+                "junior_age": JUNIOR_MAX_AGE,
+            },
+        )
+        total += result.rowcount or 0
+
+    logger.info("Estadísticas de federaciones reconstruidas: %d filas", total)
+    return total
+
+
+def get_federation_stats(
+    session: Session,
+    rating_type: str = "standard",
+    scope: str = "country",
+    codes: list[str] | None = None,
+) -> list[dict]:
+    """Lee las estadísticas de un ámbito (opcionalmente solo algunos códigos), de más a menos jugadores."""
+    stmt = select(FederationStats).where(
+        FederationStats.rating_type == rating_type,
+        FederationStats.scope == scope,
+    )
+    if codes is not None:
+        stmt = stmt.where(FederationStats.scope_code.in_(codes))
+    stmt = stmt.order_by(FederationStats.players.desc(), FederationStats.scope_code)
+    return [s.to_dict() for s in session.scalars(stmt).all()]
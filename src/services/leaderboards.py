@@ -0,0 +1,261 @@
+"""Clasificaciones (leaderboards) y mayores subidas/bajadas precalculadas.
+
+Las tablas `leaderboard_snapshots` y `rating_movers` se reconstruyen tras cada
+importación con una pasada set-based (funciones ventana en PostgreSQL). La API
+solo lee rangos ya ordenados por el índice único, sin cálculos por petición.
+"""
+
+import logging
+from datetime import date
+
+from sqlalchemy import delete, select, text
+from sqlalchemy.orm import Session
+
+from src.models import LeaderboardEntry, PlayerRatingHistory, RatingMover
+from src.services.rankings import country_continent_arrays
+from src.services.sql_fragments import active_sql, continents_join_sql, scopes_sql
+
+logger = logging.getLogger(__name__)
+
+LEADERBOARD_SIZE = 100  # Puestos guardados por clasificación
+
+# Tipo de rating -> columna en players / player_rating_history
+RATING_COLUMNS = {
+    "standard": "rating",
+    "rapid": "rapid_rating",
+    "blitz": "blitz_rating",
+}
+
+# Tramos de edad (edad = año actual - año de nacimiento): (mínimo, máximo) inclusivos
+AGE_BRACKETS = {
+    "u16": (None, 16),
+    "u18": (None, 18),
+    "u20": (None, 20),
+    "50+": (50, None),
+    "65+": (65, None),
+}
+
+
+def _age_segments_sql() -> str:
+    """Genera las filas VALUES de segmentos por tramo de edad (NULL si no aplica)."""
+    rows = []
+    for key, (low, high) in AGE_BRACKETS.items():
+        conds = ["p.birthday > 0"]
+        if low is not None:
+            conds.append(f":year - p.birthday >= {low}")
+        if high is not None:
+            conds.append(f":year - p.birthday <= {high}")
+        rows.append(f"(CASE WHEN {' AND '.join(conds)} THEN 'age:{key}' END)")
+    return ", ".join(rows)
+
+
+def segment_key(sex: str | None = None, age: str | None = None, title: str | None = None) -> str:
+    """Clave de segmento almacenada en el snapshot ('all', 'sex:F', 'age:u20', 'title:GM').
+
+    Sexo y título se guardan en mayúsculas: la consulta no distingue mayúsculas.
+    """
+    if sex:
+        return f"sex:{sex.upper()}"
+    if age:
+        return f"age:{age}"
+    if title:
+        return f"title:{title.upper()}"
+    return "all"
+
+
+def rebuild_leaderboards(session: Session, top_n: int = LEADERBOARD_SIZE) -> int:
+    """
+    Reconstruye `leaderboard_snapshots` desde la tabla players.
+
+    Para cada tipo de rating calcula el top N de jugadores activos con rating > 0
+    por ámbito (mundo, federación, continente) y segmento (todos, sexo, título,
+    tramo de edad) con ROW_NUMBER(). Se ejecuta en la transacción de la sesión:
+    los lectores siguen viendo el snapshot anterior hasta el commit.
+
+    Returns:
+        Número de filas insertadas.
+    """
+    codes, continents = country_continent_arrays()
+    session.execute(delete(LeaderboardEntry))
+
+    total = 0
+    for rating_type, col in RATING_COLUMNS.items():
+        stmt = text(f"""
+            INSERT INTO leaderboard_snapshots
+                (rating_type, scope, scope_code, segment, position,
+                 fideid, name, country, sex, title, birthday, rating)
+            SELECT :rating_type, scope, scope_code, segment, position,
+                   fideid, name, country, sex, title, birthday, rating
+            FROM (
+                SELECT s.scope, s.scope_code, g.segment,
+                       p.fideid, p.name, p.country, p.sex, p.title, p.birthday,
+                       p.{col} AS rating,
+                       ROW_NUMBER() OVER (
+                           PARTITION BY s.scope, s.scope_code, g.segment
+                           ORDER BY p.{col} DESC, p.fideid
+                       ) AS position
+                FROM players p
+                {continents_join_sql('p')}
+                CROSS JOIN LATERAL {scopes_sql('p')}
+                CROSS JOIN LATERAL (VALUES
+                    ('all'), ('sex:' || upper(p.sex)), ('title:' || upper(p.title)), {_age_segments_sql()}
+                ) AS g(segment)
+                WHERE p.{col} > 0
+                  AND {active_sql('p')}
+                  AND s.scope_code IS NOT NULL
+                  AND g.segment IS NOT NULL
+            ) ranked
+            WHERE position <= :top_n
+        """)
+        result = session.execute(
+            stmt,
+            {
+                "rating_type": rating_type,
+                "codes": codes,
+                "continents": continents,
+                "year": date.today().year,
+                "top_n": top_n,
+            },
+        )
+        total += result.rowcount or 0
+
+    logger.info("Leaderboards reconstruidos: %d filas", total)
+    return total
+
+
+def _latest_periods(session: Session) -> tuple[date, date] | None:
+    """Retorna (periodo actual, periodo anterior) del historial, o None si hay menos de dos."""
+    stmt = (
+        select(PlayerRatingHistory.period)
+        .distinct()
+        .order_by(PlayerRatingHistory.period.desc())
+        .limit(2)
+    )
+    periods = list(session.scalars(stmt).all())
+    if len(periods) < 2:
+        return None
+    return periods[0], periods[1]
+
+
+def rebuild_movers(session: Session, top_n: int = LEADERBOARD_SIZE) -> int:
+    """
+    Reconstruye `rating_movers` comparando los dos últimos periodos del historial.
+
+    Guarda las N mayores subidas ('up') y bajadas ('down') por tipo de rating y
+    ámbito. Requiere al menos dos periodos en player_rating_history.
+
+    Returns:
+        Número de filas insertadas.
+    """
+    periods = _latest_periods(session)
+    session.execute(delete(RatingMover))
+    if periods is None:
+        logger.info("Movers: se necesitan al menos dos periodos de historial")
+        return 0
+
+    current, previous = periods
+    codes, continents = country_continent_arrays()
+
+    total = 0
+    for rating_type, col in RATING_COLUMNS.items():
+        stmt = text(f"""
+            INSERT INTO rating_movers
+                (rating_type, scope, scope_code, direction, position, period, previous_period,
+                 fideid, name, country, title, rating, previous_rating, change)
+            SELECT :rating_type, scope, scope_code, direction, position, :current, :previous,
+                   fideid, name, country, title, rating, previous_rating, change
+            FROM (
+                SELECT s.scope, s.scope_code, d.direction,
+                       p.fideid, p.name, p.country, p.title,
+                       h.{col} AS rating, h0.{col} AS previous_rating,
+                       h.{col} - h0.{col} AS change,
+                       ROW_NUMBER() OVER (
+                           PARTITION BY s.scope, s.scope_code, d.direction
+                           ORDER BY d.sign * (h.{col} - h0.{col}) DESC, p.fideid
+                       ) AS position
+                FROM player_rating_history h
+                JOIN player_rating_history h0
+                  ON h0.fideid = h.fideid AND h0.period = :previous
+                JOIN players p ON p.fideid = h.fideid
+                {continents_join_sql('p')}
+                CROSS JOIN LATERAL {scopes_sql('p')}
+                CROSS JOIN (VALUES ('up', 1), ('down', -1)) AS d(direction, sign)
+                WHERE h.period = :current
+                  AND h.{col} > 0
+                  AND h0.{col} > 0
+                  AND d.sign * (h.{col} - h0.{col}) > 0
+                  AND s.scope_code IS NOT NULL
+            ) ranked
+            WHERE position <= :top_n
+        """)
+        result = session.execute(
+            stmt,
+            {
+                "rating_type": rating_type,
+                "codes": codes,
+                "continents": continents,
+                "current": current,
+                "previous": previous,
+                "top_n": top_n,
+            },
+        )
+        total += result.rowcount or 0
+
+    logger.info("Movers reconstruidos (%s vs %s): %d filas", current, previous, total)
+    return total
+
+
+def get_leaderboard(
+    session: Session,
+    rating_type: str = "standard",
+    scope: str = "world",
+    scope_code: str = "",
+    segment: str = "all",
+    limit: int = LEADERBOARD_SIZE,
+) -> list[dict]:
+    """Lee una clasificación del snapshot (lectura de rango por índice)."""
+    stmt = (
+        select(LeaderboardEntry)
+        .where(
+            LeaderboardEntry.rating_type == rating_type,
+            LeaderboardEntry.scope == scope,
+            LeaderboardEntry.scope_code == scope_code,
+            LeaderboardEntry.segment == segment,
+        )
+        .order_by(LeaderboardEntry.position)
+        .limit(limit)
+    )
+    return [e.to_dict() for e in session.scalars(stmt).all()]
+
+
+def get_movers(
+    session: Session,
+    rating_type: str = "standard",
+    scope: str = "world",
+    scope_code: str = "",
+    direction: str = "up",
+    limit: int = LEADERBOARD_SIZE,
+) -> dict:
+    """
+    Lee las mayores subidas/bajadas del snapshot.
+
+    Returns:
+        dict con period, previous_period y la lista de jugadores.
+    """
+    stmt = (
+        select(RatingMover)
+        .where(
+            RatingMover.rating_type == rating_type,
+            RatingMover.scope == scope,
+            RatingMover.scope_code == scope_code,
+            RatingMover.direction == direction,
+        )
+        .order_by(RatingMover.position)
+        .limit(limit)
+    )
+    rows = list(session.scalars(stmt).all())
+    return {
+        "period": rows[0].period.isoformat() if rows else None,
+        "previous_period": rows[0].previous_period.isoformat() if rows else None,
+        "players": [r.to_dict() for r in rows],
+    }
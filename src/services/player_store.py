@@ -0,0 +1,279 @@
+"""Almacén de jugadores en memoria, columnar, para servir la API sin PostgreSQL.
+
+Opcional (`PLAYER_STORE=true`). Guarda cada columna en un `array` compacto:
+enteros en int32 (con NULL_INT como NULL), códigos de país/título/flag
+codificados por diccionario en uint16 y los nombres en un único heap UTF-8
+con offsets. Las filas están ordenadas por fideid (búsqueda binaria, sin dict
+fideid -> fila) y se precalculan el orden por rating y los rankings de cada
+jugador, con la misma semántica que `src/services/rankings.py`. El almacén
+finalizado puede guardarse y mapearse desde disco con `src/snapshot.py`.
+"""
+
+import logging
+import mmap
+from array import array
+from bisect import bisect_left
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from src.models import Player
+from src.parser import PLAYER_FIELDS
+from src.services.rankings import country_continent, is_active_flag
+
+logger = logging.getLogger(__name__)
+
+NULL_INT = -(2**31)  # Centinela de NULL en columnas int32
+
+INT_COLUMNS = (
+    "fideid",
+    "rating",
+    "games",
+    "rapid_rating",
+    "rapid_games",
+    "blitz_rating",
+    "blitz_games",
+    "birthday",
+    "foa_rating",
+)
+CODE_COLUMNS = ("country", "sex", "title", "flag", "foa_title")
+
+# Columnas de ranking precalculadas: (ámbito, solo activos)
+RANK_COLUMNS = {
+    "rank_world_active": ("world", True),
+    "rank_world_all": ("world", False),
+    "rank_national_active": ("national", True),
+    "rank_national_all": ("national", False),
+    "rank_continent_active": ("continent", True),
+    "rank_continent_all": ("continent", False),
+}
+
+LOAD_CHUNK = 50_000
+
+
+class _RankState:
+    """Estado de una pasada descendente por rating para un ámbito."""
+
+    __slots__ = ("seen", "rating", "before")
+
+    def __init__(self):
+        self.seen = 0  # Jugadores del ámbito ya vistos (rating > 0)
+        self.rating = None  # Rating del grupo de empate actual
+        self.before = 0  # Jugadores del ámbito con rating estrictamente mayor
+
+    def rank(self, rating: int, counts: bool) -> int:
+        """Rank = 1 + jugadores del ámbito con rating mayor; `counts` si la fila pertenece al ámbito."""
+        if rating != self.rating:
+            self.rating = rating
+            self.before = self.seen
+        if counts:
+            self.seen += 1
+        return self.before + 1
+
+
+class PlayerStore:
+    """Tabla players en formato columnar de solo lectura."""
+
+    def __init__(self):
+        self.size = 0
+        self.ints: dict[str, array] = {c: array("i") for c in INT_COLUMNS}
+        self.codes: dict[str, array] = {c: array("H") for c in CODE_COLUMNS}
+        # Diccionarios de códigos: el código 0 es siempre None
+        self.values: dict[str, list[str | None]] = {c: [None] for c in CODE_COLUMNS}
+        self.name_heap = bytearray()
+        self.name_offsets = array("I", [0])
+        self.order = array("I")
+        self.country_order: dict[str, array] = {}
+        self.ranks: dict[str, array] = {c: array("i") for c in RANK_COLUMNS}
+        self.totals: dict[tuple[str, str], tuple[int, int]] = {}
+        self._code_index: dict[str, dict[str | None, int]] = {c: {None: 0} for c in CODE_COLUMNS}
+        # Si se abrió desde un snapshot (src/snapshot.py), las columnas son memoryviews sobre este mmap
+        self.mapped: mmap.mmap | None = None
+
+    # --- Construcción -----------------------------------------------------
+
+    def append(self, row: dict) -> None:
+        """Añade un jugador (las filas deben llegar ordenadas por fideid)."""
+        for col in INT_COLUMNS:
+            value = row.get(col)
+            self.ints[col].append(NULL_INT if value is None else value)
+        for col in CODE_COLUMNS:
+            value = row.get(col) or None
+            index = self._code_index[col]
+            code = index.get(value)
+            if code is None:
+                code = index[value] = len(self.values[col])
+                self.values[col].append(value)
+            self.codes[col].append(code)
+        self.name_heap += (row.get("name") or "").encode("utf-8")
+        self.name_offsets.append(len(self.name_heap))
+        self.size += 1
+
+    def finalize(self) -> None:
+        """Calcula el orden por rating, índices por país y rankings precalculados."""
+        ratings = self.ints["rating"]
+        # Orden estable: rating desc (NULL_INT queda al final), desempate por fideid
+        self.order = array("I", sorted(range(self.size), key=ratings.__getitem__, reverse=True))
+
+        countries = self.values["country"]
+        country_codes = self.codes["country"]
+        by_country: dict[str, array] = {}
+        for row in self.order:
+            code = countries[country_codes[row]] or ""
+            rows = by_country.get(code)
+            if rows is None:
+                rows = by_country[code] = array("I")
+            rows.append(row)
+        self.country_order = by_country
+
+        self._compute_ranks()
+        self._code_index = {}
+        logger.info("Player store: %d jugadores, %d KB", self.size, self.nbytes() // 1024)
+
+    def _compute_ranks(self) -> None:
+        """Una pasada por rating descendente para todos los ámbitos (world, national, continent)."""
+        ratings = self.ints["rating"]
+        countries = self.values["country"]
+        country_codes = self.codes["country"]
+        continents = country_continent()
+        active_flags = [is_active_flag(flag) for flag in self.values["flag"]]
+        flag_codes = self.codes["flag"]
+
+        ranks = {c: array("i", [1]) * self.size for c in RANK_COLUMNS}
+        states: dict[tuple[str, str, bool], _RankState] = {}
+        totals: dict[tuple[str, str], list[int]] = {}
+
+        for row in self.order:
+            rating = ratings[row]
+            if rating == NULL_INT or rating <= 0:
+                continue  # Sin rating: rank 1, como _count_better_ranked
+            country = countries[country_codes[row]] or ""
+            continent = continents.get(country)
+            active = active_flags[flag_codes[row]]
+            scopes = {"world": "", "national": country, "continent": continent}
+            for col, (scope, active_only) in RANK_COLUMNS.items():
+                code = scopes[scope]
+                if code is None:
+                    continue
+                key = (scope, code, active_only)
+                state = states.get(key)
+                if state is None:
+                    state = states[key] = _RankState()
+                ranks[col][row] = state.rank(rating, active or not active_only)
+            for scope, code in scopes.items():
+                if code is None:
+                    continue
+                counts = totals.setdefault((scope, code), [0, 0])
+                counts[0] += active
+                counts[1] += 1
+
+        self.ranks = ranks
+        self.totals = {k: (v[0], v[1]) for k, v in totals.items()}
+
+    def nbytes(self) -> int:
+        """Memoria aproximada ocupada por las columnas."""
+        arrays = [*self.ints.values(), *self.codes.values(), *self.ranks.values(), *self.country_order.values()]
+        arrays += [self.name_offsets, self.order]
+        return sum(a.itemsize * len(a) for a in arrays) + len(self.name_heap)
+
+    # --- Lectura ----------------------------------------------------------
+
+    def find(self, fideid: int) -> int | None:
+        """Retorna la fila del jugador (búsqueda binaria por fideid) o None."""
+        fideids = self.ints["fideid"]
+        row = bisect_left(fideids, fideid)
+        if row < self.size and fideids[row] == fideid:
+            return row
+        return None
+
+    def _int(self, col: str, row: int) -> int | None:
+        value = self.ints[col][row]
+        return None if value == NULL_INT else value
+
+    def _code(self, col: str, row: int) -> str | None:
+        return self.values[col][self.codes[col][row]]
+
+    def name(self, row: int) -> str:
+        """Nombre del jugador desde el heap de strings."""
+        start, end = self.name_offsets[row], self.name_offsets[row + 1]
+        return str(self.name_heap[start:end], "utf-8")
+
+    def to_dict(self, row: int) -> dict:
+        """Equivalente a Player.to_dict() para la fila dada."""
+        result = {}
+        for field in PLAYER_FIELDS:
+            if field == "name":
+                result[field] = self.name(row)
+            elif field in self.codes:
+                result[field] = self._code(field, row)
+            else:
+                result[field] = self._int(field, row)
+        return result
+
+    def rankings(self, row: int) -> dict:
+        """Rankings precalculados con la misma estructura que get_player_rankings()."""
+        country = self._code("country", row) or ""
+        codes = {"world": "", "national": country, "continent": country_continent().get(country)}
+        result: dict = {}
+        for scope, key in (("world", "world"), ("national", "national"), ("continent", "continent")):
+            code = codes[scope]
+            if code is None:
+                result[key] = {"rank_active": None, "rank_all": None, "total_active": None, "total_all": None}
+                continue
+            total_active, total_all = self.totals.get((scope, code), (0, 0))
+            result[key] = {
+                "rank_active": self.ranks[f"rank_{scope}_active"][row],
+                "rank_all": self.ranks[f"rank_{scope}_all"][row],
+                "total_active": total_active,
+                "total_all": total_all,
+            }
+        return result
+
+    def list_players(
+        self,
+        skip: int = 0,
+        limit: int = 50,
+        country: str | None = None,
+        min_rating: int | None = None,
+    ) -> list[dict]:
+        """Mismo resultado que list_players en la API (orden rating desc, fideid)."""
+        rows = self.order if country is None else self.country_order.get(country, array("I"))
+        end = len(rows)
+        if min_rating is not None:
+            # Las filas están en rating descendente: las que cumplen forman un prefijo
+            ratings = self.ints["rating"]
+            end = bisect_left(rows, -min_rating + 1, key=lambda r: -ratings[r])
+        return [self.to_dict(r) for r in rows[skip:min(skip + limit, end)]]
+
+
+def build_player_store(session: Session) -> PlayerStore:
+    """Construye el almacén leyendo la tabla players como tuplas (sin objetos ORM)."""
+    table = Player.__table__
+    columns = [table.c[f] for f in PLAYER_FIELDS]
+    stmt = select(*columns).order_by(table.c.fideid).execution_options(yield_per=LOAD_CHUNK)
+
+    store = PlayerStore()
+    for row in session.execute(stmt):
+        store.append(row._mapping)
+    store.finalize()
+    return store
+
+
+_store: PlayerStore | None = None
+
+
+def get_player_store() -> PlayerStore | None:
+    """Retorna el almacén cargado, o None si está desactivado o sin cargar."""
+    return _store
+
+
+def publish_player_store(store: PlayerStore) -> PlayerStore:
+    """Publica un almacén (las lecturas en curso usan el anterior)."""
+    global _store
+    _store = store
+    return store
+
+
+def load_player_store(session: Session) -> PlayerStore:
+    """Construye un almacén nuevo desde la base de datos y lo publica."""
+    return publish_player_store(build_player_store(session))
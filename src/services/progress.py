@@ -1,12 +1,25 @@
 """Servicio para obtener historial de rating (Progress)."""
 
-from datetime import date, timedelta
+from collections.abc import Sequence
+from datetime import date
 
-from sqlalchemy import select
+from sqlalchemy import Integer, any_, bindparam, select
+from sqlalchemy.dialects.postgresql import ARRAY
 from sqlalchemy.orm import Session
 
 from src.models import PlayerRatingHistory
 
+MAX_BULK_PLAYERS = 500  # Máximo de jugadores por consulta de progreso masiva
+
+_RATING_FIELDS = ("rating", "rapid_rating", "blitz_rating")
+
+
+def month_start(months_back: int, today: date | None = None) -> date:
+    """Primer día del mes de hace `months_back` meses (0 = mes actual)."""
+    today = today or date.today()
+    index = today.year * 12 + today.month - 1 - months_back
+    return date(index // 12, index % 12 + 1, 1)
+
 
 def get_player_progress(
     session: Session,
@@ -19,18 +32,16 @@ def get_player_progress(
     Args:
         session: Sesión de DB
         fideid: ID FIDE del jugador
-        months: Número de meses hacia atrás
+        months: Número de meses hacia atrás, contando el actual
 
     Returns:
         Lista ordenada por periodo de dicts con period, rating, rapid_rating, blitz_rating
     """
-    cutoff = date.today() - timedelta(days=months * 31)  # aprox
-
     stmt = (
         select(PlayerRatingHistory)
         .where(
             PlayerRatingHistory.fideid == fideid,
-            PlayerRatingHistory.period >= cutoff,
+            PlayerRatingHistory.period >= month_start(months - 1),
         )
         .order_by(PlayerRatingHistory.period.asc())
     )
@@ -45,3 +56,56 @@ def get_player_progress(
         }
         for r in rows
     ]
+
+
+def get_bulk_progress(
+    session: Session,
+    fideids: Sequence[int],
+    start: date,
+    end: date,
+) -> dict:
+    """
+    Series de ratings de varios jugadores entre dos periodos (inclusive) en una sola consulta.
+
+    Usa `fideid = ANY(:ids)` (un único parámetro array, sobre el índice
+    (fideid, period)). El resultado es columnar: la lista de periodos una vez y,
+    por jugador, un array por tipo de rating alineado con ella (null si falta
+    el periodo).
+
+    Returns:
+        dict con periods, players (en el orden pedido) y missing (fideids sin historial).
+    """
+    ids = list(dict.fromkeys(fideids))
+    stmt = (
+        select(
+            PlayerRatingHistory.fideid,
+            PlayerRatingHistory.period,
+            PlayerRatingHistory.rating,
+            PlayerRatingHistory.rapid_rating,
+            PlayerRatingHistory.blitz_rating,
+        )
+        .where(
+            PlayerRatingHistory.fideid == any_(bindparam("ids", ids, type_=ARRAY(Integer))),
+            PlayerRatingHistory.period >= start.replace(day=1),
+            PlayerRatingHistory.period <= end.replace(day=1),
+        )
+        .order_by(PlayerRatingHistory.fideid, PlayerRatingHistory.period)
+    )
+    rows = session.execute(stmt).all()
+
+    periods = sorted({row.period for row in rows})
+    position = {period: i for i, period in enumerate(periods)}
+    series: dict[int, dict[str, list[int | None]]] = {}
+    for fideid, period, *ratings in rows:
+        player = series.get(fideid)
+        if player is None:
+            player = series[fideid] = {field: [None] * len(periods) for field in _RATING_FIELDS}
+        i = position[period]
+        for field, value in zip(_RATING_FIELDS, ratings):
+            player[field][i] = value
+
+    return {
+        "periods": [period.isoformat() for period in periods],
+        "players": [{"fideid": fideid, **series[fideid]} for fideid in ids if fideid in series],
+        "missing": [fideid for fideid in ids if fideid not in series],
+    }
@@ -0,0 +1,116 @@
+"""Rankings históricos: puesto mundial, nacional y continental de cada jugador por periodo.
+
+Se calculan al importar cada periodo del historial con una pasada set-based
+(RANK() sobre player_rating_history) y se guardan en la propia fila del
+periodo, así que la evolución del ranking de un jugador es una lectura por el
+índice (fideid, period).
+
+Como `rank_active` de `src/services/rankings.py`: 1 + jugadores activos del
+ámbito con rating estrictamente mayor, entre jugadores con rating > 0. Activo
+es, como en las clasificaciones, sin flag de inactividad ('i' o 'wi') en la
+lista del periodo; los inactivos no tienen ranking (NULL). La federación es
+también la de la lista del periodo.
+"""
+
+import logging
+from datetime import date
+
+from sqlalchemy import select, text
+from sqlalchemy.orm import Session
+
+from src.models import PlayerRatingHistory
+from src.services.leaderboards import RATING_COLUMNS
+from src.services.progress import month_start
+from src.services.rankings import country_continent_arrays
+from src.services.sql_fragments import active_sql, continents_join_sql
+
+logger = logging.getLogger(__name__)
+
+RANK_SCOPES = ("world", "national", "continent")
+
+# Prefijo de las columnas de ranking por tipo de rating (como rating / rapid_rating / blitz_rating)
+_RANK_PREFIX = {"standard": "", "rapid": "rapid_", "blitz": "blitz_"}
+
+
+def rank_column(rating_type: str, scope: str) -> str:
+    """Columna de player_rating_history con el ranking (ej: rapid_national_rank)."""
+    return f"{_RANK_PREFIX[rating_type]}{scope}_rank"
+
+
+def _rank_expressions() -> list[tuple[str, str]]:
+    """(columna, expresión RANK()) para cada tipo de rating y ámbito."""
+    expressions = []
+    for rating_type, col in RATING_COLUMNS.items():
+        ranked = f"(h.{col} > 0 AND {active_sql('h')})"
+        partitions = {
+            "world": ("", ""),
+            "national": (" AND h.country IS NOT NULL", ", h.country"),
+            "continent": (" AND cc.continent IS NOT NULL", ", cc.continent"),
+        }
+        for scope, (condition, partition) in partitions.items():
+            expressions.append((
+                rank_column(rating_type, scope),
+                f"CASE WHEN {ranked}{condition} THEN "
+                f"RANK() OVER (PARTITION BY {ranked}{partition} ORDER BY h.{col} DESC) END",
+            ))
+    return expressions
+
+
+def rebuild_period_ranks(session: Session, period: date) -> int:
+    """
+    Calcula y guarda los rankings de todos los jugadores de un periodo.
+
+    Una sola sentencia UPDATE ... FROM con una función ventana por tipo de
+    rating y ámbito. Se ejecuta en la transacción de la sesión.
+
+    Returns:
+        Número de filas actualizadas.
+    """
+    expressions = _rank_expressions()
+    codes, continents = country_continent_arrays()
+    stmt = text(f"""
+        UPDATE player_rating_history t
+        SET {", ".join(f"{column} = r.{column}" for column, _ in expressions)}
+        FROM (
+            SELECT h.id, {", ".join(f"{expr} AS {column}" for column, expr in expressions)}
+            FROM player_rating_history h
+            {continents_join_sql('h')}
+            WHERE h.period = :period
+        ) r
+        WHERE t.id = r.id
+    """)
+    result = session.execute(stmt, {"period": period, "codes": codes, "continents": continents})
+    rows = result.rowcount or 0
+    logger.info("Rankings del periodo %s: %d jugadores", period, rows)
+    return rows
+
+
+def get_rank_history(
+    session: Session,
+    fideid: int,
+    rating_type: str = "standard",
+    months: int = 24,
+) -> dict:
+    """
+    Evolución del ranking de un jugador, en formato columnar.
+
+    Returns:
+        dict con periods, rating y un array por ámbito (world, national,
+        continent) alineados con periods.
+    """
+    rating = getattr(PlayerRatingHistory, RATING_COLUMNS[rating_type])
+    ranks = [getattr(PlayerRatingHistory, rank_column(rating_type, scope)) for scope in RANK_SCOPES]
+    stmt = (
+        select(PlayerRatingHistory.period, rating, *ranks)
+        .where(
+            PlayerRatingHistory.fideid == fideid,
+            PlayerRatingHistory.period >= month_start(months - 1),
+        )
+        .order_by(PlayerRatingHistory.period.asc())
+    )
+    rows = session.execute(stmt).all()
+    return {
+        "periods": [row[0].isoformat() for row in rows],
+        "rating": [row[1] for row in rows],
+        **{scope: [row[2 + i] for row in rows] for i, scope in enumerate(RANK_SCOPES)},
+    }
@@ -1,22 +1,47 @@
 """Cálculo de rankings mundial, nacional y continental."""
 
 import json
+from functools import lru_cache
 from pathlib import Path
 
-from sqlalchemy import func, or_, select
+from sqlalchemy import Row, func, or_, select
 from sqlalchemy.orm import Session
 
 from src.models import Player
 
-# Cargar mapeo país -> continente
 _DATA_DIR = Path(__file__).resolve().parent.parent / "data"
-with open(_DATA_DIR / "country_continent.json", encoding="utf-8") as f:
-    COUNTRY_CONTINENT = json.load(f)
+
+
+@lru_cache
+def country_continent() -> dict[str, str]:
+    """Mapeo país -> continente (se lee del JSON en el primer uso)."""
+    with open(_DATA_DIR / "country_continent.json", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def countries_in_continent(continent: str) -> list[str]:
+    """Códigos de las federaciones de un continente."""
+    return [c for c, cont in country_continent().items() if cont == continent]
+
+
+def country_continent_arrays() -> tuple[list[str], list[str]]:
+    """Mapeo país -> continente como dos listas paralelas (para `unnest` en SQL)."""
+    mapping = country_continent()
+    countries = list(mapping)
+    return countries, [mapping[c] for c in countries]
+
+
+# Activo: sin flag de inactividad ('i' o 'wi'); 'w' solo indica jugadora. La
+# misma regla en SQL es `sql_fragments.active_sql` (clasificaciones,
+# estadísticas por federación y rankings históricos).
+def is_active_flag(flag: str | None) -> bool:
+    """True si el flag de FIDE no marca inactividad (NULL, '' o 'w')."""
+    return not flag or "i" not in flag.lower()
 
 
 def _is_active():
     """Condición para jugadores activos (sin flag de inactividad)."""
-    return or_(Player.flag.is_(None), Player.flag == "")
+    return or_(Player.flag.is_(None), Player.flag.not_ilike("%i%"))
 
 
 def _rated():
@@ -36,7 +61,7 @@ def _count_better_ranked(session: Session, rating: int | None, country: str | No
     if country:
         stmt = stmt.where(Player.country == country)
     if continent:
-        stmt = stmt.where(Player.country.in_(c for c, cont in COUNTRY_CONTINENT.items() if cont == continent))
+        stmt = stmt.where(Player.country.in_(countries_in_continent(continent)))
     if active_only:
         stmt = stmt.where(_is_active())
 
@@ -49,17 +74,19 @@ def _count_total(session: Session, country: str | None = None, continent: str |
     if country:
         stmt = stmt.where(Player.country == country)
     if continent:
-        stmt = stmt.where(Player.country.in_(c for c, cont in COUNTRY_CONTINENT.items() if cont == continent))
+        stmt = stmt.where(Player.country.in_(countries_in_continent(continent)))
     if active_only:
         stmt = stmt.where(_is_active())
 
     return session.scalar(stmt) or 0
 
 
-def get_player_rankings(session: Session, player: Player) -> dict:
+def get_player_rankings(session: Session, player: Player | Row) -> dict:
     """
     Calcula los rankings mundial, nacional y continental para un jugador.
 
+    `player` puede ser la entidad o una fila con `rating` y `country`.
+
     Returns:
         dict con estructura:
         {
@@ -70,7 +97,7 @@ def get_player_rankings(session: Session, player: Player) -> dict:
     """
     rating = player.rating or 0
     country = player.country
-    continent = COUNTRY_CONTINENT.get(country, "Unknown")
+    continent = country_continent().get(country, "Unknown")
 
     def _ranks(scope_country: str | None, scope_continent: str | None) -> dict:
         rank_active = 1 + _count_better_ranked(session, rating, scope_country, scope_continent, active_only=True)
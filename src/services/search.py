@@ -0,0 +1,75 @@
+"""Búsqueda de jugadores por nombre (sin acentos, sin mayúsculas, tolerante a errores).
+
+El importer guarda en `players.name_search` el nombre normalizado con
+`normalize_name` y la búsqueda usa un índice GIN de trigramas (pg_trgm) sobre
+esa columna: prefijos con LIKE y errores tipográficos con word similarity.
+"""
+
+import re
+import unicodedata
+
+from sqlalchemy import func, or_, select
+from sqlalchemy.orm import Session
+
+from src.models import Player
+
+_NON_ALNUM = re.compile(r"[^0-9a-z]+")
+
+
+def normalize_name(name: str | None) -> str:
+    """
+    Normaliza un nombre para búsqueda.
+
+    Quita acentos, pasa a minúsculas y reduce a palabras alfanuméricas
+    separadas por un espacio: "Pérez, José-Luis" -> "perez jose luis".
+    """
+    if not name:
+        return ""
+    decomposed = unicodedata.normalize("NFKD", name)
+    ascii_only = "".join(c for c in decomposed if not unicodedata.combining(c))
+    return _NON_ALNUM.sub(" ", ascii_only.lower()).strip()
+
+
+def search_players(
+    session: Session,
+    query: str,
+    country: str | None = None,
+    title: str | None = None,
+    limit: int = 20,
+) -> list[dict]:
+    """
+    Busca jugadores por nombre.
+
+    Coincidencias de prefijo ("carlsen m") primero, después por similitud de
+    palabra (tolera errores: "carlsn"), y a igualdad por rating.
+
+    Returns:
+        Lista de dicts de jugador con la clave adicional `score` (0-1).
+    """
+    q = normalize_name(query)
+    if not q:
+        return []
+
+    is_prefix = Player.name_search.like(f"{q}%")
+    score = func.word_similarity(q, Player.name_search)
+    stmt = select(Player, score.label("score")).where(
+        or_(is_prefix, Player.name_search.bool_op("%>")(q)),
+    )
+    if country:
+        stmt = stmt.where(Player.country == country.upper())
+    if title:
+        # Sin distinguir mayúsculas, como los segmentos de título de las clasificaciones
+        stmt = stmt.where(func.upper(Player.title) == title.upper())
+    stmt = stmt.order_by(
+        is_prefix.desc(),
+        score.desc(),
+        Player.rating.desc().nullslast(),
+        Player.fideid,
+    ).limit(limit)
+
+    results = []
+    for player, player_score in session.execute(stmt):
+        item = player.to_dict()
+        item["score"] = round(float(player_score or 0), 3)
+        results.append(item)
+    return results
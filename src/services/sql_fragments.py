@@ -0,0 +1,28 @@
+"""Fragmentos SQL compartidos por las reconstrucciones set-based.
+
+Clasificaciones (`leaderboards`), estadísticas por federación (`federations`)
+y rankings históricos (`rank_history`) agregan por los mismos ámbitos y con
+la misma definición de jugador activo. Cada fragmento recibe el alias de la
+tabla de jugadores de la consulta (`players p` o `player_rating_history h`).
+"""
+
+
+def active_sql(alias: str = "p") -> str:
+    """Condición de jugador activo sobre `<alias>.flag` (misma regla que rankings.is_active_flag)."""
+    return f"({alias}.flag IS NULL OR {alias}.flag NOT ILIKE '%i%')"
+
+
+def continents_join_sql(alias: str = "p") -> str:
+    """LEFT JOIN del continente de `<alias>.country` como `cc.continent` (parámetros :codes y :continents)."""
+    return (
+        "LEFT JOIN unnest(CAST(:codes AS text[]), CAST(:continents AS text[])) AS cc(country, continent) "
+        f"ON cc.country = {alias}.country"
+    )
+
+
+def scopes_sql(alias: str = "p") -> str:
+    """Ámbitos de cada fila: mundial, federación y continente (NULL si el país no tiene continente).
+
+    Requiere `continents_join_sql`; se usa como `CROSS JOIN LATERAL` y da `s.scope, s.scope_code`.
+    """
+    return f"(VALUES ('world', ''), ('country', {alias}.country), ('continent', cc.continent)) AS s(scope, scope_code)"
@@ -0,0 +1,194 @@
+"""Snapshot binario del almacén de jugadores, para mapearlo en memoria (mmap).
+
+La importación escribe `players.snapshot` en EXPORT_PATH con las columnas de
+un `PlayerStore` ya finalizado (rankings y órdenes incluidos). Los workers de
+la API lo abren con mmap y usan memoryviews sobre el fichero en lugar de
+reconstruir el almacén desde PostgreSQL: el arranque no depende del tamaño de
+la tabla y todos los procesos comparten las mismas páginas de la caché del
+sistema operativo.
+
+Formato (orden de bytes nativo, registrado en la cabecera):
+
+    "FIDESNAP" | versión (uint32) | longitud de la cabecera (uint32)
+    cabecera JSON: tamaño, diccionarios de códigos, totales y, por sección,
+        (desplazamiento, typecode, elementos)
+    secciones alineadas a 8 bytes: columnas int32/uint16, rankings, órdenes,
+        offsets y heap UTF-8 de nombres
+
+Las filas están ordenadas por fideid, así que la propia columna `fideid` es
+el índice (búsqueda binaria).
+
+La importación borra el snapshot en cuanto cambia la tabla players y solo lo
+vuelve a escribir si se pide (`export_snapshot`): un snapshot existente nunca
+es anterior a la última carga, y sin él la API lee la tabla.
+"""
+
+import json
+import logging
+import mmap
+import os
+import struct
+import sys
+from array import array
+from datetime import datetime, timezone
+from pathlib import Path
+
+from src.config import get_settings
+from src.services.player_store import PlayerStore
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_MAGIC = b"FIDESNAP"
+SNAPSHOT_VERSION = 2  # 2: rankings de activos con is_active_flag
+SNAPSHOT_FILENAME = "players.snapshot"
+
+_PREAMBLE = struct.Struct("<8sII")
+_ALIGN = 8
+
+
+def snapshot_path() -> Path:
+    """Ruta del snapshot en el directorio de exportación."""
+    return Path(str(get_settings().export_path)) / SNAPSHOT_FILENAME
+
+
+def remove_snapshot(path: Path | None = None) -> bool:
+    """Borra el snapshot, que ya no refleja la tabla players. True si existía.
+
+    Los workers que lo tengan mapeado siguen leyendo el fichero borrado hasta
+    que recargan.
+    """
+    path = path or snapshot_path()
+    try:
+        path.unlink()
+    except FileNotFoundError:
+        return False
+    logger.info("Snapshot %s borrado: se reconstruirá desde la DB", path)
+    return True
+
+
+def _align(offset: int) -> int:
+    return (offset + _ALIGN - 1) // _ALIGN * _ALIGN
+
+
+def _sections(store: PlayerStore) -> tuple[dict[str, array | bytes], dict[str, list[int]]]:
+    """Secciones binarias del almacén y rangos de `country_order` dentro de su sección."""
+    sections: dict[str, array | bytes] = {}
+    for col, values in store.ints.items():
+        sections[f"int:{col}"] = values
+    for col, values in store.codes.items():
+        sections[f"code:{col}"] = values
+    for col, values in store.ranks.items():
+        sections[f"rank:{col}"] = values
+    sections["order"] = store.order
+    sections["name_offsets"] = store.name_offsets
+    sections["name_heap"] = bytes(store.name_heap)
+
+    # Órdenes por país concatenados en una sola sección
+    country_rows = array("I")
+    country_ranges: dict[str, list[int]] = {}
+    for country, rows in store.country_order.items():
+        country_ranges[country] = [len(country_rows), len(rows)]
+        country_rows.extend(rows)
+    sections["country_order"] = country_rows
+    return sections, country_ranges
+
+
+def write_snapshot(store: PlayerStore, path: Path | None = None) -> Path:
+    """
+    Escribe el snapshot de un almacén finalizado.
+
+    Se escribe en un fichero temporal y se renombra: los procesos que tienen
+    mapeado el snapshot anterior siguen leyéndolo hasta que lo sustituyan.
+
+    Returns:
+        Ruta del snapshot.
+    """
+    path = path or snapshot_path()
+    path.parent.mkdir(parents=True, exist_ok=True)
+
+    sections, country_ranges = _sections(store)
+    directory: dict[str, list] = {}
+    offset = 0
+    for name, data in sections.items():
+        typecode = data.typecode if isinstance(data, array) else "B"
+        directory[name] = [offset, typecode, len(data)]
+        offset = _align(offset + len(data) * (data.itemsize if isinstance(data, array) else 1))
+
+    header = json.dumps({
+        "byteorder": sys.byteorder,
+        "created_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "size": store.size,
+        "values": store.values,
+        "totals": [[scope, code, active, total] for (scope, code), (active, total) in store.totals.items()],
+        "country_order": country_ranges,
+        "sections": directory,
+    }).encode("utf-8")
+
+    tmp = path.with_suffix(".tmp")
+    with open(tmp, "wb") as f:
+        f.write(_PREAMBLE.pack(SNAPSHOT_MAGIC, SNAPSHOT_VERSION, len(header)))
+        f.write(header)
+        f.write(b"\0" * (_align(f.tell()) - f.tell()))
+        start = f.tell()
+        for name, data in sections.items():
+            f.write(b"\0" * (start + directory[name][0] - f.tell()))
+            f.write(data.tobytes() if isinstance(data, array) else data)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+
+    logger.info("Snapshot de jugadores: %d jugadores, %d KB en %s", store.size, path.stat().st_size // 1024, path)
+    return path
+
+
+def open_snapshot(path: Path | None = None) -> PlayerStore:
+    """
+    Abre un snapshot como `PlayerStore` de solo lectura sin copiar las columnas.
+
+    Las columnas son memoryviews sobre el mmap del fichero; el mapa se
+    mantiene abierto mientras el almacén esté referenciado.
+
+    Raises:
+        ValueError: Si el fichero no es un snapshot de esta versión y arquitectura.
+    """
+    path = path or snapshot_path()
+    with open(path, "rb") as f:
+        mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+    magic, version, header_len = _PREAMBLE.unpack_from(mapped)
+    if magic != SNAPSHOT_MAGIC:
+        raise ValueError(f"{path} no es un snapshot de jugadores")
+    if version != SNAPSHOT_VERSION:
+        raise ValueError(f"Versión de snapshot {version} no soportada (se espera {SNAPSHOT_VERSION})")
+    header = json.loads(mapped[_PREAMBLE.size:_PREAMBLE.size + header_len])
+    if header["byteorder"] != sys.byteorder:
+        raise ValueError(f"Snapshot escrito con orden de bytes {header['byteorder']}")
+
+    data = memoryview(mapped)
+    start = _align(_PREAMBLE.size + header_len)
+
+    def section(name: str) -> memoryview:
+        offset, typecode, length = header["sections"][name]
+        itemsize = array(typecode).itemsize
+        view = data[start + offset:start + offset + length * itemsize]
+        return view if typecode == "B" else view.cast(typecode)
+
+    store = PlayerStore()
+    store.size = header["size"]
+    store.ints = {col: section(f"int:{col}") for col in store.ints}
+    store.codes = {col: section(f"code:{col}") for col in store.codes}
+    store.ranks = {col: section(f"rank:{col}") for col in store.ranks}
+    store.values = header["values"]
+    store.totals = {(scope, code): (active, total) for scope, code, active, total in header["totals"]}
+    store.order = section("order")
+    store.name_offsets = section("name_offsets")
+    store.name_heap = section("name_heap")
+    country_rows = section("country_order")
+    store.country_order = {
+        country: country_rows[begin:begin + length] for country, (begin, length) in header["country_order"].items()
+    }
+    store._code_index = {}
+    store.mapped = mapped
+
+    logger.info("Snapshot de jugadores abierto: %d jugadores (creado %s)", store.size, header["created_at"])
+    return store
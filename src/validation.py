@@ -0,0 +1,232 @@
+"""Validación de calidad de datos entre el parser y el loader.
+
+Cada lote de `PlayerRow` se comprueba por columnas antes de escribirse: tipo,
+NOT NULL, longitud (la de las columnas String del modelo Player), caracteres
+NUL (PostgreSQL no los admite en text), rangos de valores y fideid repetidos.
+Los fideid se recuerdan entre lotes durante toda la carga: se conserva la
+primera aparición y las siguientes se rechazan. Un fideid repetido haría
+fallar el INSERT ... ON CONFLICT de su lote y el índice único de la tabla
+sombra con swap, y bloquearía entre sí a los loaders en paralelo. Cualquier
+fila inválida haría fallar el upsert del lote entero y con él la
+importación; aquí se aparta a un CSV de rechazos (`rejects_<fecha>.csv` en
+EXPORT_PATH, con los motivos en la primera columna) y el resto del lote
+sigue. `run_import_history` valida igual cada periodo, con su propio CSV
+(`rejects_history_<periodo>_<fecha>.csv`).
+
+Las comprobaciones van por columna sobre el lote transpuesto, con builtins en
+C (`filter`, `map`, `min`, `max`): una columna sin valores fuera de límites
+cuesta unas pocas pasadas en C, y solo las columnas que fallan se recorren
+fila a fila para localizar las culpables.
+"""
+
+import csv
+import logging
+from collections import Counter
+from collections.abc import Callable, Iterable, Iterator
+from datetime import date, datetime
+from functools import partial
+from operator import is_not
+from pathlib import Path
+from typing import NamedTuple
+
+from sqlalchemy import String
+
+from src.config import get_settings
+from src.instrumentation import ImportMetrics
+from src.models import Player
+from src.parser import PLAYER_FIELDS, PlayerRow
+
+logger = logging.getLogger(__name__)
+
+INT32_MIN, INT32_MAX = -(2**31), 2**31 - 1
+MAX_RATING = 3500
+MAX_GAMES = 9999
+
+# Rangos admitidos (ambos extremos incluidos); el resto de enteros, el rango de la columna (int32)
+VALUE_RANGES = {
+    "fideid": (1, INT32_MAX),
+    "rating": (0, MAX_RATING),
+    "rapid_rating": (0, MAX_RATING),
+    "blitz_rating": (0, MAX_RATING),
+    "foa_rating": (0, MAX_RATING),
+    "games": (0, MAX_GAMES),
+    "rapid_games": (0, MAX_GAMES),
+    "blitz_games": (0, MAX_GAMES),
+}
+
+_not_none = partial(is_not, None)
+
+
+class _ColumnCheck(NamedTuple):
+    """Límites de un campo de PlayerRow."""
+
+    index: int
+    field: str
+    kind: type
+    required: bool
+    length: int | None
+    low: int | None
+    high: int | None
+
+
+def _column_checks() -> list[_ColumnCheck]:
+    """Límites de cada campo a partir de las columnas del modelo Player y VALUE_RANGES."""
+    table = Player.__table__
+    checks = []
+    for index, field in enumerate(PLAYER_FIELDS):
+        column = table.c[field]
+        if isinstance(column.type, String):
+            checks.append(_ColumnCheck(index, field, str, not column.nullable, column.type.length, None, None))
+            continue
+        if field == "birthday":
+            low, high = 0, date.today().year  # 0: año desconocido
+        else:
+            low, high = VALUE_RANGES.get(field, (INT32_MIN, INT32_MAX))
+        checks.append(_ColumnCheck(index, field, int, not column.nullable, None, low, high))
+    return checks
+
+
+def rejects_path(prefix: str = "rejects") -> Path:
+    """Ruta de un CSV de rechazos nuevo en el directorio de exportación (`<prefix>_<fecha>.csv`)."""
+    return Path(str(get_settings().export_path)) / f"{prefix}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv"
+
+
+class RowValidator:
+    """Valida lotes de jugadores y aparta las filas inválidas a un CSV de rechazos."""
+
+    def __init__(self, path: Path | None = None):
+        self.path = path or rejects_path()
+        self.checks = _column_checks()
+        self.rows = 0
+        self.rejected = 0
+        self.reasons: Counter[str] = Counter()
+        self.seen: set[int] = set()  # fideid ya aceptados en esta carga
+        self._file = None
+        self._writer = None
+
+    def _mark(
+        self,
+        bad: dict[int, list[str]],
+        values: tuple,
+        field: str,
+        kind: str,
+        predicate: Callable[[object], bool],
+        detail: Callable[[object], str],
+    ) -> None:
+        """Anota el motivo en cada fila cuyo valor cumple `predicate`."""
+        for row, value in enumerate(values):
+            if value is not None and predicate(value):
+                bad.setdefault(row, []).append(f"{field}: {kind} {detail(value)}")
+                self.reasons[f"{field}: {kind}"] += 1
+
+    def _check_column(self, check: _ColumnCheck, values: tuple, bad: dict[int, list[str]]) -> None:
+        """Comprueba una columna del lote y anota las filas que no cumplen."""
+        field, kind = check.field, check.kind
+        present = list(filter(_not_none, values))
+        if check.required and len(present) != len(values):
+            for row, value in enumerate(values):
+                if value is None:
+                    bad.setdefault(row, []).append(f"{field}: nulo")
+                    self.reasons[f"{field}: nulo"] += 1
+        if not present:
+            return
+
+        if set(map(type, present)) != {kind}:
+            self._mark(bad, values, field, "tipo", lambda v: type(v) is not kind, lambda v: type(v).__name__)
+            present = [v for v in present if type(v) is kind]
+            if not present:
+                return
+            values = tuple(v if type(v) is kind else None for v in values)
+
+        if kind is str:
+            length = check.length
+            if length is not None and max(map(len, present)) > length:
+                self._mark(bad, values, field, "longitud", lambda v: len(v) > length, lambda v: f"{len(v)} > {length}")
+            if "\0" in "".join(present):
+                self._mark(bad, values, field, "carácter", lambda v: "\0" in v, lambda v: "NUL")
+        else:
+            low, high = check.low, check.high
+            if min(present) < low or max(present) > high:
+                self._mark(
+                    bad, values, field, "rango", lambda v: not low <= v <= high, lambda v: f"{v} fuera de [{low}, {high}]"
+                )
+
+    def _check_duplicates(self, fideids: tuple, bad: dict[int, list[str]]) -> None:
+        """Rechaza los fideid ya aceptados en este lote o en uno anterior (se queda la primera aparición)."""
+        batch_ids = set(fideids)
+        if not bad and len(batch_ids) == len(fideids) and self.seen.isdisjoint(batch_ids):
+            self.seen |= batch_ids
+            return
+        for row, fideid in enumerate(fideids):
+            if row in bad:
+                continue  # Las filas inválidas no reservan su fideid
+            if fideid in self.seen:
+                bad[row] = ["fideid: duplicado"]
+                self.reasons["fideid: duplicado"] += 1
+            else:
+                self.seen.add(fideid)
+
+    def validate(self, batch: list[PlayerRow]) -> list[PlayerRow]:
+        """Retorna las filas válidas del lote; las inválidas se escriben en el CSV de rechazos."""
+        if not batch:
+            return batch
+        self.rows += len(batch)
+        columns = list(zip(*batch))
+        bad: dict[int, list[str]] = {}
+        for check in self.checks:
+            self._check_column(check, columns[check.index], bad)
+
+        self._check_duplicates(columns[0], bad)
+
+        if not bad:
+            return batch
+        self._write_rejects((batch[row], reasons) for row, reasons in sorted(bad.items()))
+        return [player for row, player in enumerate(batch) if row not in bad]
+
+    def _write_rejects(self, rejects: Iterable[tuple[PlayerRow, list[str]]]) -> None:
+        """Añade filas al CSV de rechazos (se crea con el primer rechazo)."""
+        if self._writer is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._file = open(self.path, "w", encoding="utf-8", newline="")
+            self._writer = csv.writer(self._file)
+            self._writer.writerow(("reasons", *PLAYER_FIELDS))
+        for player, reasons in rejects:
+            # NUL escapado: el CSV debe poder abrirse con cualquier herramienta
+            values = (v.replace("\0", "\\0") if isinstance(v, str) else v for v in player)
+            self._writer.writerow(("; ".join(reasons), *values))
+            self.rejected += 1
+            logger.debug("Jugador %s rechazado: %s", player.fideid, "; ".join(reasons))
+
+    def batches(
+        self,
+        batches: Iterable[list[PlayerRow]],
+        metrics: ImportMetrics | None = None,
+    ) -> Iterator[list[PlayerRow]]:
+        """Valida cada lote (etapa `validate` en `metrics`) y genera solo sus filas válidas."""
+        metrics = metrics or ImportMetrics()
+        for batch in batches:
+            with metrics.stage("validate") as stats:
+                valid = self.validate(batch)
+                stats.rows += len(batch)
+            if valid:
+                yield valid
+
+    def close(self) -> None:
+        """Cierra el CSV de rechazos y registra el resumen."""
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        if self.rejected:
+            logger.warning(
+                "%d de %d jugadores rechazados por validación (%s); detalle en %s",
+                self.rejected, self.rows, ", ".join(f"{k}: {v}" for k, v in self.reasons.most_common()), self.path,
+            )
+
+    def summary(self) -> dict:
+        """Filas validadas, rechazadas, recuento por motivo y ruta del CSV (None sin rechazos)."""
+        return {
+            "rows": self.rows,
+            "rejected": self.rejected,
+            "reasons": dict(self.reasons.most_common()),
+            "rejects_path": str(self.path) if self.rejected else None,
+        }
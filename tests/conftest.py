@@ -0,0 +1,50 @@
+"""Fixtures compartidas por los tests: fábrica de filas y jugadores de prueba."""
+
+import pytest
+
+from src.parser import PlayerRow
+
+
+def _make_row(fideid: int, **fields) -> PlayerRow:
+    values = {
+        "fideid": fideid,
+        "name": f"Player, {fideid}",
+        "country": "ESP",
+        "sex": "M",
+        "title": None,
+        "rating": 2000,
+        "games": 0,
+        "rapid_rating": None,
+        "rapid_games": None,
+        "blitz_rating": None,
+        "blitz_games": None,
+        "birthday": 1990,
+        "flag": None,
+        "foa_title": None,
+        "foa_rating": None,
+    }
+    values.update(fields)
+    return PlayerRow(**values)
+
+
+@pytest.fixture
+def make_row():
+    """Fábrica de PlayerRow válidos: `make_row(fideid, **columnas)` sobrescribe los valores por defecto."""
+    return _make_row
+
+
+@pytest.fixture
+def players(make_row) -> list[PlayerRow]:
+    """Jugadores de varias federaciones y continentes, con empates de rating y todos los flags."""
+    return [
+        make_row(1, name="Núñez, José", country="ESP", title="GM", rating=2700),
+        make_row(2, country="ESP", sex="F", title="WGM", rating=2400, flag="w"),
+        make_row(3, country="ESP", rating=2400, flag="i"),
+        make_row(4, country="FRA", sex="F", title="wgm", rating=2500, flag="wi"),
+        make_row(5, country="FRA", title="IM", rating=2450, flag="I"),
+        make_row(6, country="FRA", rating=2300, flag=""),
+        make_row(7, country="USA", title="GM", rating=2750),
+        make_row(8, country="USA", rating=0),
+        make_row(9, country="ARG", rating=None, flag="i"),
+        make_row(10, country="XXX", rating=2100),  # Sin continente
+    ]
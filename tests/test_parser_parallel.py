@@ -0,0 +1,78 @@
+"""Parseo en paralelo: límites de los fragmentos y mismo resultado que el parseo secuencial."""
+
+import pytest
+
+from src.parser import parse_players
+from src.parser_parallel import _txt_bounds, _xml_bounds, _xml_prolog, _xml_shard, parse_players_parallel
+
+XML_PROLOG = b'<?xml version="1.0" encoding="ISO-8859-1"?>'
+
+
+def _xml_list(count: int, tag: bytes = b"player") -> bytes:
+    """Lista XML en ISO-8859-1 con nombres no ASCII y un <playerslist> que no es un <player>."""
+    players = b"".join(
+        b"<%s><fideid>%d</fideid><name>N\xfa\xf1ez, Jos\xe9 %d</name><country>ESP</country>"
+        b"<rating>%d</rating></%s>\n" % (tag, i, i, 2000 + i, tag)
+        for i in range(1, count + 1)
+    )
+    return XML_PROLOG + b"\n<playerslist>\n" + players + b"</playerslist>\n"
+
+
+def _txt_list(count: int) -> bytes:
+    header = b"ID Number      Name                              Fed Sex Tit  SRtng SGm B-day Flag\n"
+    lines = b"".join(
+        b"%-15d%-34s%-4s%-4s%-5s%-6d%-4d%-6d%s\n" % (i, b"Player, %d" % i, b"FRA", b"M", b"", 1500 + i, 0, 1990, b"")
+        for i in range(1, count + 1)
+    )
+    return header + lines
+
+
+@pytest.mark.parametrize("count", [1, 2, 3, 7, 50])
+def test_xml_bounds_cover_every_player_once(count):
+    content = _xml_list(20)
+    bounds = _xml_bounds(content, count)
+
+    assert 1 <= len(bounds) <= count
+    assert all(end == start for (_, end), (start, _) in zip(bounds, bounds[1:]))
+    for start, end in bounds:
+        assert content.startswith(b"<player>", start)
+        assert content[:end].rstrip().endswith(b"</player>")
+    prolog = _xml_prolog(content)
+    rows = [row for start, end in bounds for row in parse_players(_xml_shard(content, prolog, start, end), "xml")]
+    assert rows == list(parse_players(content, "xml"))
+    assert rows[0].name == "Núñez, José 1"
+
+
+def test_xml_bounds_without_players():
+    assert _xml_bounds(XML_PROLOG + b"<playerslist></playerslist>", 4) is None
+
+
+def test_xml_prolog():
+    assert _xml_prolog(_xml_list(1)) == XML_PROLOG
+    assert _xml_prolog(b"\xef\xbb\xbf" + XML_PROLOG + b"<a/>") == b"\xef\xbb\xbf" + XML_PROLOG
+    assert _xml_prolog(b"<playerslist/>") == b""
+
+
+@pytest.mark.parametrize("count", [1, 3, 50])
+def test_txt_bounds_split_on_lines(count):
+    content = _txt_list(20)
+    bounds = _txt_bounds(content, count)
+
+    assert bounds[0][0] == content.index(b"\n") + 1
+    assert bounds[-1][1] == len(content)
+    assert all(content[start - 1:start] == b"\n" for start, _ in bounds)
+
+
+@pytest.mark.parametrize(
+    ("content", "fmt"),
+    [
+        (_xml_list(200), "xml"),
+        (_txt_list(200), "txt"),
+        # Con prefijo de namespace no hay límites <player>: se parsea en el proceso principal
+        (_xml_list(20, b"fide:player").replace(b"<playerslist>", b'<playerslist xmlns:fide="urn:fide">'), "xml"),
+    ],
+)
+def test_parallel_matches_sequential_in_file_order(content, fmt):
+    rows = [row for batch in parse_players_parallel(content, fmt, workers=2) for row in batch]
+    assert rows
+    assert rows == list(parse_players(content, fmt))
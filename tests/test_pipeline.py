@@ -0,0 +1,127 @@
+"""Pipeline productor/consumidor: reparto, contrapresión y propagación de errores."""
+
+import threading
+import time
+from contextlib import contextmanager
+
+import pytest
+
+import src.pipeline
+from src.pipeline import run_pipeline
+
+SESSION = object()  # El pipeline solo pasa la sesión a `write`
+
+
+class _Loaders:
+    """Sustituye a get_db_session: una sesión por loader que registra lo confirmado.
+
+    Como get_db_session, solo "confirma" si el bloque termina sin excepción.
+    """
+
+    def __init__(self):
+        self.committed: list[list[int]] = []
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def session(self):
+        rows: list[int] = []
+        yield rows
+        with self._lock:
+            self.committed.append(rows)
+
+
+@pytest.fixture
+def loaders(monkeypatch) -> _Loaders:
+    loaders = _Loaders()
+    monkeypatch.setattr(src.pipeline, "get_db_session", loaders.session)
+    return loaders
+
+
+def _batches(total: int, size: int):
+    for start in range(0, total, size):
+        yield list(range(start, min(start + size, total)))
+
+
+def _write(session: list[int], batch: list[int]) -> None:
+    session.extend(batch)
+
+
+def test_single_session_writes_every_batch_in_order():
+    written = []
+    total = run_pipeline(_batches(1000, 64), lambda session, batch: written.extend(batch), session=SESSION)
+    assert total == 1000
+    assert written == list(range(1000))
+
+
+def test_loaders_receive_rows_by_key(loaders):
+    total = run_pipeline(_batches(1000, 64), _write, loaders=3, key=int)
+
+    assert total == 1000
+    assert sorted(row for rows in loaders.committed for row in rows) == list(range(1000))
+    for rows in loaders.committed:
+        assert len({row % 3 for row in rows}) == 1
+
+
+def test_loaders_require_key():
+    with pytest.raises(ValueError):
+        run_pipeline(_batches(10, 5), _write, loaders=2)
+    with pytest.raises(ValueError):
+        run_pipeline(_batches(10, 5), _write, session=SESSION, loaders=2)
+
+
+def test_producer_is_bounded_by_queue():
+    produced = 0
+    ahead = []
+
+    def batches():
+        nonlocal produced
+        for batch in _batches(400, 10):
+            produced += 1
+            yield batch
+
+    def write(session, batch):
+        ahead.append(produced - (batch[0] // 10 + 1))
+        time.sleep(0.005)
+
+    run_pipeline(batches(), write, session=SESSION, queue_batches=2)
+    # En cola como mucho queue_batches, más el lote que el productor tiene en la mano
+    assert max(ahead) <= 3
+
+
+def test_write_error_stops_producer_and_closes_batches():
+    closed = []
+
+    def batches():
+        try:
+            yield from _batches(10_000, 10)
+        finally:
+            closed.append(True)
+
+    def write(session, batch):
+        if batch[0] == 50:
+            raise RuntimeError("fallo de escritura")
+
+    with pytest.raises(RuntimeError, match="fallo de escritura"):
+        run_pipeline(batches(), write, session=SESSION)
+    assert closed == [True]
+
+
+def test_producer_error_propagates():
+    def batches():
+        yield [1, 2]
+        raise RuntimeError("fallo de parseo")
+
+    with pytest.raises(RuntimeError, match="fallo de parseo"):
+        run_pipeline(batches(), _write, session=[])
+
+
+def test_loader_error_rolls_back_every_loader(loaders):
+    def write(session, batch):
+        if 500 in batch:
+            raise RuntimeError("fallo en un loader")
+        session.extend(batch)
+
+    with pytest.raises(RuntimeError, match="fallo en un loader"):
+        run_pipeline(_batches(1000, 50), write, loaders=2, key=int)
+    # El loader sano no pasa la barrera del commit
+    assert loaders.committed == []
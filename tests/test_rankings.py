@@ -0,0 +1,56 @@
+"""Rankings: misma definición de jugador activo en Python, ORM, SQL y almacén en memoria."""
+
+import pytest
+from sqlalchemy import create_engine, insert, select, text
+from sqlalchemy.orm import Session
+
+from src.models import PLAYER_COLUMNS, Player
+from src.services.leaderboards import segment_key
+from src.services.player_store import build_player_store
+from src.services.rankings import get_player_rankings, is_active_flag
+from src.services.sql_fragments import active_sql
+
+
+@pytest.fixture
+def session(players):
+    """Sesión SQLite en memoria con la tabla players cargada."""
+    engine = create_engine("sqlite://")
+    Player.__table__.create(engine)
+    with Session(engine) as session:
+        session.execute(insert(Player), [row._asdict() for row in players])
+        yield session
+
+
+@pytest.mark.parametrize(
+    ("flag", "active"),
+    [(None, True), ("", True), ("w", True), ("i", False), ("wi", False), ("I", False), ("WI", False)],
+)
+def test_is_active_flag(flag, active):
+    assert is_active_flag(flag) is active
+
+
+def test_active_sql_matches_is_active_flag(session, players):
+    # SQLite no tiene ILIKE, pero su LIKE ya no distingue mayúsculas en ASCII
+    condition = active_sql("p").replace("ILIKE", "LIKE")
+    active = set(session.scalars(text(f"SELECT p.fideid FROM players p WHERE {condition}")))
+    assert active == {row.fideid for row in players if is_active_flag(row.flag)}
+
+
+def test_player_store_rankings_match_sql(session):
+    store = build_player_store(session)
+    for row in session.execute(select(*PLAYER_COLUMNS)):
+        assert store.rankings(store.find(row.fideid)) == get_player_rankings(session, row), row.fideid
+
+
+@pytest.mark.parametrize(
+    ("kwargs", "key"),
+    [
+        ({}, "all"),
+        ({"sex": "f"}, "sex:F"),
+        ({"age": "u20"}, "age:u20"),
+        ({"title": "GM"}, "title:GM"),
+        ({"title": "wgm"}, "title:WGM"),
+    ],
+)
+def test_segment_key(kwargs, key):
+    assert segment_key(**kwargs) == key
@@ -0,0 +1,63 @@
+"""Snapshot binario del almacén: escritura, apertura con mmap y borrado."""
+
+import struct
+
+import pytest
+
+from src.services.player_store import PlayerStore
+from src.snapshot import SNAPSHOT_VERSION, open_snapshot, remove_snapshot, write_snapshot
+
+
+@pytest.fixture
+def store(players) -> PlayerStore:
+    """Almacén finalizado con los jugadores de prueba (ordenados por fideid)."""
+    store = PlayerStore()
+    for row in sorted(players):
+        store.append(row._asdict())
+    store.finalize()
+    return store
+
+
+def test_round_trip(store, players, tmp_path):
+    mapped = open_snapshot(write_snapshot(store, tmp_path / "players.snapshot"))
+
+    assert mapped.size == store.size
+    for row in players:
+        index = mapped.find(row.fideid)
+        assert index == store.find(row.fideid)
+        assert mapped.to_dict(index) == store.to_dict(index)
+        assert mapped.name(index) == row.name
+        assert mapped.rankings(index) == store.rankings(index)
+    assert mapped.find(999) is None
+
+
+@pytest.mark.parametrize(
+    "query",
+    [{}, {"country": "ESP"}, {"country": "FRA", "min_rating": 2400}, {"skip": 2, "limit": 3}, {"country": "NOR"}],
+)
+def test_round_trip_list_players(store, tmp_path, query):
+    mapped = open_snapshot(write_snapshot(store, tmp_path / "players.snapshot"))
+    assert mapped.list_players(**query) == store.list_players(**query)
+
+
+def test_rejects_other_version(store, tmp_path):
+    path = write_snapshot(store, tmp_path / "players.snapshot")
+    with open(path, "r+b") as f:
+        f.seek(8)
+        f.write(struct.pack("<I", SNAPSHOT_VERSION + 1))
+    with pytest.raises(ValueError, match="Versión"):
+        open_snapshot(path)
+
+
+def test_rejects_other_files(tmp_path):
+    path = tmp_path / "players.snapshot"
+    path.write_bytes(b"\0" * 64)
+    with pytest.raises(ValueError, match="no es un snapshot"):
+        open_snapshot(path)
+
+
+def test_remove_snapshot(store, tmp_path):
+    path = write_snapshot(store, tmp_path / "players.snapshot")
+    assert remove_snapshot(path) is True
+    assert not path.exists()
+    assert remove_snapshot(path) is False
@@ -0,0 +1,74 @@
+"""RowValidator: filas inválidas apartadas al CSV de rechazos, el resto sigue."""
+
+import csv
+
+import pytest
+
+from src.validation import MAX_RATING, RowValidator
+
+
+@pytest.fixture
+def validator(tmp_path):
+    validator = RowValidator(tmp_path / "rejects.csv")
+    yield validator
+    validator.close()
+
+
+def _rejects(validator: RowValidator) -> list[list[str]]:
+    validator.close()
+    with open(validator.path, encoding="utf-8", newline="") as f:
+        return list(csv.reader(f))[1:]
+
+
+def test_valid_batch_passes_unchanged(validator, make_row):
+    batch = [make_row(1), make_row(2, rating=None, flag="wi")]
+    assert validator.validate(batch) is batch
+    assert validator.summary() == {"rows": 2, "rejected": 0, "reasons": {}, "rejects_path": None}
+    assert not validator.path.exists()
+
+
+@pytest.mark.parametrize(
+    ("fields", "reason"),
+    [
+        ({"name": None}, "name: nulo"),
+        ({"country": "SPAIN"}, "country: longitud"),
+        ({"name": "Bad\0Name"}, "name: carácter"),
+        ({"rating": MAX_RATING + 1}, "rating: rango"),
+        ({"games": -1}, "games: rango"),
+        ({"birthday": 3000}, "birthday: rango"),
+        ({"rating": "2000"}, "rating: tipo"),
+    ],
+)
+def test_invalid_row_is_rejected(validator, make_row, fields, reason):
+    valid = validator.validate([make_row(1), make_row(2, **fields), make_row(3)])
+
+    assert [row.fideid for row in valid] == [1, 3]
+    assert validator.reasons == {reason: 1}
+    (reject,) = _rejects(validator)
+    assert reject[0].startswith(reason)
+    assert reject[1] == "2"
+
+
+def test_nul_is_escaped_in_rejects(validator, make_row):
+    validator.validate([make_row(1, name="Bad\0Name")])
+    (reject,) = _rejects(validator)
+    assert reject[2] == "Bad\\0Name"
+
+
+def test_duplicates_keep_first_occurrence(validator, make_row):
+    first = validator.validate([make_row(1, rating=2100), make_row(2), make_row(1, rating=2200)])
+    second = validator.validate([make_row(3), make_row(2, rating=2300)])
+
+    assert [(row.fideid, row.rating) for row in first] == [(1, 2100), (2, 2000)]
+    assert [row.fideid for row in second] == [3]
+    assert validator.reasons == {"fideid: duplicado": 2}
+
+
+def test_invalid_row_does_not_reserve_fideid(validator, make_row):
+    assert validator.validate([make_row(1, rating=-5)]) == []
+    assert [row.rating for row in validator.validate([make_row(1)])] == [2000]
+
+
+def test_batches_skip_empty_results(validator, make_row):
+    batches = [[make_row(1)], [make_row(1)], [make_row(2)]]
+    assert [[row.fideid for row in batch] for batch in validator.batches(batches)] == [[1], [2]]